@@ -0,0 +1,184 @@
+"""Compares the Flask and the ASGI API servers under concurrent load.
+
+Both servers run in their own process on the same generated database and
+get the same mix of requests: a page of tasks, a project view and a task
+update. `--slow-clients` keeps that many connections open and trickling
+headers during the run, like clients on a bad network.
+
+Usage: python benchmarks/bench_asgi.py [--size 1k] [--requests 1000]
+    [--concurrency 1,8,32,128] [--write-ratio 0.2] [--slow-clients 0]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import dataset
+from sqlalchemy import create_engine
+
+STATUSES = ('TODO', 'IN_PROGRESS', 'REVIEW', 'DONE')
+SERVERS = ('flask', 'asgi')
+CONFIG = 'user: user_1\nworkspace: workspace_1\nstorage:\n  profile: server\n'
+
+
+def serve(server: str, port: int) -> None:
+    if server == 'flask':
+        from werkzeug.serving import run_simple
+
+        from terka.entrypoints import server as flask_server
+        run_simple('127.0.0.1', port, flask_server.app, threaded=True)
+    else:
+        import uvicorn
+
+        from terka.entrypoints import asgi
+        uvicorn.run(asgi.create_app_from_config(),
+                    host='127.0.0.1',
+                    port=port,
+                    log_level='warning')
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def fetch(port: int,
+                method: str,
+                path: str,
+                body: bytes = b'') -> tuple[int, float]:
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    headers = (f'{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+               'Connection: close\r\n'
+               'Content-Type: application/x-www-form-urlencoded\r\n'
+               f'Content-Length: {len(body)}\r\n\r\n')
+    writer.write(headers.encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b' ', 2)[1]), time.perf_counter() - start
+
+
+async def slow_client(port: int, stop: asyncio.Event) -> None:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    request = b'GET /api/v1/tasks/1 HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+    for byte in request:
+        if stop.is_set():
+            break
+        writer.write(bytes([byte]))
+        await writer.drain()
+        await asyncio.sleep(0.1)
+    writer.close()
+
+
+def request_for(i: int, n_tasks: int, n_projects: int,
+                write_ratio: float) -> tuple[str, str, bytes]:
+    rng = random.Random(i)
+    if rng.random() < write_ratio:
+        return ('PATCH', f'/api/v1/tasks/{rng.randint(1, n_tasks)}',
+                f'status={rng.choice(STATUSES)}'.encode())
+    if rng.random() < 0.5:
+        return 'GET', '/api/v1/tasks?limit=50&fields=id,name,status', b''
+    return 'GET', f'/api/v1/projects/{rng.randint(1, n_projects)}', b''
+
+
+async def load(port: int, concurrency: int, n_requests: int, n_tasks: int,
+               n_projects: int, write_ratio: float,
+               slow_clients: int) -> tuple[float, float, float, int]:
+    requests = iter(range(n_requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in requests:
+            status, latency = await fetch(
+                port, *request_for(i, n_tasks, n_projects, write_ratio))
+            latencies.append(latency)
+            errors += status >= 400
+
+    stop = asyncio.Event()
+    slow = [
+        asyncio.create_task(slow_client(port, stop))
+        for _ in range(slow_clients)
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*slow)
+    latencies.sort()
+    return (n_requests / elapsed, statistics.median(latencies) * 1000,
+            latencies[int(len(latencies) * 0.95)] * 1000, errors)
+
+
+def wait_for(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f'server on port {port} did not start')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', choices=dataset.SIZES, default='1k')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', default='1,8,32,128')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--serve', choices=SERVERS, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    n_tasks = dataset.SIZES[args.size]
+    n_projects = dataset.counts(n_tasks)['projects']
+    with tempfile.TemporaryDirectory() as home:
+        os.makedirs(f'{home}/.terka')
+        with open(f'{home}/.terka/config.yaml', 'w', encoding='utf-8') as f:
+            f.write(CONFIG)
+        dataset.generate(create_engine(f'sqlite:///{home}/.terka/tasks.db'),
+                         n_tasks)
+        print(f'{"server":>6} {"clients":>7} {"requests/s":>11} '
+              f'{"p50 ms":>8} {"p95 ms":>8} {"errors":>6}')
+        for server in SERVERS:
+            port = _free_port()
+            process = subprocess.Popen(
+                [sys.executable, __file__, '--serve', server, '--port',
+                 str(port)],
+                env={
+                    **os.environ, 'HOME': home
+                },
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL)
+            try:
+                wait_for(port)
+                for concurrency in map(int, args.concurrency.split(',')):
+                    throughput, p50, p95, errors = asyncio.run(
+                        load(port, concurrency, args.requests, n_tasks,
+                             n_projects, args.write_ratio,
+                             args.slow_clients))
+                    print(f'{server:>6} {concurrency:>7} {throughput:>11.1f} '
+                          f'{p50:>8.1f} {p95:>8.1f} {errors:>6}')
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Measures request throughput of one shared bus across threads.
+
+Each request is either a read (a page of tasks or a project view) or a
+write (a task update through the bus), like API requests served by a
+threaded WSGI server.
+
+Usage: python benchmarks/bench_concurrency.py [--size 1k] [--requests 2000]
+    [--threads 1,2,4,8,16,32] [--write-ratio 0.2]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dataset
+from rich.console import Console
+
+from terka import bootstrap
+from terka import views
+from terka.adapters import orm
+from terka.domain import commands
+from terka.service_layer import unit_of_work
+
+STATUSES = ('TODO', 'IN_PROGRESS', 'REVIEW', 'DONE')
+
+
+def request(bus, n_tasks: int, n_projects: int, write_ratio: float,
+            rng: random.Random) -> None:
+    if rng.random() < write_ratio:
+        bus.handle(
+            commands.UpdateTask(rng.randint(1, n_tasks),
+                                status=rng.choice(STATUSES)))
+    elif rng.random() < 0.5:
+        views.tasks(bus.uow, limit=50, fields=['id', 'name', 'status'])
+    else:
+        views.project(bus.uow, rng.randint(1, n_projects))
+
+
+def run(bus, n_threads: int, n_requests: int, n_tasks: int, n_projects: int,
+        write_ratio: float) -> float:
+    rngs = [random.Random(i) for i in range(n_requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(n_threads) as executor:
+        list(
+            executor.map(
+                lambda rng: request(bus, n_tasks, n_projects, write_ratio,
+                                    rng), rngs))
+    return n_requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', choices=dataset.SIZES, default='1k')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', default='1,2,4,8,16,32')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    n_tasks = dataset.SIZES[args.size]
+    n_projects = dataset.counts(n_tasks)['projects']
+    orm.start_mappers()
+    with tempfile.TemporaryDirectory() as tmp:
+        uow = unit_of_work.SqlAlchemyUnitOfWork(
+            f'sqlite:///{tmp}/tasks.db',
+            unit_of_work.StorageOptions.from_kwargs(profile='server'))
+        dataset.generate(uow.engine, n_tasks)
+        bus = bootstrap.bootstrap(start_orm=False,
+                                  uow=uow,
+                                  config={
+                                      'user': 'user_1',
+                                      'workspace': 'workspace_1'
+                                  })
+        bus.printer.console.console = Console(file=io.StringIO())
+        print(f'{"threads":>7} {"requests/s":>11} {"speedup":>8}')
+        baseline = None
+        for n_threads in map(int, args.threads.split(',')):
+            throughput = run(bus, n_threads, args.requests, n_tasks,
+                             n_projects, args.write_ratio)
+            baseline = baseline or throughput
+            print(f'{n_threads:>7} {throughput:>11.1f} '
+                  f'{throughput / baseline:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""Times terka hot paths against a synthetic database with pytest-benchmark.
+
+The dataset size is taken from TERKA_BENCH_SIZE (1k, 10k or 100k); set
+TERKA_BENCH_DB to keep the generated database between runs.
+
+Usage: TERKA_BENCH_SIZE=10k pytest benchmarks/bench_hot_paths.py \
+    --benchmark-json=benchmark.json
+"""
+from __future__ import annotations
+
+import io
+import itertools
+import os
+
+import dataset
+import pytest
+from rich.console import Console
+from sqlalchemy.orm import clear_mappers
+
+from terka import bootstrap
+from terka import views
+from terka.adapters import orm
+from terka.domain import commands
+from terka.domain import entities
+from terka.domain.external_connectors import asana
+from terka.service_layer import handlers
+from terka.service_layer import unit_of_work
+
+SIZE = os.getenv('TERKA_BENCH_SIZE', '1k')
+SYNCED_PROJECT = 1
+
+
+class FakeApi:
+    """Answers every Asana API call the migrator makes without a network."""
+
+    def __init__(self) -> None:
+        self.gids = itertools.count(1)
+
+    def get_sections_for_project(self, asana_project_id, opts):
+        return [{
+            'name': name,
+            'gid': str(gid)
+        } for gid, name in enumerate(
+            dict.fromkeys(asana.AsanaMigrator.status_mapping.values()))]
+
+    def create_task(self, body, opts):
+        return {'gid': str(next(self.gids)), **body['data']}
+
+    def get_task(self, task_gid, opts):
+        return {'gid': task_gid, 'name': '', 'notes': ''}
+
+    def update_task(self, task_gid, body, opts):
+        return {'gid': task_gid, **body['data']}
+
+    def add_task_for_section(self, section_gid, opts):
+        return {}
+
+    def create_story_for_task(self, task_gid, body, opts):
+        return {}
+
+
+class FakeAsanaMigrator(asana.AsanaMigrator):
+
+    def __init__(self) -> None:
+        self.assignee = None
+        self.tasks = self.sections = self.stories = FakeApi()
+
+
+@pytest.fixture(scope='session')
+def bus(tmp_path_factory):
+    path = os.getenv('TERKA_BENCH_DB') or str(
+        tmp_path_factory.mktemp('bench') / f'terka_{SIZE}.db')
+    uow = unit_of_work.SqlAlchemyUnitOfWork(f'sqlite:///{path}')
+    with uow.engine.begin() as conn:
+        generated = conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'tasks'").first()
+    if not generated:
+        dataset.generate(uow.engine, dataset.SIZES[SIZE])
+        with uow.engine.begin() as conn:
+            conn.execute(orm.asana_projects.insert(), {
+                'id': SYNCED_PROJECT,
+                'asana_project_id': '1'
+            })
+    orm.start_mappers()
+    bus = bootstrap.bootstrap(start_orm=False,
+                              uow=uow,
+                              config={
+                                  'user': 'user_1',
+                                  'workspace': 'workspace_1'
+                              })
+    bus.printer.console.console = Console(file=io.StringIO(), width=200)
+    yield bus
+    clear_mappers()
+
+
+@pytest.fixture(scope='session')
+def active_sprint(bus):
+    return dataset.counts(dataset.SIZES[SIZE])['sprints']
+
+
+class TestCommands:
+
+    def test_list_tasks(self, benchmark, bus):
+        benchmark(bus.handle, commands.ListTask())
+
+    def test_list_projects(self, benchmark, bus):
+        benchmark(bus.handle, commands.ListProject())
+
+    def test_show_sprint_data(self, benchmark, bus, active_sprint):
+
+        def prepare_sprint():
+            with bus.uow as uow:
+                sprint = uow.tasks.get_by_id(entities.sprint.Sprint,
+                                             active_sprint,
+                                             profile='sprint_dashboard')
+                for task in sprint.open_tasks:
+                    (task.project_name, task.tags_string,
+                     task.collaborators_string)
+                return (sprint.time_spent_today, sprint.total_time_spent,
+                        sprint.velocity, sprint.utilization,
+                        sprint.collaborators_as_string,
+                        sprint.daily_time_entries_hours())
+
+        benchmark(prepare_sprint)
+
+    def test_sync_project(self, benchmark, bus):
+
+        def sync_project():
+            with bus.uow as uow:
+                project = uow.tasks.get_by_id(entities.project.Project,
+                                              SYNCED_PROJECT)
+                handlers.ProjectCommandHandlers._sync_project(
+                    uow, project, FakeAsanaMigrator())
+                synced = len(uow.published_messages)
+                uow.published_messages.clear()
+                return synced
+
+        assert benchmark(sync_project) > 1
+
+
+class TestViews:
+
+    def test_projects(self, benchmark, bus):
+        benchmark(views.projects, bus.uow)
+
+    def test_project_tasks(self, benchmark, bus):
+        benchmark(views.project_tasks, bus.uow, SYNCED_PROJECT)
+
+    def test_tasks(self, benchmark, bus):
+        benchmark(views.tasks, bus.uow)
+
+    def test_sprint_tasks(self, benchmark, bus, active_sprint):
+        benchmark(views.sprint_tasks, bus.uow, active_sprint)
+
+    def test_project_statistics(self, benchmark, bus):
+
+        def project_statistics():
+            with bus.uow as uow:
+                return views.project_statistics(uow.tasks.session)
+
+        benchmark(project_statistics)
+
+    def test_search(self, benchmark, bus):
+        benchmark(views.search, bus.uow, 'billing')
+
+
+class TestBulkCreation:
+
+    def test_import_tasks(self, benchmark, bus):
+        benchmark(bus.handle,
+                  commands.ImportTasks(tasks=[{
+                      'name': f'imported_task_{i}',
+                      'project': 'project_1'
+                  } for i in range(1_000)]))
+
+    def test_create_tasks(self, benchmark, bus):
+
+        def create_tasks():
+            for i in range(20):
+                bus.handle(commands.CreateTask(name=f'created_task_{i}'))
+
+        benchmark(create_tasks)
@@ -0,0 +1,141 @@
+"""Compares query latency and plans with and without terka indexes.
+
+Usage: python benchmarks/bench_indexes.py [--projects 50] [--tasks 200]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from terka import views
+from terka.adapters import migrations
+from terka.adapters import orm
+from terka.domain import entities
+
+QUERIES = {
+    'project tasks':
+    'SELECT * FROM tasks WHERE project = :project AND status = "TODO"',
+    'overdue tasks': 'SELECT * FROM tasks WHERE due_date <= :today',
+    'task history': 'SELECT * FROM task_events WHERE task = :task',
+    'task time spent':
+    'SELECT SUM(time_spent_minutes) FROM time_tracker_entries '
+    'WHERE task = :task',
+    'project by name': 'SELECT id FROM projects WHERE name = :name',
+}
+
+
+def populate(engine, n_projects: int, n_tasks: int) -> None:
+    now = datetime.now()
+    statuses = ('BACKLOG', 'TODO', 'IN_PROGRESS', 'REVIEW', 'DONE')
+    with engine.begin() as conn:
+        conn.execute(orm.projects.insert(), [{
+            'id': i,
+            'name': f'project_{i}',
+            'status': 'ACTIVE'
+        } for i in range(1, n_projects + 1)])
+        task_rows, event_rows, time_rows = [], [], []
+        for i in range(1, n_projects * n_tasks + 1):
+            creation_date = now - timedelta(days=random.randint(0, 365))
+            task_rows.append({
+                'id': i,
+                'name': f'task_{i}',
+                'project': random.randint(1, n_projects),
+                'status': random.choice(statuses),
+                'priority': 'NORMAL',
+                'creation_date': creation_date,
+                'due_date': (creation_date + timedelta(days=30)).date(),
+            })
+            for _ in range(3):
+                event_rows.append({
+                    'task': i,
+                    'date': creation_date,
+                    'type': 'STATUS',
+                    'old_value': 'BACKLOG',
+                    'new_value': 'TODO'
+                })
+                time_rows.append({
+                    'task': i,
+                    'creation_date': creation_date,
+                    'time_spent_minutes': random.randint(1, 120)
+                })
+        conn.execute(orm.tasks.insert(), task_rows)
+        conn.execute(orm.task_events.insert(), event_rows)
+        conn.execute(orm.time_tracker_entries.insert(), time_rows)
+
+
+def run(engine, n_projects: int, n_tasks: int, repeat: int) -> dict:
+    parameters = {
+        'project': n_projects // 2,
+        'today': datetime.now().date().strftime('%Y-%m-%d'),
+        'task': n_projects * n_tasks // 2,
+        'name': f'project_{n_projects // 2}',
+    }
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    results = {}
+    with engine.connect() as conn:
+        for name, query in QUERIES.items():
+            start = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(query, parameters).fetchall()
+            latency = (time.perf_counter() - start) / repeat
+            plan = conn.execute(f'EXPLAIN QUERY PLAN {query}',
+                                parameters).fetchall()
+            results[name] = (latency, ' | '.join(row[-1] for row in plan))
+    session = sessionmaker(engine)()
+    statements.clear()
+    start = time.perf_counter()
+    for project in session.query(entities.project.Project).all():
+        project.overdue_tasks
+        project.total_time_spent
+    results['list projects (orm)'] = (time.perf_counter() - start,
+                                      f'{len(statements)} queries')
+    statements.clear()
+    start = time.perf_counter()
+    views.project_statistics(session)
+    results['list projects (sql)'] = (time.perf_counter() - start,
+                                      f'{len(statements)} queries')
+    session.close()
+    event.remove(engine, 'before_cursor_execute', count_statement)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    orm.start_mappers()
+    with tempfile.NamedTemporaryFile(suffix='.db') as db:
+        engine = create_engine(f'sqlite:///{db.name}')
+        # the first migration creates the tables, the later ones the indexes
+        migrations.upgrade(engine, target=1)
+        populate(engine, args.projects, args.tasks)
+        before = run(engine, args.projects, args.tasks, args.repeat)
+        migrations.upgrade(engine)
+        engine.execute('ANALYZE')
+        after = run(engine, args.projects, args.tasks, args.repeat)
+
+    print(f'{"query":<22} {"before, ms":>11} {"after, ms":>10}  plan / queries')
+    for name, (latency, plan) in before.items():
+        latency_after, plan_after = after[name]
+        print(f'{name:<22} {latency * 1000:>11.3f} '
+              f'{latency_after * 1000:>10.3f}  {plan} -> {plan_after}')
+
+
+if __name__ == '__main__':
+    main()
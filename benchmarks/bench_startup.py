@@ -0,0 +1,54 @@
+"""Measures import time of the terka CLI with `python -X importtime`.
+
+Usage: python benchmarks/bench_startup.py [--budget-ms 200] [--top 15]
+
+Exits with a non-zero code when the cumulative import time of
+`terka.entrypoints.cli` exceeds the budget.
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+
+HEAVY_MODULES = ('pandas', 'textual', 'asana', 'rich.prompt', 'plotext',
+                 'matplotlib', 'numpy')
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Returns cumulative import time in microseconds per module."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--module', default='terka.entrypoints.cli')
+    parser.add_argument('--budget-ms', type=float, default=200)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    times = import_times(args.module)
+    for name, cumulative in sorted(times.items(),
+                                   key=lambda item: item[1])[-args.top:]:
+        print(f'{cumulative / 1000:>10.1f} ms  {name}')
+    if loaded := [module for module in HEAVY_MODULES if module in times]:
+        print(f'heavy modules imported at startup: {", ".join(loaded)}')
+    total = times[args.module] / 1000
+    print(f'{args.module}: {total:.1f} ms (budget {args.budget_ms:.0f} ms)')
+    if total > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
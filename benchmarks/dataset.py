@@ -0,0 +1,200 @@
+"""Generates a reproducible synthetic terka database.
+
+Every entity scales with the number of tasks, so the same seed and size
+always produce the same rows.
+
+Usage: python benchmarks/dataset.py --size 10k --output /tmp/terka.db
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+
+from terka.adapters import migrations
+from terka.adapters import orm
+
+SIZES = {'1k': 1_000, '10k': 10_000, '100k': 100_000}
+TASK_STATUSES = ('BACKLOG', 'TODO', 'IN_PROGRESS', 'REVIEW', 'DONE',
+                 'DELETED')
+TASK_STATUS_WEIGHTS = (30, 20, 10, 5, 30, 5)
+TASK_PRIORITIES = ('UNKNOWN', 'LOW', 'NORMAL', 'HIGH', 'URGENT')
+WORDS = ('api', 'backend', 'billing', 'cache', 'dashboard', 'deploy', 'docs',
+         'export', 'frontend', 'import', 'login', 'metrics', 'migration',
+         'notification', 'report', 'search', 'security', 'sync', 'test', 'ui')
+START_DATE = datetime(2023, 1, 2, 9, 0)
+
+
+def counts(n_tasks: int) -> dict[str, int]:
+    return {
+        'workspaces': max(1, n_tasks // 5_000),
+        'projects': max(1, n_tasks // 100),
+        'users': max(5, n_tasks // 500),
+        'tags': 50,
+        'sprints': max(1, n_tasks // 500),
+        'epics': max(1, n_tasks // 250),
+        'stories': max(1, n_tasks // 50),
+        'tasks': n_tasks,
+    }
+
+
+def _text(rng: random.Random, n_words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def _date(rng: random.Random, max_days: int = 365) -> datetime:
+    return START_DATE + timedelta(days=rng.randint(0, max_days),
+                                  minutes=rng.randint(0, 8 * 60))
+
+
+def rows(n_tasks: int, seed: int = 42) -> dict[str, list[dict]]:
+    """Builds rows for every table, keyed by table name."""
+    rng = random.Random(seed)
+    n = counts(n_tasks)
+    data: dict[str, list[dict]] = {table: [] for table in orm.metadata.tables}
+    data['workspaces'] = [{
+        'id': i,
+        'name': f'workspace_{i}',
+        'description': _text(rng, 5)
+    } for i in range(1, n['workspaces'] + 1)]
+    data['users'] = [{
+        'id': i,
+        'name': f'user_{i}'
+    } for i in range(1, n['users'] + 1)]
+    data['tags'] = [{
+        'id': i,
+        'text': f'tag_{i}'
+    } for i in range(1, n['tags'] + 1)]
+    data['projects'] = [{
+        'id': i,
+        'name': f'project_{i}',
+        'description': _text(rng, 8),
+        'status': rng.choices(('ACTIVE', 'ON_HOLD', 'COMPLETED'),
+                              (80, 10, 10))[0],
+        'workspace': rng.randint(1, n['workspaces'])
+    } for i in range(1, n['projects'] + 1)]
+    for composite in ('epics', 'stories'):
+        data[composite] = [{
+            'id': i,
+            'name': f'{composite[:-1]}_{i} {_text(rng, 3)}',
+            'creation_date': _date(rng),
+            'description': _text(rng, 15),
+            'project': rng.randint(1, n['projects']),
+            'assignee': rng.randint(1, n['users']),
+            'status': rng.choices(('ACTIVE', 'COMPLETED'), (70, 30))[0],
+            'created_by': rng.randint(1, n['users'])
+        } for i in range(1, n[composite] + 1)]
+    for i in range(1, n['sprints'] + 1):
+        start_date = (START_DATE + timedelta(weeks=2 * (i - 1))).date()
+        data['sprints'].append({
+            'id': i,
+            'start_date': start_date,
+            'end_date': start_date + timedelta(days=13),
+            'status': 'ACTIVE' if i == n['sprints'] else 'COMPLETED',
+            'capacity': 40,
+            'goal': _text(rng, 6),
+            'started_at': datetime.combine(start_date, datetime.min.time()),
+            'completed_at': None if i == n['sprints'] else datetime.combine(
+                start_date + timedelta(days=13), datetime.min.time())
+        })
+
+    for i in range(1, n_tasks + 1):
+        creation_date = _date(rng)
+        status = rng.choices(TASK_STATUSES, TASK_STATUS_WEIGHTS)[0]
+        data['tasks'].append({
+            'id': i,
+            'name': f'task_{i} {_text(rng, 4)}',
+            'creation_date': creation_date,
+            'modification_date': creation_date + timedelta(days=1),
+            'description': _text(rng, rng.randint(0, 30)) or None,
+            'project': rng.randint(1, n['projects']),
+            'assignee': rng.randint(1, n['users']),
+            'created_by': rng.randint(1, n['users']),
+            'due_date': (creation_date +
+                         timedelta(days=rng.randint(1, 60))).date(),
+            'status': status,
+            'priority': rng.choice(TASK_PRIORITIES),
+            'sync': True,
+            'completed_at': creation_date + timedelta(days=5)
+            if status == 'DONE' else None
+        })
+        for j in range(rng.randint(1, 5)):
+            data['task_events'].append({
+                'task': i,
+                'date': creation_date + timedelta(hours=j),
+                'type': 'STATUS',
+                'old_value': TASK_STATUSES[j % 5],
+                'new_value': TASK_STATUSES[(j + 1) % 5]
+            })
+        for j in range(rng.randint(0, 3)):
+            data['time_tracker_entries'].append({
+                'task': i,
+                'creation_date': creation_date + timedelta(days=j),
+                'time_spent_minutes': rng.randint(5, 120)
+            })
+        for j in range(rng.randint(0, 2)):
+            data['task_commentaries'].append({
+                'task': i,
+                'date': creation_date + timedelta(hours=j + 1),
+                'text': _text(rng, 10)
+            })
+        for tag in rng.sample(range(1, n['tags'] + 1), rng.randint(0, 2)):
+            data['task_tags'].append({'task': i, 'tag': tag})
+        if rng.random() < 0.3:
+            data['task_collaborators'].append({
+                'task': i,
+                'collaborator': rng.randint(1, n['users'])
+            })
+        if rng.random() < 0.2:
+            data['sprint_tasks'].append({
+                'task': i,
+                'sprint': rng.randint(1, n['sprints']),
+                'story_points': rng.choice((1, 2, 3, 5, 8)),
+                'is_active_link': True,
+                'unplanned': rng.random() < 0.1
+            })
+        if rng.random() < 0.3:
+            data['epic_tasks'].append({
+                'task': i,
+                'epic': rng.randint(1, n['epics'])
+            })
+        if rng.random() < 0.5:
+            data['story_tasks'].append({
+                'task': i,
+                'story': rng.randint(1, n['stories'])
+            })
+    return data
+
+
+def generate(engine, n_tasks: int, seed: int = 42) -> dict[str, int]:
+    """Creates the schema and fills it; returns row counts per table."""
+    migrations.upgrade(engine)
+    data = rows(n_tasks, seed)
+    with engine.begin() as conn:
+        for table in orm.metadata.sorted_tables:
+            if table_rows := data.get(table.name):
+                conn.execute(table.insert(), table_rows)
+    return {table: len(rows) for table, rows in data.items() if rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', choices=SIZES, default='1k')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='terka.db')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = generate(create_engine(f'sqlite:///{args.output}'),
+                       SIZES[args.size], args.seed)
+    for table, n_rows in written.items():
+        print(f'{table:<22} {n_rows:>8}')
+    print(f'Generated {args.output} in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
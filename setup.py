@@ -8,7 +8,7 @@ from setuptools import setup
 
 HERE = pathlib.Path(__file__)
 README = (HERE.parent / 'README.md').read_text()
-EXTRAS_REQUIRE = {'asana': ['asana==5.0.0']}
+EXTRAS_REQUIRE = {'asana': ['asana==5.0.0'], 'asgi': ['uvicorn']}
 
 EXTRAS_REQUIRE['all'] = list(set(chain(*EXTRAS_REQUIRE.values())))
 
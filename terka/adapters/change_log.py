@@ -0,0 +1,199 @@
+"""Change log filled by triggers for incremental sync.
+
+Every insert, update and delete of a synced table appends a row to
+`change_log`. Its INTEGER PRIMARY KEY grows with every write, so it is
+both the commit order and the cursor clients resume from; reading the
+changes after a cursor is a range scan of the primary key. Rows linked to
+a task or a project (tags, sprints, collaborators, tracked time) log an
+update of the entity they belong to.
+
+The log costs one extra row per write and is only bounded by `prune`;
+clients whose cursor points before the pruned changes have to resync.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+
+from sqlalchemy import text
+
+RETENTION_DAYS = 30
+
+
+@dataclass(frozen=True)
+class ChangeSource:
+    table: str
+    entity_type: str
+    # soft deleted rows get status DELETED instead of being removed
+    soft_delete: bool
+
+
+CHANGE_SOURCES = (
+    ChangeSource('tasks', 'task', True),
+    ChangeSource('projects', 'project', True),
+    ChangeSource('sprints', 'sprint', True),
+    ChangeSource('task_commentaries', 'task_commentary', False),
+    ChangeSource('project_commentaries', 'project_commentary', False),
+)
+# logged since migration 7
+PLANNING_CHANGE_SOURCES = (
+    ChangeSource('epics', 'epic', True),
+    ChangeSource('stories', 'story', True),
+    ChangeSource('epic_commentaries', 'epic_commentary', False),
+    ChangeSource('story_commentaries', 'story_commentary', False),
+    ChangeSource('sprint_commentaries', 'sprint_commentary', False),
+)
+
+
+@dataclass(frozen=True)
+class ChangeLink:
+    table: str
+    # column referencing the entity the row belongs to
+    column: str
+    entity_type: str
+
+
+CHANGE_LINKS = (
+    ChangeLink('task_tags', 'task', 'task'),
+    ChangeLink('task_collaborators', 'task', 'task'),
+    ChangeLink('sprint_tasks', 'task', 'task'),
+    ChangeLink('epic_tasks', 'task', 'task'),
+    ChangeLink('story_tasks', 'task', 'task'),
+    ChangeLink('time_tracker_entries', 'task', 'task'),
+    ChangeLink('project_tags', 'project', 'project'),
+    ChangeLink('project_collaborators', 'project', 'project'),
+)
+
+
+@dataclass(frozen=True)
+class Change:
+    cursor: int
+    entity_type: str
+    entity_id: int
+    operation: str
+    changed_at: datetime
+
+
+def _insert(entity_type: str, entity_id: str, operation: str) -> str:
+    return ('INSERT INTO change_log '
+            '(entity_type, entity_id, operation, changed_at) '
+            f"VALUES ('{entity_type}', {entity_id}, {operation}, "
+            'CURRENT_TIMESTAMP);')
+
+
+def _triggers(source: ChangeSource) -> list[str]:
+    updated = ("CASE WHEN new.status = 'DELETED' THEN 'deleted' "
+               "ELSE 'updated' END") if source.soft_delete else "'updated'"
+    statements = {
+        'insert': _insert(source.entity_type, 'new.id', "'created'"),
+        'update': _insert(source.entity_type, 'new.id', updated),
+        'delete': _insert(source.entity_type, 'old.id', "'deleted'"),
+    }
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {source.table}_change_log_{operation} '
+        f'AFTER {operation.upper()} ON {source.table} BEGIN {statement} END'
+        for operation, statement in statements.items()
+    ]
+
+
+def _link_triggers(link: ChangeLink) -> list[str]:
+    triggers = []
+    for operation, row in (('insert', 'new'), ('update', 'new'),
+                           ('delete', 'old')):
+        entity_id = f'{row}.{link.column}'
+        statement = _insert(link.entity_type, entity_id, "'updated'")
+        triggers.append(
+            f'CREATE TRIGGER IF NOT EXISTS '
+            f'{link.table}_change_log_{operation} '
+            f'AFTER {operation.upper()} ON {link.table} '
+            f'WHEN {entity_id} IS NOT NULL BEGIN {statement} END')
+    return triggers
+
+
+def create_change_log(connection) -> None:
+    """Creates the log with existing rows recorded as created."""
+    connection.execute(
+        text('CREATE TABLE IF NOT EXISTS change_log ('
+             'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+             'entity_type VARCHAR(50) NOT NULL, '
+             'entity_id INTEGER NOT NULL, '
+             'operation VARCHAR(10) NOT NULL, '
+             'changed_at DATETIME NOT NULL)'))
+    if not connection.execute(text('SELECT 1 FROM change_log')).scalar():
+        for source in CHANGE_SOURCES:
+            _log_existing(connection, source)
+    for source in CHANGE_SOURCES:
+        for trigger in _triggers(source):
+            connection.execute(text(trigger))
+
+
+def add_change_sources(connection, sources: tuple[ChangeSource, ...]) -> None:
+    """Starts logging `sources`, existing rows are recorded as created."""
+    for source in sources:
+        _log_existing(connection, source)
+        for trigger in _triggers(source):
+            connection.execute(text(trigger))
+
+
+def _log_existing(connection, source: ChangeSource) -> None:
+    existing = ("WHERE status IS NOT 'DELETED' "
+                if source.soft_delete else '')
+    connection.execute(
+        text('INSERT INTO change_log '
+             '(entity_type, entity_id, operation, changed_at) '
+             f"SELECT '{source.entity_type}', id, 'created', "
+             f'CURRENT_TIMESTAMP FROM {source.table} '
+             f'{existing}ORDER BY id'))
+
+
+def create_link_triggers(connection) -> None:
+    for link in CHANGE_LINKS:
+        for trigger in _link_triggers(link):
+            connection.execute(text(trigger))
+
+
+def prune(connection, retention: timedelta) -> int:
+    """Deletes changes older than `retention`, returns how many."""
+    # ids grow with changed_at, the scan stops at the first change kept
+    return connection.execute(
+        text('DELETE FROM change_log WHERE id < COALESCE('
+             '(SELECT id FROM change_log WHERE changed_at >= '
+             "datetime('now', :modifier) ORDER BY id LIMIT 1), "
+             '(SELECT MAX(id) + 1 FROM change_log))'),
+        {'modifier': f'-{int(retention.total_seconds())} seconds'}).rowcount
+
+
+def cursors(connection) -> tuple[int, int]:
+    """Returns the oldest cursor changes are kept after and the latest one.
+
+    Cursors before the oldest one have missed pruned changes.
+    """
+    # AUTOINCREMENT keeps the last id in sqlite_sequence after pruning
+    oldest, latest = connection.execute(
+        text('SELECT MIN(id) - 1, MAX(id) FROM change_log')).one()
+    if latest is None:
+        latest = connection.execute(
+            text("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+                 )).scalar() or 0
+        oldest = latest
+    return oldest, latest
+
+
+def changes(connection, since: int, limit: int) -> list[Change]:
+    """Returns up to `limit` changes recorded after the `since` cursor."""
+    rows = connection.execute(
+        text('SELECT id, entity_type, entity_id, operation, changed_at '
+             'FROM change_log WHERE id > :since ORDER BY id LIMIT :limit'), {
+                 'since': since,
+                 'limit': limit
+             })
+    return [
+        Change(cursor,
+               entity_type,
+               entity_id,
+               operation,
+               datetime.fromisoformat(changed_at)
+               if isinstance(changed_at, str) else changed_at)
+        for cursor, entity_type, entity_id, operation, changed_at in rows
+    ]
@@ -0,0 +1,50 @@
+"""Global data version bumped by triggers on every write.
+
+Readers compare the version instead of rebuilding a result to find out
+whether anything changed since their last read.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import text
+
+
+@dataclass(frozen=True)
+class DataVersion:
+    version: int
+    modified_at: datetime
+
+
+def _triggers(table: str) -> list[str]:
+    bump = ('UPDATE data_version SET version = version + 1, '
+            'modified_at = CURRENT_TIMESTAMP;')
+    name = table.replace('.', '_')
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {name}_data_version_{operation} '
+        f'AFTER {operation.upper()} ON "{table}" BEGIN {bump} END'
+        for operation in ('insert', 'update', 'delete')
+    ]
+
+
+def create_data_version(connection, tables: Iterable[str]) -> None:
+    connection.execute(
+        text('CREATE TABLE IF NOT EXISTS data_version ('
+             'version INTEGER NOT NULL, '
+             'modified_at DATETIME NOT NULL)'))
+    if not connection.execute(text('SELECT 1 FROM data_version')).scalar():
+        connection.execute(
+            text('INSERT INTO data_version VALUES (1, CURRENT_TIMESTAMP)'))
+    for table in tables:
+        for trigger in _triggers(table):
+            connection.execute(text(trigger))
+
+
+def get(connection) -> DataVersion:
+    version, modified_at = connection.execute(
+        text('SELECT version, modified_at FROM data_version')).one()
+    if isinstance(modified_at, str):
+        modified_at = datetime.fromisoformat(modified_at)
+    return DataVersion(version, modified_at)
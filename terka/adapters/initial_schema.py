@@ -0,0 +1,311 @@
+"""Schema created by migrations 1 and 2.
+
+Frozen as DDL: later migrations change tables with their own statements,
+so a fresh database goes through exactly the same steps as an old one.
+Do not edit, add a migration instead.
+"""
+from __future__ import annotations
+
+TABLE_NAMES = (
+    'tasks', 'projects', 'workspaces', 'task_events', 'project_events',
+    'commentaries', 'task_commentaries', 'project_commentaries',
+    'epic_commentaries', 'story_commentaries', 'sprint_commentaries',
+    'task_notes', 'project_notes', 'epic_notes', 'story_notes', 'sprint_notes',
+    'users', 'tags', 'task_tags', 'project_tags', 'task_collaborators',
+    'project_collaborators', 'sprints', 'sprint_tasks', 'time_tracker_entries',
+    'epics', 'epic_tasks', 'stories', 'story_tasks',
+    'external_connectors.asana.tasks', 'external_connectors.asana.projects',
+    'external_connectors.asana.users',
+)
+
+TABLES = (
+    ('CREATE TABLE IF NOT EXISTS sprints ('
+     'id INTEGER NOT NULL, '
+     'start_date DATE NOT NULL, '
+     'end_date DATE NOT NULL, '
+     'status VARCHAR(9), '
+     'capacity INTEGER NOT NULL, '
+     'goal VARCHAR(225), '
+     'started_at DATETIME, '
+     'completed_at DATETIME, '
+     'PRIMARY KEY (id))'),
+    ('CREATE TABLE IF NOT EXISTS tags ('
+     'id INTEGER NOT NULL, '
+     'text VARCHAR(50), '
+     'PRIMARY KEY (id))'),
+    ('CREATE TABLE IF NOT EXISTS users ('
+     'id INTEGER NOT NULL, '
+     'name VARCHAR(50), '
+     'PRIMARY KEY (id))'),
+    ('CREATE TABLE IF NOT EXISTS workspaces ('
+     'id INTEGER NOT NULL, '
+     'name VARCHAR(255), '
+     'description VARCHAR(255), '
+     'PRIMARY KEY (id))'),
+    ('CREATE TABLE IF NOT EXISTS "external_connectors.asana.users" ('
+     'id INTEGER NOT NULL, '
+     'asana_user_id VARCHAR(20), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(id) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS projects ('
+     'id INTEGER NOT NULL, '
+     'name VARCHAR(255), '
+     'description VARCHAR(255), '
+     'status VARCHAR(9), '
+     'workspace INTEGER, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(workspace) REFERENCES workspaces (id))'),
+    ('CREATE TABLE IF NOT EXISTS sprint_commentaries ('
+     'id INTEGER NOT NULL, '
+     'sprint INTEGER, '
+     'date DATETIME NOT NULL, '
+     'text VARCHAR(225), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(sprint) REFERENCES sprints (id))'),
+    ('CREATE TABLE IF NOT EXISTS sprint_notes ('
+     'id INTEGER NOT NULL, '
+     'sprint INTEGER, '
+     'created_by INTEGER, '
+     'date DATETIME NOT NULL, '
+     'name VARCHAR(225), '
+     'text VARCHAR(1000), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(sprint) REFERENCES sprints (id), '
+     'FOREIGN KEY(created_by) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS epics ('
+     'id INTEGER NOT NULL, '
+     'name VARCHAR(255), '
+     'creation_date DATETIME, '
+     'description VARCHAR(1000), '
+     'project INTEGER, '
+     'assignee INTEGER, '
+     'status VARCHAR(9), '
+     'created_by INTEGER, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(project) REFERENCES projects (id), '
+     'FOREIGN KEY(assignee) REFERENCES users (id), '
+     'FOREIGN KEY(created_by) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS "external_connectors.asana.projects" ('
+     'id INTEGER NOT NULL, '
+     'asana_project_id VARCHAR(20), '
+     'sync_date DATETIME, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(id) REFERENCES projects (id))'),
+    ('CREATE TABLE IF NOT EXISTS project_collaborators ('
+     'id INTEGER NOT NULL, '
+     'project INTEGER, '
+     'collaborator INTEGER, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(project) REFERENCES projects (id), '
+     'FOREIGN KEY(collaborator) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS project_commentaries ('
+     'id INTEGER NOT NULL, '
+     'project INTEGER, '
+     'date DATETIME NOT NULL, '
+     'text VARCHAR(225), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(project) REFERENCES projects (id))'),
+    ('CREATE TABLE IF NOT EXISTS project_events ('
+     'id INTEGER NOT NULL, '
+     'project INTEGER, '
+     'date DATETIME NOT NULL, '
+     'type VARCHAR(19), '
+     'old_value VARCHAR(225), '
+     'new_value VARCHAR(225), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(project) REFERENCES projects (id))'),
+    ('CREATE TABLE IF NOT EXISTS project_notes ('
+     'id INTEGER NOT NULL, '
+     'project INTEGER, '
+     'created_by INTEGER, '
+     'date DATETIME NOT NULL, '
+     'name VARCHAR(225), '
+     'text VARCHAR(1000), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(project) REFERENCES projects (id), '
+     'FOREIGN KEY(created_by) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS project_tags ('
+     'id INTEGER NOT NULL, '
+     'project INTEGER, '
+     'tag INTEGER, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(project) REFERENCES projects (id), '
+     'FOREIGN KEY(tag) REFERENCES tags (id))'),
+    ('CREATE TABLE IF NOT EXISTS stories ('
+     'id INTEGER NOT NULL, '
+     'name VARCHAR(255), '
+     'creation_date DATETIME, '
+     'description VARCHAR(1000), '
+     'project INTEGER, '
+     'assignee INTEGER, '
+     'status VARCHAR(9), '
+     'created_by INTEGER, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(project) REFERENCES projects (id), '
+     'FOREIGN KEY(assignee) REFERENCES users (id), '
+     'FOREIGN KEY(created_by) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS tasks ('
+     'id INTEGER NOT NULL, '
+     'name VARCHAR(255), '
+     'creation_date DATETIME, '
+     'modification_date DATETIME, '
+     'description VARCHAR(1000), '
+     'project INTEGER, '
+     'assignee INTEGER, '
+     'created_by INTEGER, '
+     'due_date DATE, '
+     'status VARCHAR(11), '
+     'priority VARCHAR(7), '
+     'sync BOOLEAN, '
+     'completed_at DATETIME, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(project) REFERENCES projects (id), '
+     'FOREIGN KEY(assignee) REFERENCES users (id), '
+     'FOREIGN KEY(created_by) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS commentaries ('
+     'id INTEGER NOT NULL, '
+     'source VARCHAR(50), '
+     'task INTEGER, '
+     'element_id INTEGER, '
+     'date DATETIME NOT NULL, '
+     'text VARCHAR(225), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id))'),
+    ('CREATE TABLE IF NOT EXISTS epic_commentaries ('
+     'id INTEGER NOT NULL, '
+     'epic INTEGER, '
+     'date DATETIME NOT NULL, '
+     'text VARCHAR(225), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(epic) REFERENCES epics (id))'),
+    ('CREATE TABLE IF NOT EXISTS epic_notes ('
+     'id INTEGER NOT NULL, '
+     'epic INTEGER, '
+     'created_by INTEGER, '
+     'date DATETIME NOT NULL, '
+     'name VARCHAR(225), '
+     'text VARCHAR(1000), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(epic) REFERENCES epics (id), '
+     'FOREIGN KEY(created_by) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS epic_tasks ('
+     'id INTEGER NOT NULL, '
+     'task INTEGER NOT NULL, '
+     'epic INTEGER NOT NULL, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id), '
+     'FOREIGN KEY(epic) REFERENCES epics (id))'),
+    ('CREATE TABLE IF NOT EXISTS "external_connectors.asana.tasks" ('
+     'project INTEGER, '
+     'id INTEGER NOT NULL, '
+     'asana_task_id VARCHAR(20), '
+     'sync_date DATETIME, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(project) REFERENCES projects (id), '
+     'FOREIGN KEY(id) REFERENCES tasks (id))'),
+    ('CREATE TABLE IF NOT EXISTS sprint_tasks ('
+     'id INTEGER NOT NULL, '
+     'task INTEGER NOT NULL, '
+     'sprint INTEGER NOT NULL, '
+     'story_points INTEGER NOT NULL, '
+     'is_active_link BOOLEAN NOT NULL, '
+     'unplanned BOOLEAN NOT NULL, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id), '
+     'FOREIGN KEY(sprint) REFERENCES sprints (id))'),
+    ('CREATE TABLE IF NOT EXISTS story_commentaries ('
+     'id INTEGER NOT NULL, '
+     'story INTEGER, '
+     'date DATETIME NOT NULL, '
+     'text VARCHAR(225), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(story) REFERENCES stories (id))'),
+    ('CREATE TABLE IF NOT EXISTS story_notes ('
+     'id INTEGER NOT NULL, '
+     'story INTEGER, '
+     'created_by INTEGER, '
+     'date DATETIME NOT NULL, '
+     'name VARCHAR(225), '
+     'text VARCHAR(1000), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(story) REFERENCES stories (id), '
+     'FOREIGN KEY(created_by) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS story_tasks ('
+     'id INTEGER NOT NULL, '
+     'task INTEGER NOT NULL, '
+     'story INTEGER NOT NULL, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id), '
+     'FOREIGN KEY(story) REFERENCES stories (id))'),
+    ('CREATE TABLE IF NOT EXISTS task_collaborators ('
+     'id INTEGER NOT NULL, '
+     'task INTEGER, '
+     'collaborator INTEGER, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id), '
+     'FOREIGN KEY(collaborator) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS task_commentaries ('
+     'id INTEGER NOT NULL, '
+     'task INTEGER, '
+     'date DATETIME NOT NULL, '
+     'text VARCHAR(225), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id))'),
+    ('CREATE TABLE IF NOT EXISTS task_events ('
+     'id INTEGER NOT NULL, '
+     'task INTEGER, '
+     'date DATETIME NOT NULL, '
+     'type VARCHAR(19), '
+     'old_value VARCHAR(225), '
+     'new_value VARCHAR(225), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id))'),
+    ('CREATE TABLE IF NOT EXISTS task_notes ('
+     'id INTEGER NOT NULL, '
+     'task INTEGER, '
+     'created_by INTEGER, '
+     'date DATETIME NOT NULL, '
+     'name VARCHAR(225), '
+     'text VARCHAR(1000), '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id), '
+     'FOREIGN KEY(created_by) REFERENCES users (id))'),
+    ('CREATE TABLE IF NOT EXISTS task_tags ('
+     'id INTEGER NOT NULL, '
+     'task INTEGER, '
+     'tag INTEGER, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id), '
+     'FOREIGN KEY(tag) REFERENCES tags (id))'),
+    ('CREATE TABLE IF NOT EXISTS time_tracker_entries ('
+     'id INTEGER NOT NULL, '
+     'creation_date DATETIME, '
+     'task INTEGER NOT NULL, '
+     'time_spent_minutes INTEGER NOT NULL, '
+     'PRIMARY KEY (id), '
+     'FOREIGN KEY(task) REFERENCES tasks (id))'),
+)
+
+INDEXES = (
+    'CREATE INDEX IF NOT EXISTS ix_tags_text ON tags (text)',
+    'CREATE INDEX IF NOT EXISTS ix_users_name ON users (name)',
+    'CREATE INDEX IF NOT EXISTS ix_workspaces_name ON workspaces (name)',
+    'CREATE INDEX IF NOT EXISTS ix_projects_name ON projects (name)',
+    ('CREATE INDEX IF NOT EXISTS ix_tasks_project_status'
+     ' ON tasks (project, status)'),
+    'CREATE INDEX IF NOT EXISTS ix_tasks_due_date ON tasks (due_date)',
+    'CREATE INDEX IF NOT EXISTS ix_epic_tasks_epic ON epic_tasks (epic)',
+    'CREATE INDEX IF NOT EXISTS ix_epic_tasks_task ON epic_tasks (task)',
+    ('CREATE INDEX IF NOT EXISTS ix_sprint_tasks_sprint'
+     ' ON sprint_tasks (sprint)'),
+    'CREATE INDEX IF NOT EXISTS ix_sprint_tasks_task ON sprint_tasks (task)',
+    'CREATE INDEX IF NOT EXISTS ix_story_tasks_story ON story_tasks (story)',
+    'CREATE INDEX IF NOT EXISTS ix_story_tasks_task ON story_tasks (task)',
+    ('CREATE INDEX IF NOT EXISTS ix_task_collaborators_task'
+     ' ON task_collaborators (task)'),
+    ('CREATE INDEX IF NOT EXISTS ix_task_events_task_type_date'
+     ' ON task_events (task, type, date)'),
+    'CREATE INDEX IF NOT EXISTS ix_task_tags_task ON task_tags (task)',
+    ('CREATE INDEX IF NOT EXISTS ix_time_tracker_entries_task_creation_date'
+     ' ON time_tracker_entries (task, creation_date)'),
+)
@@ -0,0 +1,131 @@
+"""Versioned schema migrations.
+
+Applied migrations are recorded in the `schema_version` table; startup
+only compares its latest version with `HEAD` and runs DDL when the
+database is behind. Migrations never read the live `orm` tables, so a
+schema change has to come with a new migration.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import exc
+from sqlalchemy import text
+
+from terka.adapters import change_log
+from terka.adapters import data_version
+from terka.adapters import initial_schema
+from terka.adapters import search
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable
+
+
+def _create_tables(connection) -> None:
+    # databases created before migrations existed already have the tables,
+    # only the missing ones are created
+    for statement in initial_schema.TABLES:
+        connection.execute(text(statement))
+
+
+def _create_indexes(connection) -> None:
+    for statement in initial_schema.INDEXES:
+        connection.execute(text(statement))
+
+
+def _create_search_index(connection) -> None:
+    if connection.dialect.name == 'sqlite':
+        search.create_search_index(connection)
+
+
+def _create_data_version(connection) -> None:
+    if connection.dialect.name == 'sqlite':
+        data_version.create_data_version(connection,
+                                         initial_schema.TABLE_NAMES)
+
+
+def _create_change_log(connection) -> None:
+    if connection.dialect.name == 'sqlite':
+        change_log.create_change_log(connection)
+
+
+def _create_change_log_links(connection) -> None:
+    if connection.dialect.name == 'sqlite':
+        change_log.create_link_triggers(connection)
+
+
+def _add_planning_change_sources(connection) -> None:
+    if connection.dialect.name == 'sqlite':
+        change_log.add_change_sources(connection,
+                                      change_log.PLANNING_CHANGE_SOURCES)
+
+
+MIGRATIONS = (
+    Migration(1, 'initial schema', _create_tables),
+    Migration(2, 'indexes for common lookups', _create_indexes),
+    Migration(3, 'full-text search index', _create_search_index),
+    Migration(4, 'data version for conditional requests',
+              _create_data_version),
+    Migration(5, 'change log for incremental sync', _create_change_log),
+    Migration(6, 'change log for tags, sprints and tracked time',
+              _create_change_log_links),
+    Migration(7, 'change log for epics, stories and their comments',
+              _add_planning_change_sources),
+)
+HEAD = MIGRATIONS[-1].version
+
+
+def current_version(engine) -> int:
+    with engine.connect() as conn:
+        try:
+            return conn.execute(
+                text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+        except (exc.OperationalError, exc.ProgrammingError):
+            return 0
+
+
+def upgrade(engine, target: int | None = None) -> list[Migration]:
+    """Applies pending migrations up to `target` (latest by default).
+
+    The version is read again and the migrations are applied in a single
+    write transaction, so processes starting together migrate only once.
+    """
+    target = HEAD if target is None else target
+    if current_version(engine) >= target:
+        return []
+    applied = []
+    with engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            # taken before SQLAlchemy begins the transaction, which then
+            # continues it; waits for another process to finish migrating
+            conn.connection.cursor().execute('BEGIN IMMEDIATE')
+        with conn.begin():
+            conn.execute(
+                text('CREATE TABLE IF NOT EXISTS schema_version ('
+                     'version INTEGER PRIMARY KEY, '
+                     'description VARCHAR(255), '
+                     'applied_at DATETIME)'))
+            version = conn.execute(
+                text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+            for migration in MIGRATIONS:
+                if not version < migration.version <= target:
+                    continue
+                logging.info('Applying migration %d: %s', migration.version,
+                             migration.description)
+                migration.upgrade(conn)
+                conn.execute(
+                    text('INSERT INTO schema_version '
+                         'VALUES (:version, :description, :applied_at)'), {
+                             'version': migration.version,
+                             'description': migration.description,
+                             'applied_at': datetime.now()
+                         })
+                applied.append(migration)
+    return applied
@@ -6,6 +6,7 @@ from sqlalchemy import Date
 from sqlalchemy import DateTime
 from sqlalchemy import Enum
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import MetaData
 from sqlalchemy import String
@@ -305,7 +306,27 @@ asana_users = Table(
     Column('asana_user_id', String(20)))
 
 
-def start_mappers(engine=None):
+Index('ix_tasks_project_status', tasks.c.project, tasks.c.status)
+Index('ix_tasks_due_date', tasks.c.due_date)
+Index('ix_task_events_task_type_date', task_events.c.task, task_events.c.type,
+      task_events.c.date)
+Index('ix_time_tracker_entries_task_creation_date', time_tracker_entries.c.task,
+      time_tracker_entries.c.creation_date)
+Index('ix_sprint_tasks_sprint', sprint_tasks.c.sprint)
+Index('ix_sprint_tasks_task', sprint_tasks.c.task)
+Index('ix_epic_tasks_epic', epic_tasks.c.epic)
+Index('ix_epic_tasks_task', epic_tasks.c.task)
+Index('ix_story_tasks_story', story_tasks.c.story)
+Index('ix_story_tasks_task', story_tasks.c.task)
+Index('ix_task_tags_task', task_tags.c.task)
+Index('ix_task_collaborators_task', task_collaborators.c.task)
+Index('ix_projects_name', projects.c.name)
+Index('ix_users_name', users.c.name)
+Index('ix_workspaces_name', workspaces.c.name)
+Index('ix_tags_text', tags.c.text)
+
+
+def start_mappers():
     asana_task_mapper = mapper(asana.AsanaTask, asana_tasks)
     asana_project_mapper = mapper(asana.AsanaProject, asana_projects)
     asana_user_mapper = mapper(asana.AsanaUser, asana_users)
@@ -521,5 +542,3 @@ def start_mappers(engine=None):
                                   relationship(project_mapper,
                                                collection_class=list),
                               })
-    if engine:
-        metadata.create_all(engine)
@@ -1,14 +1,45 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
 import logging
+import queue
+import re
+import threading
+from collections import deque
 from dataclasses import asdict
+from typing import Callable
+from typing import Collection
+from typing import Iterable
 
 from terka.domain import events
 
 
+def topic(event: events.Event) -> str:
+    """Entity an event is about, i.e. `task` for TaskUpdated."""
+    return re.match('[A-Z][a-z]*', type(event).__name__).group().lower()
+
+
+def server_sent_event(event: events.Event) -> str:
+    return (f'event: {type(event).__name__}\n'
+            f'data: {json.dumps(asdict(event), default=str)}\n\n')
+
+
+Message = tuple[str, events.Event]
+
+
 class BasePublisher:
-    ...
+
+    def publish(self, topic: str, event: events.Event):
+        ...
+
+    def publish_many(self, messages: Iterable[Message]):
+        for topic, event in messages:
+            self.publish(topic, event)
+
+    def close(self) -> None:
+        ...
 
 
 class RedisPublisher(BasePublisher):
@@ -20,12 +51,244 @@ class RedisPublisher(BasePublisher):
         self.topic_prefix = topic_prefix
 
     def publish(self, topic: str, event: events.Event):
+        self.client.publish(*self._message(topic, event))
+
+    def publish_many(self, messages: Iterable[Message]):
+        """Sends all messages in one round trip when the client pipelines."""
+        if not hasattr(self.client, 'pipeline'):
+            return super().publish_many(messages)
+        pipeline = self.client.pipeline(transaction=False)
+        for topic, event in messages:
+            pipeline.publish(*self._message(topic, event))
+        pipeline.execute()
+
+    def _message(self, topic: str, event: events.Event) -> tuple[str, str]:
         if self.topic_prefix:
             topic = f'{self.topic_prefix}_{topic}'
-        self.client.publish(topic, json.dumps(asdict(event)))
+        return topic, json.dumps(asdict(event), default=str)
 
 
 class LogPublisher(BasePublisher):
 
     def publish(self, topic: str, event: events.Event):
-        logging.info("Published to topic '%s': %s", topic, asdict(event))
+        logging.debug("Published to topic '%s': %s", topic, event)
+
+
+class Subscription:
+    """Bounded buffer of events for one subscriber.
+
+    When a slow subscriber falls `max_size` events behind the oldest ones
+    are dropped and counted in `dropped`, so the subscriber knows to
+    reload instead of applying changes one by one (see `take_dropped`).
+    """
+
+    def __init__(self,
+                 topics: Collection[str] | None = None,
+                 max_size: int = 256) -> None:
+        self.topics = frozenset(topics) if topics else None
+        self.max_size = max_size
+        self.dropped = 0
+        self._buffer: deque[events.Event] = deque()
+        self._condition = threading.Condition()
+        self._wakers: list[Callable[[], None]] = []
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def put(self, event: events.Event) -> None:
+        with self._condition:
+            if len(self._buffer) >= self.max_size:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(event)
+            self._condition.notify()
+            wakers = list(self._wakers)
+        for wake in wakers:
+            wake()
+
+    def take_dropped(self) -> int:
+        """Number of events dropped since the last call."""
+        with self._condition:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    def get(self, timeout: float | None = None) -> events.Event | None:
+        """Waits up to `timeout` seconds for the next event."""
+        with self._condition:
+            if not self._buffer:
+                self._condition.wait(timeout)
+            return self._buffer.popleft() if self._buffer else None
+
+    async def get_async(self, timeout: float) -> events.Event | None:
+        """Like `get` but waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(ready.set)
+
+        with self._condition:
+            if self._buffer:
+                return self._buffer.popleft()
+            self._wakers.append(wake)
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._wakers.remove(wake)
+        return self.get(timeout=0)
+
+
+class FanoutPublisher(BasePublisher):
+    """Pushes events to in-process subscribers, i.e. SSE clients.
+
+    Events are also passed to `publisher` if one is given.
+    """
+
+    def __init__(self,
+                 publisher: BasePublisher | None = None,
+                 max_buffer_size: int = 256) -> None:
+        self.publisher = publisher
+        self.max_buffer_size = max_buffer_size
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self,
+                  topics: Collection[str] | None = None) -> Subscription:
+        subscription = Subscription(topics, self.max_buffer_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, topic: str, event: events.Event):
+        self.publish_many([(topic, event)])
+
+    def publish_many(self, messages: Iterable[Message]):
+        messages = list(messages)
+        if self.publisher:
+            self.publisher.publish_many(messages)
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for topic, event in messages:
+            for subscription in subscriptions:
+                if subscription.wants(topic):
+                    subscription.put(event)
+
+    def close(self) -> None:
+        if self.publisher:
+            self.publisher.close()
+
+
+class CompositePublisher(BasePublisher):
+    """Publishes every event to each of `publishers`."""
+
+    def __init__(self, publishers: Iterable[BasePublisher]) -> None:
+        self.publishers = list(publishers)
+
+    def publish(self, topic: str, event: events.Event):
+        for publisher in self.publishers:
+            publisher.publish(topic, event)
+
+    def publish_many(self, messages: Iterable[Message]):
+        messages = list(messages)
+        for publisher in self.publishers:
+            publisher.publish_many(messages)
+
+    def close(self) -> None:
+        for publisher in self.publishers:
+            publisher.close()
+
+
+class BatchingPublisher(BasePublisher):
+    """Hands events to `publisher` from a background thread.
+
+    Publishing only enqueues an event; the thread takes whatever is queued
+    (up to `batch_size` events) and passes it to `publisher.publish_many`
+    at once. When `max_queue_size` events are waiting new ones are dropped
+    (`overflow='drop'`, counted in `dropped`) or the caller waits
+    (`overflow='block'`). Queued events are flushed on `close`, which
+    also runs at interpreter exit.
+    """
+
+    def __init__(self,
+                 publisher: BasePublisher,
+                 max_queue_size: int = 10_000,
+                 batch_size: int = 500,
+                 overflow: str = 'drop') -> None:
+        if overflow not in ('drop', 'block'):
+            raise ValueError(
+                f'Invalid overflow policy {overflow}, expected drop or block')
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.dropped = 0
+        self._queue: queue.Queue[Message | None] = queue.Queue(max_queue_size)
+        self._closed = False
+        # nothing is enqueued after the sentinel put by `close`
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run,
+                                        name='terka-publisher',
+                                        daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def publish(self, topic: str, event: events.Event):
+        with self._lock:
+            if not self._closed:
+                self._enqueue((topic, event))
+                return
+        self.publisher.publish(topic, event)
+
+    def flush(self) -> None:
+        """Waits until every queued event is handed to the publisher."""
+        self._queue.join()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+        self.publisher.close()
+        atexit.unregister(self.close)
+
+    def _enqueue(self, message: Message) -> None:
+        # called under the lock, the background thread never takes it, so
+        # a blocking put still gets room
+        if self.overflow == 'block':
+            self._queue.put(message)
+            return
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            if not self.dropped:
+                logging.warning('Publisher queue is full, dropping events')
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            messages = [message for message in batch if message is not None]
+            try:
+                if messages:
+                    self.publisher.publish_many(messages)
+            except Exception:
+                logging.exception('Failed to publish %d events',
+                                  len(messages))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(messages) < len(batch):
+                return
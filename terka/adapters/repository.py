@@ -1,18 +1,122 @@
 from __future__ import annotations
 
 import abc
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
 from collections.abc import MutableSequence
 from datetime import datetime
 from datetime import timedelta
 
+from sqlalchemy import and_
+from sqlalchemy import inspect
+from sqlalchemy import or_
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm import selectinload
+
+from terka.domain.entities.collaborator import TaskCollaborator
 from terka.domain.entities.entity import Entity
 from terka.domain.entities.event_history import TaskEvent
+from terka.domain.entities.sprint import Sprint
+from terka.domain.entities.sprint import SprintTask
+from terka.domain.entities.tag import BaseTag
+from terka.domain.entities.tag import TaskTag
+from terka.domain.entities.task import Task
+
+
+def _task_paths(*prefix) -> list[tuple]:
+    return [
+        (*prefix, Task.history),
+        (*prefix, Task.time_spent),
+        (*prefix, Task.project_),
+        (*prefix, Task.tags, TaskTag.base_tag),
+        (*prefix, Task.collaborators, TaskCollaborator.users),
+    ]
+
+
+# Each profile lists relationship paths that are loaded with one
+# SELECT ... IN query per path, regardless of the number of parent rows.
+LOADING_PROFILES = {
+    'sprint_dashboard':
+    lambda: [(Sprint.tasks, SprintTask.tasks, Task.time_spent),
+             (Sprint.tasks, SprintTask.tasks, Task.collaborators,
+              TaskCollaborator.users)],
+    'sprint_tasks':
+    lambda: [(Sprint.tasks, SprintTask.tasks)],
+    'task_list':
+    _task_paths,
+}
+
+
+def get_loader_options(profile: str) -> list:
+    if profile not in LOADING_PROFILES:
+        raise ValueError(f'Unknown loading profile: {profile}')
+    options = []
+    for first, *rest in LOADING_PROFILES[profile]():
+        option = selectinload(first)
+        for attribute in rest:
+            option = option.selectinload(attribute)
+        options.append(option)
+    return options
+
+
+class NameResolutionCache:
+    """Bounded LRU mapping of (entity, name) to entity id.
+
+    Only names that exist are cached, so creating an entity never leaves
+    a stale miss behind; the repository drops the names of an entity it
+    updates or deletes. The unit of work keeps one cache per thread and
+    clears it for every transaction, other processes may rename rows in
+    between.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._ids: OrderedDict[tuple[type, str], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, entity: Entity, name: str) -> int | None:
+        with self._lock:
+            if (entity_id := self._ids.get((entity, name))) is None:
+                self.misses += 1
+                return None
+            self._ids.move_to_end((entity, name))
+            self.hits += 1
+            return entity_id
+
+    def set(self, entity: Entity, name: str, entity_id: int) -> None:
+        with self._lock:
+            self._ids[(entity, name)] = entity_id
+            self._ids.move_to_end((entity, name))
+            if len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+
+    def invalidate(self, entity: Entity | None = None) -> None:
+        with self._lock:
+            if entity is None:
+                self._ids.clear()
+            else:
+                for key in [key for key in self._ids if key[0] is entity]:
+                    del self._ids[key]
+
+    def info(self) -> dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._ids),
+            'maxsize': self.maxsize
+        }
+
+    def __len__(self) -> int:
+        return len(self._ids)
 
 
 class AbsRepository(abc.ABC):
 
-    def __init__(self):
-        pass
+    def __init__(self, name_cache: NameResolutionCache | None = None):
+        self.name_cache = name_cache
 
     def add(self, entity: Entity) -> None:
         self._add(entity)
@@ -20,12 +124,32 @@ class AbsRepository(abc.ABC):
     def get(self, entity: Entity, entity_name: str) -> Entity:
         return self._get(entity, entity_name)
 
-    def get_by_id(self, entity: Entity, entity_id: int) -> Entity:
-        return self._get_by_entity_id(entity, entity_id)
+    def get_by_id(self,
+                  entity: Entity,
+                  entity_id: int,
+                  profile: str | None = None,
+                  columns: Iterable[str] | None = None) -> Entity:
+        return self._get_by_entity_id(entity, entity_id, profile, columns)
+
+    def resolve_id(self, entity: Entity, entity_name: str) -> int | None:
+        if self.name_cache is not None and (entity_id := self.name_cache.get(
+                entity, entity_name)) is not None:
+            return entity_id
+        if (entity_id := self._get_id(entity, entity_name)) is not None:
+            if self.name_cache is not None:
+                self.name_cache.set(entity, entity_name, entity_id)
+        return entity_id
 
-    def get_by_conditions(self, entity: Entity,
-                          conditions: dict) -> list[Entity]:
-        return self._get_by_conditions(entity, conditions)
+    def _forget_names(self, entity: Entity) -> None:
+        # renamed or deleted rows would resolve until the transaction ends
+        if self.name_cache is not None:
+            self.name_cache.invalidate(entity)
+
+    def get_by_conditions(self,
+                          entity: Entity,
+                          conditions: dict,
+                          profile: str | None = None) -> list[Entity]:
+        return self._get_by_conditions(entity, conditions, profile)
 
     @abc.abstractmethod
     def _add(self, entity: Entity) -> None:
@@ -36,34 +160,68 @@ class AbsRepository(abc.ABC):
         ...
 
     @abc.abstractmethod
-    def _get_by_entity_id(self, entity_type: str,
-                           entity_id: int) -> Entity:
+    def _get_id(self, entity: Entity, entity_name: str) -> int | None:
         ...
 
     @abc.abstractmethod
-    def _get_by_conditions(self, entity: Entity,
-                           conditions: dict) -> list[Entity]:
+    def _get_by_entity_id(self,
+                           entity_type: str,
+                           entity_id: int,
+                           profile: str | None = None,
+                           columns: Iterable[str] | None = None) -> Entity:
+        ...
+
+    @abc.abstractmethod
+    def _get_by_conditions(self,
+                           entity: Entity,
+                           conditions: dict,
+                           profile: str | None = None) -> list[Entity]:
         ...
 
 
 class SqlAlchemyRepository(AbsRepository):
 
-    def __init__(self, session):
-        super().__init__()
+    def __init__(self,
+                 session,
+                 name_cache: NameResolutionCache | None = None):
+        super().__init__(name_cache)
         self.session = session
 
     def delete(self, entity: Entity, entity_id: str):
+        self._forget_names(entity)
         return self.session.query(entity).filter_by(id=entity_id).delete()
 
     def update(self, entity: Entity, entity_id: str,
                update_dict: dict[str, str]):
+        self._forget_names(entity)
         return self.session.query(entity).filter_by(
             id=entity_id).update(update_dict)
 
+    def update_many(self,
+                    entity: Entity,
+                    entity_ids: Iterable[int],
+                    update_dict: dict[str, str],
+                    chunk_size: int = 500) -> int:
+        entity_ids = list(entity_ids)
+        updated = 0
+        for i in range(0, len(entity_ids), chunk_size):
+            updated += self.session.query(entity).filter(
+                entity.id.in_(entity_ids[i:i + chunk_size])).update(
+                    update_dict, synchronize_session='evaluate')
+        return updated
+
+    def add_many(self, entity: Entity, mappings: list[dict]) -> None:
+        # render_nulls keeps all rows in a single executemany
+        self.session.bulk_insert_mappings(entity,
+                                          mappings,
+                                          render_nulls=True)
+
     def list(self,
              entity: Entity,
-             filter_dict: dict[str, str] = {}):
-        query_object = self.session.query(entity)
+             filter_dict: dict[str, str] = {},
+             profile: str | None = None,
+             columns: Iterable[str] | None = None):
+        query_object = self._query(entity, profile, columns)
         overdue_check = False
         stale_check = False
         if 'overdue' in filter_dict:
@@ -149,6 +307,49 @@ class SqlAlchemyRepository(AbsRepository):
                                 Event.date <= days_ago, Event.type == 'status')
         return query_object.all()
 
+    def page(self,
+             entity: Entity,
+             limit: int,
+             order_by: str = 'id',
+             after: tuple | None = None,
+             profile: str | None = None,
+             columns: Iterable[str] | None = None) -> list[Entity]:
+        """Returns up to `limit` rows following the `after` key.
+
+        Rows are ordered by `order_by` (descending with a leading `-`) and
+        then by id; `after` is the (value, id) pair of the last row seen.
+        SQLite puts NULLs first in ascending and last in descending order.
+        """
+        descending = order_by.startswith('-')
+        column = getattr(entity, order_by.lstrip('-'))
+        if columns is not None:
+            columns = [*columns, order_by.lstrip('-')]
+        query_object = self._query(entity, profile, columns)
+        if after:
+            value, last_id = after
+            if descending:
+                if value is None:
+                    condition = and_(column.is_(None), entity.id < last_id)
+                else:
+                    condition = or_(column < value,
+                                    and_(column == value, entity.id < last_id),
+                                    column.is_(None))
+            else:
+                if value is None:
+                    condition = or_(column.isnot(None),
+                                    and_(column.is_(None),
+                                         entity.id > last_id))
+                else:
+                    condition = or_(column > value,
+                                    and_(column == value, entity.id > last_id))
+            query_object = query_object.filter(condition)
+        if descending:
+            query_object = query_object.order_by(column.desc(),
+                                                 entity.id.desc())
+        else:
+            query_object = query_object.order_by(column, entity.id)
+        return query_object.limit(limit).all()
+
     def _add(self, entity):
         self.session.add(entity)
 
@@ -156,12 +357,21 @@ class SqlAlchemyRepository(AbsRepository):
         return self.session.query(entity).filter_by(
             name=entity_name).one_or_none()
 
-    def _get_by_entity_id(self, entity, entity_id):
-        return self.session.query(entity).filter_by(
+    def _get_id(self, entity, entity_name):
+        name_column = entity.text if entity is BaseTag else entity.name
+        return self.session.query(entity.id).filter(
+            name_column == entity_name).limit(1).scalar()
+
+    def _get_by_entity_id(self,
+                          entity,
+                          entity_id,
+                          profile=None,
+                          columns=None):
+        return self._query(entity, profile, columns).filter_by(
             id=entity_id).one_or_none()
 
-    def _get_by_conditions(self, entity, conditions):
-        query = self.session.query(entity)
+    def _get_by_conditions(self, entity, conditions, profile=None):
+        query = self._query(entity, profile)
         for condition_name, condition_value in conditions.items():
             if isinstance(condition_value, MutableSequence):
                 query = query.filter(
@@ -170,3 +380,17 @@ class SqlAlchemyRepository(AbsRepository):
                 query = query.filter(
                     getattr(entity, condition_name) == condition_value)
         return query.all()
+
+    def _query(self, entity, profile=None, columns=None):
+        query = self.session.query(entity)
+        if profile:
+            query = query.options(*get_loader_options(profile))
+        if columns is not None:
+            # names which are not mapped columns (i.e. derived fields)
+            # are skipped, the primary key is always loaded
+            mapped_columns = inspect(entity).column_attrs.keys()
+            query = query.options(
+                load_only(*[
+                    column for column in columns if column in mapped_columns
+                ] or ['id']))
+        return query
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy import text
+
+from terka import exceptions
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    table: str
+    entity_type: str
+    code: int
+    parent: str | None
+    title: str | None
+    body: str
+
+
+# rowid in search_index is `id * 16 + code` of the source row,
+# so codes should stay unique and below 16.
+SEARCH_SOURCES = (
+    SearchSource('tasks', 'task', 0, 'project', 'name', 'description'),
+    SearchSource('task_commentaries', 'task_commentary', 1, 'task', None,
+                 'text'),
+    SearchSource('project_commentaries', 'project_commentary', 2, 'project',
+                 None, 'text'),
+    SearchSource('epic_commentaries', 'epic_commentary', 3, 'epic', None,
+                 'text'),
+    SearchSource('story_commentaries', 'story_commentary', 4, 'story', None,
+                 'text'),
+    SearchSource('sprint_commentaries', 'sprint_commentary', 5, 'sprint',
+                 None, 'text'),
+    SearchSource('task_notes', 'task_note', 6, 'task', 'name', 'text'),
+    SearchSource('project_notes', 'project_note', 7, 'project', 'name',
+                 'text'),
+    SearchSource('epic_notes', 'epic_note', 8, 'epic', 'name', 'text'),
+    SearchSource('story_notes', 'story_note', 9, 'story', 'name', 'text'),
+    SearchSource('sprint_notes', 'sprint_note', 10, 'sprint', 'name',
+                 'text'),
+)
+
+
+def _values(source: SearchSource, row: str) -> str:
+    parent = f'{row}.{source.parent}' if source.parent else 'NULL'
+    title = f'{row}.{source.title}' if source.title else 'NULL'
+    return (f"{row}.id * 16 + {source.code}, '{source.entity_type}', "
+            f'{parent}, {title}, {row}.{source.body}')
+
+
+def _triggers(source: SearchSource) -> list[str]:
+    insert = ('INSERT INTO search_index'
+              '(rowid, entity_type, parent_id, title, body) '
+              f'VALUES ({_values(source, "new")});')
+    delete = ('DELETE FROM search_index '
+              f'WHERE rowid = old.id * 16 + {source.code};')
+    columns = ', '.join(c for c in (source.parent, source.title, source.body)
+                        if c)
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {source.table}_search_insert '
+        f'AFTER INSERT ON {source.table} BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {source.table}_search_update '
+        f'AFTER UPDATE OF {columns} ON {source.table} '
+        f'BEGIN {delete} {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {source.table}_search_delete '
+        f'AFTER DELETE ON {source.table} BEGIN {delete} END',
+    ]
+
+
+def create_search_index(connection) -> None:
+    """Creates search_index FTS5 table with triggers keeping it in sync.
+
+    Existing rows are indexed when the table is created. Raises
+    TerkaInitError when SQLite is built without FTS5, so the migration
+    is not recorded and can be applied again.
+    """
+    if connection.execute(
+            text("SELECT 1 FROM sqlite_master "
+                 "WHERE type = 'table' AND name = 'search_index'")).scalar():
+        exists = True
+    else:
+        exists = False
+        try:
+            connection.execute(
+                text('CREATE VIRTUAL TABLE search_index USING fts5('
+                     'entity_type UNINDEXED, parent_id UNINDEXED, '
+                     'title, body, '
+                     "tokenize = 'unicode61 remove_diacritics 2')"))
+        except exc.OperationalError as e:
+            raise exceptions.TerkaInitError(
+                f'Full-text search is not available: {e}') from e
+    for source in SEARCH_SOURCES:
+        for trigger in _triggers(source):
+            connection.execute(text(trigger))
+        if not exists:
+            connection.execute(
+                text('INSERT INTO search_index'
+                     '(rowid, entity_type, parent_id, title, body) '
+                     f'SELECT {_values(source, source.table)} '
+                     f'FROM {source.table}'))
+
+
+def to_match_expression(query: str) -> str:
+    """Converts free text into FTS5 query matching all terms by prefix."""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search(session,
+           query: str,
+           limit: int = 20,
+           entity_types: list[str] | None = None) -> list[dict]:
+    if not (match_expression := to_match_expression(query)):
+        return []
+    entity_filter = ''
+    parameters = {'query': match_expression, 'limit': limit}
+    if entity_types:
+        entity_filter = 'AND entity_type IN ({})'.format(', '.join(
+            f':entity_type_{i}' for i in range(len(entity_types))))
+        parameters.update({
+            f'entity_type_{i}': entity_type
+            for i, entity_type in enumerate(entity_types)
+        })
+    results = session.execute(
+        text(f"""
+        SELECT
+            rowid / 16 AS id,
+            entity_type,
+            parent_id,
+            title,
+            snippet(search_index, -1, '[', ']', '...', 12) AS snippet,
+            bm25(search_index, 0, 0, 10.0, 1.0) AS rank
+        FROM search_index
+        WHERE search_index MATCH :query {entity_filter}
+        AND NOT EXISTS (
+            SELECT 1 FROM tasks
+            WHERE tasks.status = 'DELETED'
+            AND tasks.id = CASE entity_type
+                WHEN 'task' THEN search_index.rowid / 16
+                WHEN 'task_commentary' THEN parent_id
+                WHEN 'task_note' THEN parent_id
+            END
+        )
+        ORDER BY rank
+        LIMIT :limit
+        """), parameters)
+    return [dict(r._mapping) for r in results]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from terka.adapters import migrations
 from terka.adapters import orm
 from terka.adapters import publisher
 from terka.service_layer import handlers
@@ -15,7 +16,8 @@ def bootstrap(
 ) -> messagebus.MessageBus:
 
     if start_orm:
-        orm.start_mappers(engine=uow.engine)
+        orm.start_mappers()
+        migrations.upgrade(uow.engine)
 
     return messagebus.MessageBus(uow=uow,
                                  publisher=publish_service,
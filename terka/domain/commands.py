@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import asdict
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Iterable
 from typing import Type
 
 from terka import exceptions
@@ -171,6 +172,12 @@ class CreateTask(Command):
     created_by: str | None = None
 
 
+@dataclass
+class ImportTasks(Command):
+    tasks: Iterable[dict]
+    chunk_size: int = 1000
+
+
 @dataclass
 class CompleteTask(Complete):
     hours: int | None = None
@@ -579,3 +586,18 @@ class ConnectUser(Connect):
 @dataclass
 class ShowNote(Show):
     ...
+
+
+# Search
+@dataclass
+class Search(Command):
+    text: str
+    limit: int = 20
+    entity_type: str | None = None
+
+    def __post_init__(self) -> None:
+        try:
+            self.limit = int(self.limit)
+        except ValueError as e:
+            raise exceptions.TerkaInvalidPage(
+                f'Invalid limit {self.limit}') from e
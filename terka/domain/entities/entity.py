@@ -1,10 +1,15 @@
 from __future__ import annotations
+
+from collections.abc import Collection
+
+
 class Entity:
 
-    def to_dict(self) -> dict:
+    def to_dict(self, fields: Collection[str] | None = None) -> dict:
         result = {}
         for key, value in self.__dict__.items():
-            if key.startswith('_'):
+            if key.startswith('_') or (fields is not None
+                                       and key not in fields):
                 continue
             if hasattr(value, 'name'):
                 result[key] = value.name
@@ -103,26 +103,6 @@ class Project(Entity):
     def done(self) -> int:
         return self._count_task_status('DONE')
 
-    @property
-    def deleted(self) -> int:
-        return self._count_task_status('BACKLOG')
-
-    @property
-    def todo(self) -> int:
-        return self._count_task_status('TODO')
-
-    @property
-    def in_progress(self) -> int:
-        return self._count_task_status('IN_PROGRESS')
-
-    @property
-    def review(self) -> int:
-        return self._count_task_status('REVIEW')
-
-    @property
-    def done(self) -> int:
-        return self._count_task_status('DONE')
-
     @property
     def deleted(self) -> int:
         return self._count_task_status('DELETED')
@@ -164,4 +144,4 @@ class Project(Entity):
         return f'<Project {self.id}>: {self.name} {self.tasks}'
 
     def _count_task_status(self, status: str) -> int:
-        return [task for task in self.tasks if task.status.name == status]
+        return sum(1 for task in self.tasks if task.status.name == status)
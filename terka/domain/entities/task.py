@@ -7,8 +7,6 @@ from datetime import timedelta
 from enum import Enum
 from typing import Type
 
-import pandas as pd
-
 from .entity import Entity
 
 
@@ -99,10 +97,8 @@ class Task(Entity):
         elif isinstance(start_date, str) and isinstance(end_date, str):
             start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-        dates = [
-            date.strftime('%Y-%m-%d') for date in pd.date_range(
-                start_date, end_date).to_pydatetime().tolist()
-        ]
+        dates = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d')
+                 for i in range((end_date - start_date).days + 1)]
         entries = dict.fromkeys(dates, 0.0)
         for entry in self.time_spent:
             creation_date = entry.creation_date.date()
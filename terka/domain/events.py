@@ -159,6 +159,11 @@ class ProjectDeleted(Deleted):
     ...
 
 
+@dataclass
+class ProjectUpdated(Updated):
+    ...
+
+
 @dataclass
 class ProjectCommented(Commented):
     ...
@@ -237,3 +242,26 @@ class SprintCompleted(Completed):
 @dataclass
 class SprintDeleted(Deleted):
     ...
+
+
+# WORKSPACES
+@dataclass
+class WorkspaceCreated(Created):
+    ...
+
+
+# USERS
+@dataclass
+class UserCreated(Created):
+    ...
+
+
+# TAGS
+@dataclass
+class TagCreated(Created):
+    ...
+
+
+@dataclass
+class TagDeleted(Deleted):
+    ...
@@ -4,16 +4,31 @@ import logging
 import os
 from dataclasses import dataclass
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from terka import exceptions
 from terka.domain.entities.commentary import TaskCommentary
 from terka.domain.entities.task import Task
 
-try:
+if TYPE_CHECKING:
     import asana
-except ImportError:
-    raise exceptions.TerkaException(
-        'Please install `terka[asana]` to connect to asana')
+
+
+def _import_asana():
+    # asana is an optional extra and slow to import, load it on first sync
+    try:
+        import asana
+    except ImportError:
+        raise exceptions.TerkaException(
+            'Please install `terka[asana]` to connect to asana')
+    return asana
+
+
+def create_client(access_token: str | None) -> asana.ApiClient:
+    asana = _import_asana()
+    configuration = asana.Configuration()
+    configuration.access_token = access_token
+    return asana.ApiClient(configuration)
 
 
 @dataclass
@@ -61,6 +76,7 @@ class AsanaMigrator:
         client: asana.ApiClient,
         assignee: str | None = os.getenv('ASANA_USER')
     ) -> None:
+        asana = _import_asana()
         self.client = client
         self.assignee = assignee
         self.tasks = asana.TasksApi(client)
@@ -0,0 +1,355 @@
+"""Routes of the REST API shared by the Flask and the ASGI server.
+
+Handlers are plain functions of the bus and a `Request`; each server turns
+its own request into a `Request`, calls `dispatch` (the ASGI server on its
+thread pool) and writes the `Response` back. Static files and the event
+stream depend on the server and stay there.
+"""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import date
+from datetime import timedelta
+from datetime import timezone
+from email.utils import format_datetime
+from json import JSONEncoder
+from typing import AsyncIterator
+from typing import Callable
+from urllib.parse import parse_qsl
+
+from terka import exceptions
+from terka import views
+from terka.adapters import change_log
+from terka.adapters import data_version
+from terka.domain import commands
+from terka.service_layer import bulk
+from terka.service_layer import messagebus
+
+
+class EntityEncoder(JSONEncoder):
+
+    def default(self, o):
+        if isinstance(o, date):
+            return o.strftime('%Y-%m-%d %H:%M:%S')
+        else:
+            return o.__dict__
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    body: bytes = b''
+    path_params: dict[str, str] = field(default_factory=dict)
+
+    def json(self):
+        return json.loads(self.body or b'{}')
+
+    @property
+    def values(self) -> dict[str, str]:
+        """Query and form values, like `flask.request.values`."""
+        values = dict(self.query)
+        if self.headers.get('content-type', '').startswith(
+                'application/x-www-form-urlencoded'):
+            values.update(parse_qsl(self.body.decode()))
+        return values
+
+    @property
+    def fields(self) -> list[str] | None:
+        """Parses `fields=name,status` into the list of requested fields."""
+        if (fields := self.query.get('fields')) is None:
+            return None
+        return [field.strip() for field in fields.split(',') if field.strip()]
+
+    def int_arg(self, name: str) -> int | None:
+        try:
+            return int(self.query[name])
+        except (KeyError, ValueError):
+            return None
+
+
+@dataclass
+class Response:
+    content: object = ''
+    status: int = 200
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes | None = None
+    stream: AsyncIterator[bytes] | None = None
+
+    def render(self) -> bytes:
+        if self.body is not None:
+            return self.body
+        if self.status == 304:
+            return b''
+        self.headers.setdefault('Content-Type', 'application/json')
+        return json.dumps(self.content, indent=4, cls=EntityEncoder).encode()
+
+
+Handler = Callable[[messagebus.MessageBus, Request], Response]
+
+
+def _view(view: Callable) -> Handler:
+
+    def handler(bus: messagebus.MessageBus, request: Request) -> Response:
+        return Response(
+            view(bus.uow, *request.path_params.values(),
+                 fields=request.fields))
+
+    return handler
+
+
+def _list_view(view: Callable) -> Handler:
+    """Returns one page when `limit` or `cursor` is requested."""
+
+    def handler(bus: messagebus.MessageBus, request: Request) -> Response:
+        if 'limit' not in request.query and 'cursor' not in request.query:
+            return Response(view(bus.uow, fields=request.fields))
+        try:
+            return Response(
+                view(bus.uow,
+                     limit=request.int_arg('limit'),
+                     cursor=request.query.get('cursor'),
+                     order_by=request.query.get('order_by', 'id'),
+                     fields=request.fields))
+        except exceptions.TerkaInvalidPage as e:
+            return Response({'error': str(e)}, 400)
+
+    return handler
+
+
+def _command(command_type: type[commands.Command],
+             source: str = 'json') -> Handler:
+    """Builds the command from path id, json body or form values."""
+
+    def handler(bus: messagebus.MessageBus, request: Request) -> Response:
+        entity_id = request.path_params.get('id')
+        if source == 'id':
+            command = command_type(entity_id)
+        else:
+            data = request.values if source == 'values' else request.json()
+            if entity_id is not None:
+                data['id'] = entity_id
+            command = command_type.from_kwargs(**data)
+        return Response(bus.handle(command))
+
+    return handler
+
+
+def _search(bus: messagebus.MessageBus, request: Request) -> Response:
+    if not (query := request.query.get('q')):
+        return Response({'error': 'missing query parameter q'}, 400)
+    entity_types = request.query.get('type')
+    try:
+        return Response(
+            views.search(bus.uow,
+                         query,
+                         limit=request.query.get('limit', 20),
+                         entity_types=entity_types.split(',')
+                         if entity_types else None,
+                         fields=request.fields))
+    except exceptions.TerkaInvalidPage as e:
+        return Response({'error': str(e)}, 400)
+
+
+def _changes(bus: messagebus.MessageBus, request: Request) -> Response:
+    """Entities changed after `?since=<cursor>`, see `views.changes`."""
+    try:
+        return Response(
+            views.changes(bus.uow,
+                          since=request.query.get('since'),
+                          limit=request.int_arg('limit'),
+                          fields=request.fields))
+    except exceptions.TerkaInvalidPage as e:
+        return Response({'error': str(e)}, 400)
+
+
+def _batch(bus: messagebus.MessageBus, request: Request) -> Response:
+    """Runs `[{"command": "UpdateTask", "payload": {...}}, ...]` at once.
+
+    `?mode=atomic` (default) commits only when every command succeeds,
+    `?mode=best_effort` commits the commands that succeeded.
+    """
+    items = request.json()
+    if not isinstance(items, list):
+        return Response(
+            {'error': 'expected an array of {command, payload} objects'}, 400)
+    if (mode := request.query.get('mode', 'atomic')) not in ('atomic',
+                                                              'best_effort'):
+        return Response({'error': f'unknown mode {mode}'}, 400)
+    committed, results = bulk.run_commands(bus,
+                                           items,
+                                           atomic=mode == 'atomic')
+    return Response(
+        {
+            'committed': committed,
+            'results': [result.__dict__ for result in results]
+        }, 200 if committed else 400)
+
+
+ROUTES: list[tuple[str, str, Handler]] = [
+    # projects
+    ('GET', '/api/v1/projects', _list_view(views.projects)),
+    ('GET', '/api/v1/projects/{id}', _view(views.project)),
+    ('PATCH', '/api/v1/projects/{id}',
+     _command(commands.UpdateProject, 'values')),
+    ('POST', '/api/v1/projects/{id}:complete',
+     _command(commands.CompleteProject, 'id')),
+    ('GET', '/api/v1/projects/{id}/tasks', _view(views.project_tasks)),
+    ('POST', '/api/v1/projects', _command(commands.CreateProject)),
+    ('DELETE', '/api/v1/projects/{id}',
+     _command(commands.DeleteProject, 'id')),
+    ('POST', '/api/v1/projects/{id}:tag', _command(commands.TagProject)),
+    ('POST', '/api/v1/projects/{id}:sync',
+     _command(commands.SyncProject, 'id')),
+    # tasks
+    ('GET', '/api/v1/tasks', _list_view(views.tasks)),
+    ('GET', '/api/v1/tasks/{id}', _view(views.task)),
+    ('PATCH', '/api/v1/tasks/{id}', _command(commands.UpdateTask, 'values')),
+    ('POST', '/api/v1/tasks/{id}:complete',
+     _command(commands.CompleteTask, 'id')),
+    ('GET', '/api/v1/tasks/{id}/commentaries',
+     _view(views.task_commentaries)),
+    ('POST', '/api/v1/tasks', _command(commands.CreateTask)),
+    ('DELETE', '/api/v1/tasks/{id}', _command(commands.DeleteTask, 'id')),
+    ('POST', '/api/v1/tasks/{id}:comment', _command(commands.CommentTask)),
+    ('POST', '/api/v1/tasks/{id}:tag', _command(commands.TagTask)),
+    ('POST', '/api/v1/tasks/{id}:collaborate',
+     _command(commands.CollaborateTask)),
+    ('POST', '/api/v1/tasks/{id}:track', _command(commands.TrackTask)),
+    ('POST', '/api/v1/tasks/{id}:add', _command(commands.AddTask)),
+    ('POST', '/api/v1/tasks/{id}:remove', _command(commands.DeleteTask)),
+    # batch, search and changes
+    ('POST', '/api/v1:batch', _batch),
+    ('GET', '/api/v1/search', _search),
+    ('GET', '/api/v1/changes', _changes),
+    # workspaces
+    ('GET', '/api/v1/workspaces', _view(views.workspaces)),
+    ('GET', '/api/v1/workspaces/{id}', _view(views.workspace)),
+    ('GET', '/api/v1/workspaces/{id}/projects',
+     _view(views.workspace_projects)),
+    ('POST', '/api/v1/workspaces', _command(commands.CreateWorkspace)),
+    ('DELETE', '/api/v1/workspaces/{id}',
+     _command(commands.DeleteWorkspace, 'id')),
+    # epics
+    ('GET', '/api/v1/epics', _view(views.epics)),
+    ('GET', '/api/v1/epics/{id}', _view(views.epic)),
+    ('PATCH', '/api/v1/epics/{id}', _command(commands.UpdateEpic, 'values')),
+    ('POST', '/api/v1/epics/{id}:complete',
+     _command(commands.CompleteEpic, 'id')),
+    ('GET', '/api/v1/epics/{id}/tasks', _view(views.epic_tasks)),
+    ('POST', '/api/v1/epics', _command(commands.CreateEpic)),
+    ('DELETE', '/api/v1/epics/{id}', _command(commands.DeleteEpic, 'id')),
+    # stories
+    ('GET', '/api/v1/stories', _view(views.stories)),
+    ('GET', '/api/v1/stories/{id}', _view(views.story)),
+    ('PATCH', '/api/v1/stories/{id}',
+     _command(commands.UpdateStory, 'values')),
+    ('POST', '/api/v1/stories/{id}:complete',
+     _command(commands.CompleteStory, 'id')),
+    ('GET', '/api/v1/stories/{id}/tasks', _view(views.story_tasks)),
+    ('POST', '/api/v1/stories', _command(commands.CreateStory)),
+    ('DELETE', '/api/v1/stories/{id}', _command(commands.DeleteStory, 'id')),
+    # sprints
+    ('GET', '/api/v1/sprints', _view(views.sprints)),
+    ('GET', '/api/v1/sprints/{id}', _view(views.sprint)),
+    ('PATCH', '/api/v1/sprints/{id}',
+     _command(commands.UpdateSprint, 'values')),
+    ('POST', '/api/v1/sprints/{id}:start',
+     _command(commands.StartSprint, 'id')),
+    ('POST', '/api/v1/sprints/{id}:complete',
+     _command(commands.CompleteSprint, 'id')),
+    ('GET', '/api/v1/sprints/{id}/tasks', _view(views.sprint_tasks)),
+    ('POST', '/api/v1/sprints', _command(commands.CreateSprint)),
+    ('DELETE', '/api/v1/sprints/{id}', _command(commands.DeleteSprint, 'id')),
+    # users
+    ('GET', '/api/v1/users', _view(views.users)),
+    ('GET', '/api/v1/users/{id}', _view(views.user)),
+    ('POST', '/api/v1/users', _command(commands.CreateUser)),
+    # tags
+    ('GET', '/api/v1/tags', _view(views.tags)),
+    ('GET', '/api/v1/tags/{id}', _view(views.tag)),
+    ('POST', '/api/v1/tags', _command(commands.CreateTag)),
+    ('DELETE', '/api/v1/tags', _command(commands.DeleteTag)),
+]
+
+
+def _compile(pattern: str) -> re.Pattern:
+    parts = re.split(r'{(\w+)}', pattern)
+    # even parts are literal text, odd parts are parameter names
+    return re.compile(''.join(
+        re.escape(part) if i % 2 == 0 else f'(?P<{part}>[^/:]+)'
+        for i, part in enumerate(parts)) + '$')
+
+
+_COMPILED_ROUTES = [(method, _compile(pattern), handler)
+                    for method, pattern, handler in ROUTES]
+
+
+def dispatch(bus: messagebus.MessageBus, request: Request) -> Response:
+    """Runs the handler of the route matching `request`."""
+    allowed = []
+    for method, pattern, handler in _COMPILED_ROUTES:
+        if not (match := pattern.match(request.path)):
+            continue
+        if method != request.method:
+            allowed.append(method)
+            continue
+        request.path_params = match.groupdict()
+        if request.method != 'GET':
+            return handler(bus, request)
+        return _conditional(bus, handler, request)
+    if allowed:
+        return Response({'error': 'method not allowed'}, 405,
+                        {'Allow': ', '.join(allowed)})
+    return Response({'error': 'not found'}, 404)
+
+
+def _conditional(bus: messagebus.MessageBus, handler: Handler,
+                 request: Request) -> Response:
+    """Answers 304 when nothing was written since the client's copy."""
+    with bus.uow.engine.connect() as conn:
+        version = data_version.get(conn)
+    etag = f'v{version.version}'
+    # If-Modified-Since is ignored: modified_at has one second resolution,
+    # so a write in the same second as the client's copy would be missed
+    if if_none_match := request.headers.get('if-none-match'):
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        not_modified = False
+    response = Response(
+        status=304) if not_modified else handler(bus, request)
+    # the version is read before the view runs, a write in between only
+    # makes the next request revalidate once more
+    if response.status in (200, 304):
+        response.headers.update({
+            'ETag':
+            f'"{etag}"',
+            'Last-Modified':
+            format_datetime(version.modified_at.replace(tzinfo=timezone.utc),
+                            usegmt=True),
+            'Cache-Control':
+            'no-cache'
+        })
+    return response
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/').strip('"') == etag:
+            return True
+    return False
+
+
+def prune_change_log(bus: messagebus.MessageBus, config: dict) -> None:
+    """Drops changes older than `change_log_retention_days` at startup."""
+    with bus.uow.engine.begin() as connection:
+        change_log.prune(
+            connection,
+            timedelta(days=config.get('change_log_retention_days',
+                                      change_log.RETENTION_DAYS)))
@@ -0,0 +1,223 @@
+"""asyncio (ASGI) variant of the REST API served by `server.py`.
+
+Requests are read and answered on the event loop, views and commands run
+through `AsyncUnitOfWork` on a bounded thread pool, so a slow client only
+holds a coroutine. Run it with `python -m terka.entrypoints.asgi` or
+`uvicorn --factory terka.entrypoints.asgi:create_app_from_config`.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import mimetypes
+import os
+from typing import AsyncIterator
+from urllib.parse import parse_qsl
+
+from terka import bootstrap
+from terka import exceptions
+from terka.adapters import publisher
+from terka.entrypoints import api
+from terka.service_layer import messagebus
+from terka.service_layer import unit_of_work
+from terka.utils import load_config
+
+HOME_DIR = os.path.expanduser('~')
+DB_URL = f'sqlite:////{HOME_DIR}/.terka/tasks.db'
+STATIC_DIR = os.getenv('STATIC_DIR') or 'static'
+KEEPALIVE_SECONDS = 15
+
+
+async def _events(app: TerkaASGI, request: api.Request) -> api.Response:
+    """Streams domain events; `?topics=task,sprint` limits the entities."""
+    if not isinstance(app.bus.publisher, publisher.FanoutPublisher):
+        return api.Response({'error': 'event stream is not enabled'}, 404)
+    topics = request.query.get('topics')
+    fanout = app.bus.publisher
+
+    async def stream():
+        subscription = fanout.subscribe(topics.split(',') if topics else None)
+        try:
+            yield b': connected\n\n'
+            while True:
+                event = await subscription.get_async(KEEPALIVE_SECONDS)
+                if dropped := subscription.take_dropped():
+                    yield ('event: overflow\n'
+                           f'data: {{"dropped": {dropped}}}\n\n').encode()
+                if event:
+                    yield publisher.server_sent_event(event).encode()
+                else:
+                    yield b': keepalive\n\n'
+        finally:
+            fanout.unsubscribe(subscription)
+
+    return api.Response(stream=stream(),
+                        headers={
+                            'Content-Type': 'text/event-stream',
+                            'Cache-Control': 'no-cache',
+                            'X-Accel-Buffering': 'no'
+                        })
+
+
+def _read_static(request_path: str) -> tuple[str, bytes | None]:
+    """Reads the file under STATIC_DIR, unknown paths get index.html."""
+    path = os.path.normpath(request_path.lstrip('/')) or 'index.html'
+    if path.startswith('..') or not os.path.isfile(
+            os.path.join(STATIC_DIR, path)):
+        path = 'index.html'
+    try:
+        with open(os.path.join(STATIC_DIR, path), 'rb') as f:
+            return path, f.read()
+    except FileNotFoundError:
+        return path, None
+
+
+class TerkaASGI:
+
+    def __init__(self, bus: messagebus.MessageBus) -> None:
+        if not isinstance(bus.uow, unit_of_work.AsyncUnitOfWork):
+            raise exceptions.TerkaInitError(
+                'ASGI server needs a bus with AsyncUnitOfWork')
+        self.bus = bus
+        self.uow = bus.uow
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        request = api.Request(
+            method=scope['method'],
+            path=scope['path'],
+            query=dict(parse_qsl(scope['query_string'].decode())),
+            headers={
+                key.decode().lower(): value.decode()
+                for key, value in scope['headers']
+            },
+            body=body)
+        try:
+            response = await self.dispatch(request)
+        except Exception as e:
+            logging.exception('%s %s failed', request.method, request.path)
+            response = api.Response({'error': str(e)}, 500)
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        body = b'' if response.stream else response.render()
+        await send({
+            'type':
+            'http.response.start',
+            'status':
+            response.status,
+            'headers': [(key.lower().encode(), value.encode())
+                        for key, value in response.headers.items()]
+        })
+        if response.stream:
+            await self._stream(response.stream, receive, send)
+        else:
+            await send({'type': 'http.response.body', 'body': body})
+
+    async def _stream(self, stream: AsyncIterator[bytes], receive,
+                      send) -> None:
+        """Sends chunks until the stream ends or the client goes away."""
+
+        async def disconnected():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        watcher = asyncio.ensure_future(disconnected())
+        try:
+            while True:
+                chunk = asyncio.ensure_future(anext(stream))
+                await asyncio.wait((chunk, watcher),
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if watcher.done():
+                    chunk.cancel()
+                    await asyncio.wait((chunk, ))
+                    break
+                try:
+                    body = chunk.result()
+                except StopAsyncIteration:
+                    await send({'type': 'http.response.body', 'body': b''})
+                    break
+                await send({
+                    'type': 'http.response.body',
+                    'body': body,
+                    'more_body': True
+                })
+        finally:
+            watcher.cancel()
+            await stream.aclose()
+
+    async def dispatch(self, request: api.Request) -> api.Response:
+        if not request.path.startswith('/api/'):
+            return await self._static(request)
+        if request.path == '/api/v1/events':
+            if request.method != 'GET':
+                return api.Response({'error': 'method not allowed'}, 405,
+                                    {'Allow': 'GET'})
+            return await _events(self, request)
+        return await self.uow.run(api.dispatch, self.bus, request)
+
+    async def _static(self, request: api.Request) -> api.Response:
+        path, content = await asyncio.to_thread(_read_static, request.path)
+        if content is None:
+            return api.Response({'error': 'not found'}, 404)
+        headers = {
+            'Content-Type':
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        }
+        if path == 'index.html':
+            headers['Cache-Control'] = 'no-cache'
+        return api.Response(headers=headers, body=content)
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.uow.close()
+                if self.bus.publisher:
+                    self.bus.publisher.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_app(bus: messagebus.MessageBus) -> TerkaASGI:
+    return TerkaASGI(bus)
+
+
+def create_app_from_config(max_workers: int = 8) -> TerkaASGI:
+    config = load_config(HOME_DIR)
+    uow = unit_of_work.AsyncUnitOfWork(unit_of_work.SqlAlchemyUnitOfWork(
+        DB_URL,
+        unit_of_work.StorageOptions.from_kwargs(
+            **config.get('storage') or {})),
+                                       max_workers=max_workers)
+    bus = bootstrap.bootstrap(start_orm=True,
+                              uow=uow,
+                              publish_service=publisher.FanoutPublisher(
+                                  publisher.BatchingPublisher(
+                                      publisher.LogPublisher())),
+                              config=config)
+    api.prune_change_log(bus, config)
+    return create_app(bus)
+
+
+def main() -> None:
+    try:
+        import uvicorn
+    except ImportError:
+        raise exceptions.TerkaException(
+            'Please install `terka[asgi]` to run the ASGI server')
+    uvicorn.run(create_app_from_config(), port=5000)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,14 +6,11 @@ import os
 import sys
 
 from rich.console import Console
-from sqlalchemy import create_engine
 
-from terka import bootstrap
 from terka import exceptions
-from terka.adapters.orm import metadata
-from terka.service_layer import handlers
+from terka.entrypoints import daemon
 from terka.service_layer import services
-from terka.service_layer import unit_of_work
+from terka.utils import env_flag
 from terka.utils import format_task_dict
 from terka.utils import load_config
 
@@ -22,26 +19,58 @@ DB_URL = f'sqlite:////{HOME_DIR}/.terka/tasks.db'
 
 
 def init_db(home_dir):
+    from sqlalchemy import create_engine
+
+    from terka.adapters import migrations
+
     engine = create_engine(f'sqlite:////{home_dir}/.terka/tasks.db')
-    metadata.create_all(engine)
+    migrations.upgrade(engine)
     return engine
 
 
+def manage_db(action: str | None, engine, console: Console) -> None:
+    from terka.adapters import migrations
+
+    if action == 'upgrade':
+        for migration in migrations.upgrade(engine):
+            console.print(f'Applied migration {migration.version}: '
+                          f'{migration.description}')
+    elif action not in (None, 'version'):
+        raise exceptions.TerkaCommandException(
+            f'Unknown command: `terka db {action}`')
+    console.print(f'Schema version: {migrations.current_version(engine)} '
+                  f'(latest {migrations.HEAD})')
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('command', nargs='?')
     parser.add_argument('entity', nargs='?')
     parser.add_argument('--log', '--loglevel', dest='loglevel', default='info')
     parser.add_argument('-v', '--version', dest='version', action='store_true')
+    parser.add_argument('--single-transaction',
+                        dest='single_transaction',
+                        action='store_true')
+    parser.add_argument('--profile',
+                        dest='profile',
+                        action='store_true',
+                        default=env_flag('TERKA_PROFILE'))
+    parser.add_argument('--profile-output',
+                        dest='profile_output',
+                        help='file to dump cProfile stats to')
+    parser.add_argument('--no-daemon',
+                        dest='no_daemon',
+                        action='store_true',
+                        default=env_flag('TERKA_NO_DAEMON'))
     args = parser.parse_known_args()
     args, kwargs = args
     console = Console()
     command, entity = args.command, args.entity
     home_dir = os.path.expanduser('~')
     if args.version:
-        import pkg_resources
+        from importlib.metadata import version as package_version
 
-        version = pkg_resources.require('terka')[0].version
+        version = package_version('terka')
         print(f'terka version {version}')
         exit()
     if args.command == 'config':
@@ -77,22 +106,62 @@ def main():
     service_command_handler = services.ServiceCommandHander(
         home_dir, config, console)
     service_command_handler.execute(command, entity, task_dict)
+    if command != 'daemon' and not (
+            args.no_daemon or args.profile) and daemon.forward(
+            command, entity, task_dict, config):
+        return
+    if command == 'daemon' and entity in ('stop', 'status'):
+        action = 'stop' if entity == 'stop' else 'ping'
+        console.print(
+            daemon.control(action) or 'terka daemon is not running')
+        exit()
 
-    bus = bootstrap.bootstrap(start_orm=True,
-                              uow=unit_of_work.SqlAlchemyUnitOfWork(DB_URL),
-                              config=config)
+    # the database layer is only needed when running in-process
+    from terka import bootstrap
+    from terka.entrypoints import shell
+    from terka.service_layer import handlers
+    from terka.service_layer import profiling
+    from terka.service_layer import unit_of_work
+
+    uow = unit_of_work.SqlAlchemyUnitOfWork(
+        DB_URL,
+        unit_of_work.StorageOptions.from_kwargs(**config.get('storage') or {}))
+    if command == 'db':
+        manage_db(entity, uow.engine, console)
+        exit()
+    bus = bootstrap.bootstrap(start_orm=True, uow=uow, config=config)
+    if command == 'daemon':
+        daemon.TerkaDaemon(bus).serve()
+        exit()
+    if command == 'shell':
+        shell.run_shell(bus, config, console)
+        exit()
+    if command == 'batch':
+        with open(entity) if entity else sys.stdin as script:
+            shell.run_batch(bus, config, script, args.single_transaction)
+        exit()
     queue = []
     queue.append({
         'command': command,
         'entity': entity,
         'task_dict': task_dict
     })
-    while queue:
-        cmd_dict = queue.pop()
-        try:
-            handlers.CommandHandler(bus).execute(**cmd_dict)
-        except exceptions.TerkaRefreshException:
-            queue.append(cmd_dict)
+    if args.profile:
+        bus.profiler = profiling.Profiler()
+        bus.profiler.attach(uow.engine)
+    with profiling.cprofile(args.profile_output):
+        while queue:
+            cmd_dict = queue.pop()
+            try:
+                handlers.CommandHandler(bus).execute(**cmd_dict)
+            except exceptions.TerkaRefreshException:
+                queue.append(cmd_dict)
+    if bus.profiler:
+        bus.profiler.print(Console(stderr=True))
+        bus.profiler.write(f'{home_dir}/.terka/terka.log',
+                           command=command,
+                           entity=entity,
+                           name_cache=bus.uow.name_cache.info())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,196 @@
+"""Keeps a bootstrapped MessageBus warm behind a Unix socket.
+
+`terka daemon` serves requests one at a time; `cli.main` forwards commands
+to it with `forward` and runs them in-process when the daemon is not
+running or a command needs the terminal.
+
+Every request and response is a single JSON line. The daemon streams
+`{"output": ...}` messages with rendered text and finishes with
+`{"status": "ok" | "error" | "fallback", "message": ...}`. A command only
+falls back to the client before any of its output was sent.
+"""
+from __future__ import annotations
+
+import builtins
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+
+from terka import exceptions
+
+HOME_DIR = os.path.expanduser('~')
+SOCKET_PATH = os.getenv('TERKA_SOCKET') or f'{HOME_DIR}/.terka/terka.sock'
+
+# commands that open the TUI or an editor and need the user's terminal
+TERMINAL_COMMANDS = ('show', 'edit', 'focus', 'unfocus', 'daemon', 'shell',
+                     'batch')
+
+
+def needs_terminal(command: str | None, task_dict) -> bool:
+    if not command or not isinstance(task_dict, dict):
+        return True
+    if command.startswith(TERMINAL_COMMANDS):
+        return True
+    # create/update without arguments open a template in the editor
+    return command.startswith(('c', 'u')) and not any(
+        value for key, value in task_dict.items()
+        if key not in ('expand_table', 'sync', 'show_completed'))
+
+
+class _StreamWriter(io.TextIOBase):
+
+    def __init__(self, wfile) -> None:
+        self.wfile = wfile
+        self.written = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            _send(self.wfile, {'output': text})
+            self.written = True
+        return len(text)
+
+
+def _no_input(prompt: str = '') -> str:
+    raise EOFError(prompt)
+
+
+def _send(wfile, message: dict) -> None:
+    wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+    wfile.flush()
+
+
+class TerkaRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+        if request.get('action') == 'stop':
+            _send(self.wfile, {'status': 'ok', 'message': 'stopping'})
+            self.server.stopping = True
+            return
+        if request.get('action') == 'ping':
+            _send(self.wfile, {'status': 'ok', 'message': 'pong'})
+            return
+        _send(self.wfile, self.server.execute(request, self.wfile))
+
+
+class TerkaDaemon(socketserver.UnixStreamServer):
+    """Serves CLI requests with a single long-lived bus."""
+
+    def __init__(self, bus, socket_path: str = SOCKET_PATH) -> None:
+        self.bus = bus
+        self.stopping = False
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, TerkaRequestHandler)
+
+    def execute(self, request: dict, wfile) -> dict:
+        from rich.console import Console
+
+        from terka.service_layer import handlers
+
+        stream = _StreamWriter(wfile)
+        printer = self.bus.printer.console
+        default_console = printer.console
+        printer.console = Console(file=stream,
+                                  width=request.get('width'),
+                                  force_terminal=request.get('is_terminal'))
+        self.bus.config = request.get('config') or self.bus.config
+        # input() raises EOFError instead of waiting on the daemon's stdin
+        # and without writing its prompt to the client
+        stdin, sys.stdin = sys.stdin, io.StringIO()
+        input_, builtins.input = builtins.input, _no_input
+        try:
+            with contextlib.redirect_stdout(stream):
+                handlers.CommandHandler(self.bus).execute(
+                    request['command'], request['entity'],
+                    request['task_dict'])
+        except (EOFError, exceptions.TerkaRefreshException):
+            if stream.written:
+                # running it again in the client would repeat the output
+                return {
+                    'status': 'error',
+                    'message': 'command needs the terminal, '
+                    'run it with the daemon stopped'
+                }
+            # command asked for input, the client runs it in-process
+            return {'status': 'fallback'}
+        except SystemExit as e:
+            # printers and services exit() once there is nothing to show
+            if e.code not in (None, 0):
+                return {'status': 'error', 'message': str(e.code)}
+        except Exception as e:
+            logging.exception('Failed to handle %s', request)
+            return {'status': 'error', 'message': f'{type(e).__name__}: {e}'}
+        finally:
+            sys.stdin = stdin
+            builtins.input = input_
+            printer.console = default_console
+        return {'status': 'ok'}
+
+    def serve(self) -> None:
+        logging.info('terka daemon is listening on %s', self.server_address)
+        try:
+            while not self.stopping:
+                self.handle_request()
+        finally:
+            self.server_close()
+            os.unlink(self.server_address)
+
+
+def _request(message: dict, socket_path: str = SOCKET_PATH):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile('rwb') as stream:
+            _send(stream, message)
+            for line in stream:
+                yield json.loads(line)
+
+
+def forward(command: str,
+            entity: str | None,
+            task_dict: dict,
+            config: dict,
+            socket_path: str = SOCKET_PATH) -> bool:
+    """Runs a command in the daemon, returns False if it has to run here."""
+    if needs_terminal(command, task_dict) or not os.path.exists(socket_path):
+        return False
+    stdout = sys.stdout
+    message = {
+        'command': command,
+        'entity': entity,
+        'task_dict': task_dict,
+        'config': config,
+        'width': os.get_terminal_size().columns if stdout.isatty() else None,
+        'is_terminal': stdout.isatty()
+    }
+    try:
+        for response in _request(json.loads(json.dumps(message, default=str)),
+                                 socket_path):
+            if 'output' in response:
+                stdout.write(response['output'])
+                stdout.flush()
+            elif response['status'] == 'fallback':
+                return False
+            elif response['status'] == 'error':
+                raise exceptions.TerkaException(response['message'])
+    except (ConnectionRefusedError, FileNotFoundError):
+        logging.debug('terka daemon is not running, executing in-process')
+        return False
+    return True
+
+
+def control(action: str, socket_path: str = SOCKET_PATH) -> str | None:
+    """Sends `stop` or `ping` to the daemon, None if it is not running."""
+    try:
+        for response in _request({'action': action}, socket_path):
+            return response.get('message')
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
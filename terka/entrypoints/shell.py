@@ -0,0 +1,103 @@
+"""Runs many commands against one bootstrapped bus and session.
+
+`terka shell` reads commands interactively, `terka batch` reads them from a
+script; both share a single session. Every command is committed on its own
+unless a batch runs as a single transaction.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import Iterable
+
+from rich.console import Console
+
+from terka import exceptions
+from terka import utils
+from terka.service_layer import handlers
+from terka.service_layer import messagebus
+
+HOME_DIR = os.path.expanduser('~')
+HISTORY_FILE = f'{HOME_DIR}/.terka/history'
+QUIT_COMMANDS = ('q', 'quit', 'exit')
+
+
+def execute_line(bus: messagebus.MessageBus, config: dict, line: str) -> None:
+    command, entity, task_dict = utils.process_command(
+        line, config, bus.uow.tasks)
+    while True:
+        try:
+            handlers.CommandHandler(bus).execute(command, entity, task_dict)
+            return
+        except exceptions.TerkaRefreshException:
+            continue
+        except SystemExit as e:
+            # printers and services exit() once there is nothing to show
+            if e.code not in (None, 0):
+                raise exceptions.TerkaCommandException(str(e.code)) from e
+            return
+
+
+def _commands(lines: Iterable[str]) -> Iterable[tuple[int, str]]:
+    for line_number, line in enumerate(lines, start=1):
+        if (line := line.strip()) and not line.startswith('#'):
+            yield line_number, line
+
+
+def run_batch(bus: messagebus.MessageBus,
+              config: dict,
+              lines: Iterable[str],
+              single_transaction: bool = False) -> int:
+    """Executes commands line by line and returns the number executed.
+
+    Stops at the first failing command. With `single_transaction` nothing
+    is written unless every command succeeds.
+    """
+    executed = 0
+    # a single transaction holds the write lock from its first write to
+    # the end anyway, otherwise every command takes it on its own
+    with bus.uow.writing() if single_transaction else bus.uow:
+        for line_number, line in _commands(lines):
+            try:
+                execute_line(bus, config, line)
+            except Exception as e:
+                raise exceptions.TerkaCommandException(
+                    f'line {line_number}: `{line}` failed: {e}') from e
+            if not single_transaction:
+                bus.uow.checkpoint()
+            executed += 1
+        bus.uow.commit()
+    logging.info('Executed %d commands', executed)
+    return executed
+
+
+def run_shell(bus: messagebus.MessageBus,
+              config: dict,
+              console: Console = Console()) -> None:
+    try:
+        import readline
+    except ImportError:
+        readline = None
+    if readline and os.path.exists(HISTORY_FILE):
+        readline.read_history_file(HISTORY_FILE)
+    try:
+        with bus.uow:
+            while True:
+                try:
+                    line = input('terka> ').strip()
+                except (EOFError, KeyboardInterrupt):
+                    console.print()
+                    break
+                if not line or line.startswith('#'):
+                    continue
+                if line in QUIT_COMMANDS:
+                    break
+                try:
+                    execute_line(bus, config, line)
+                except Exception as e:
+                    logging.debug('Command `%s` failed', line, exc_info=True)
+                    console.print(f'[red]{e}[/red]')
+                bus.uow.checkpoint()
+    finally:
+        if readline:
+            readline.write_history_file(HISTORY_FILE)
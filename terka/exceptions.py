@@ -45,3 +45,7 @@ class TerkaSprintOutOfCapacity(TerkaException):
 
 class TerkaSprintInvalidCapacity(TerkaException):
     ...
+
+
+class TerkaInvalidPage(TerkaException):
+    ...
@@ -1,20 +1,17 @@
 from __future__ import annotations
 
 import inspect
-from collections import abc
 from dataclasses import dataclass
 from datetime import datetime
 
 import rich
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
-from textual import widgets
-from textual.app import App
-from textual.app import ComposeResult
 
 from terka import exceptions
+from terka import views
 from terka.presentations import formatter
-from terka.presentations.text_ui import ui
 
 
 @dataclass
@@ -49,6 +46,9 @@ class TextualPrinter:
         self.uow = uow
 
     def show_note(self, note):
+        from textual import widgets
+        from textual.app import App
+        from textual.app import ComposeResult
 
         class NoteMarkdownViewer(App):
 
@@ -61,31 +61,41 @@ class TextualPrinter:
         app = NoteMarkdownViewer()
         app.run()
 
-    def print_project(self, project, bus):
-        app = ui.TerkaProject(project, bus)
+    def print_project(self, project, bus, statistics=None):
+        from terka.presentations.text_ui import ui
+
+        app = ui.TerkaProject(project, bus, statistics)
         app.run()
         if app.return_code == 4:
             raise exceptions.TerkaRefreshException
 
     def print_sprint(self, sprint, bus):
+        from terka.presentations.text_ui import ui
+
         app = ui.TerkaSprint(sprint, bus)
         app.run()
         if app.return_code == 4:
             raise exceptions.TerkaRefreshException
 
     def print_task(self, task, bus):
+        from terka.presentations.text_ui import ui
+
         app = ui.TerkaTask(task, bus)
         app.run()
         if app.return_code == 4:
             raise exceptions.TerkaRefreshException
 
     def print_epic(self, epic, bus):
+        from terka.presentations.text_ui import ui
+
         app = ui.TerkaEpic(epic, bus)
         app.run()
         if app.return_code == 4:
             raise exceptions.TerkaRefreshException
 
     def print_story(self, story, bus):
+        from terka.presentations.text_ui import ui
+
         app = ui.TerkaStory(story, bus)
         app.run()
         if app.return_code == 4:
@@ -125,6 +135,20 @@ class ConsolePrinter:
         if table.row_count:
             self.console.print(table)
 
+    def print_search_results(self, results):
+        if not results:
+            self.console.print('[red]Nothing found[/red]')
+            return
+        table = Table(box=self.box)
+        for column in ('type', 'id', 'parent_id', 'title', 'snippet'):
+            table.add_column(column)
+        for result in results:
+            table.add_row(result['entity_type'], str(result['id']),
+                          str(result['parent_id'] or ''),
+                          escape(result['title'] or ''),
+                          escape(result['snippet']))
+        self.console.print(table)
+
     def print_user(self, entities):
         table = Table(box=self.box)
         for column in ('id', 'name'):
@@ -189,10 +213,11 @@ class ConsolePrinter:
                 time_entries = entity.daily_time_entries_hours()
                 self._print_time_utilization(time_entries)
 
-    def print_project(self, entities, print_options, kwargs=None):
+    def print_project(self, entities, print_options, statistics=None):
         if not entities:
             self.console.print('[red]No projects found[/red]')
             exit()
+        statistics = statistics or {}
         table = Table(box=rich.box.SQUARE_DOUBLE_HEAD,
                       expand=print_options.expand_table)
         non_active_projects = Table(box=rich.box.SQUARE_DOUBLE_HEAD,
@@ -211,25 +236,24 @@ class ConsolePrinter:
         for column in printable_columns:
             if column in ('id', 'name', 'description', 'status', 'open_tasks'):
                 non_active_projects.add_column(column)
-        try:
-            reverse = True
-            sorting_field = getattr(entities[0], print_options.sort)
-            if isinstance(sorting_field, abc.MutableSequence):
-                sort_fn = lambda x: len(getattr(x, print_options.sort))
-            else:
-                sort_fn = lambda x: getattr(x, print_options.sort)
-        except AttributeError:
+        empty_statistics = views.empty_project_statistics()
+        get_statistics = lambda x: statistics.get(x.id, empty_statistics)
+        reverse = True
+        if print_options.sort == 'open_tasks':
+            sort_fn = lambda x: get_statistics(x)['incompleted_tasks']
+        elif print_options.sort in empty_statistics:
+            sort_fn = lambda x: get_statistics(x)[print_options.sort]
+        elif hasattr(entities[0], print_options.sort):
+            sort_fn = lambda x: getattr(x, print_options.sort)
+        else:
             sort_fn = lambda x: 'id'
         if print_options.sort == 'id':
             reverse = False
         entities.sort(key=sort_fn, reverse=reverse)
         for entity in entities:
-            if len(incompleted_tasks := entity.incompleted_tasks
-                   ) > 0 and entity.status.name == 'ACTIVE':
-                if overdue_tasks := entity.overdue_tasks:
-                    entity_id = f'[red]{entity.id}[/red]'
-                else:
-                    entity_id = f'[green]{entity.id}[/green]'
+            project_statistics = get_statistics(entity)
+            incompleted_tasks = project_statistics['incompleted_tasks']
+            if incompleted_tasks > 0 and entity.status.name == 'ACTIVE':
                 printable_row = {
                     'id':
                     f'{entity.id}',
@@ -240,26 +264,26 @@ class ConsolePrinter:
                     'status':
                     entity.status.name,
                     'open_tasks':
-                    str(len(incompleted_tasks)),
+                    str(incompleted_tasks),
                     'overdue':
-                    str(len(overdue_tasks)),
+                    str(project_statistics['overdue']),
                     'stale':
-                    str(len(entity.stale_tasks)),
+                    str(project_statistics['stale']),
                     'backlog':
-                    str(len(entity.backlog)),
+                    str(project_statistics['backlog']),
                     'todo':
-                    str(len(entity.todo)),
+                    str(project_statistics['todo']),
                     'in_progress':
-                    str(len(entity.in_progress)),
+                    str(project_statistics['in_progress']),
                     'review':
-                    str(len(entity.review)),
+                    str(project_statistics['review']),
                     'done':
-                    str(len(entity.done)),
+                    str(project_statistics['done']),
                     'median_task_age':
-                    str(entity.median_task_age),
+                    str(project_statistics['median_task_age']),
                     'time_spent':
                     formatter.Formatter.format_time_spent(
-                        entity.total_time_spent),
+                        project_statistics['time_spent']),
                 }
                 printable_elements = [
                     value for key, value in printable_row.items()
@@ -272,7 +296,7 @@ class ConsolePrinter:
                     'name': str(entity.name),
                     'description': entity.description,
                     'status': entity.status.name,
-                    'open_tasks': str(len(incompleted_tasks)),
+                    'open_tasks': str(incompleted_tasks),
                 }
                 printable_elements = [
                     value for key, value in printable_row.items()
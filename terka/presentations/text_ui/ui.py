@@ -438,10 +438,11 @@ class TerkaProject(App, PopupsMixin, SelectionMixin, SortingMixin):
 
     show_sidebar = reactive(False)
 
-    def __init__(self, entity, bus) -> None:
+    def __init__(self, entity, bus, statistics=None) -> None:
         super().__init__()
         self.entity = entity
         self.bus = bus
+        self.statistics = statistics
         self.selected_task = None
         self.selected_column = None
         self.project_id = entity.id
@@ -646,10 +647,22 @@ class TerkaProject(App, PopupsMixin, SelectionMixin, SortingMixin):
                                           key=lambda x: x[1],
                                           reverse=True):
                     sorted_collaborators += f'  * {name}: {Formatter.format_time_spent(value)} \n'
+                if statistics := self.statistics:
+                    time_spent = statistics['time_spent']
+                    task_statistics = (
+                        f"* Open tasks: {statistics['open_tasks']} "
+                        f"(overdue: {statistics['overdue']}, "
+                        f"stale: {statistics['stale']})\n"
+                        '* Median task age: '
+                        f"{statistics['median_task_age']} days")
+                else:
+                    time_spent = self.entity.total_time_spent
+                    task_statistics = ''
                 yield Markdown(f"""
 # Project details:
 * Repo: {self.entity.description}
-* Time spend: {Formatter.format_time_spent(self.entity.total_time_spent)}
+* Time spend: {Formatter.format_time_spent(time_spent)}
+{task_statistics}
 * Collaborators:
 {sorted_collaborators}
                 """)
@@ -829,7 +842,7 @@ class TerkaSprint(App, PopupsMixin, SelectionMixin, SortingMixin):
                 else:
                     with self.bus.uow as uow:
                         workspace = services.get_workplace_by_name(
-                            self.bus.config.get('workspace'), uow.repo)
+                            self.bus.config.get('workspace'), uow.tasks)
                     all_workspace_time = workspace.daily_time_entries_hours(
                         start_date=self.entity.start_date,
                         end_date=self.entity.end_date)
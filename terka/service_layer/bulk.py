@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Iterable
+
+from terka import exceptions
+from terka.domain import commands
+from terka.domain import entities
+from terka.service_layer import unit_of_work
+
+if TYPE_CHECKING:
+    from terka.service_layer import messagebus
+
+
+@dataclass
+class ImportReport:
+    n_tasks: int = 0
+    n_chunks: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        if self.elapsed:
+            return self.n_tasks / self.elapsed
+        return 0.0
+
+    def __str__(self) -> str:
+        return (f'Imported {self.n_tasks} tasks in {self.elapsed:.2f}s '
+                f'({self.throughput:.0f} tasks/s)')
+
+
+class TaskImporter:
+    """Inserts tasks and their status events in chunks.
+
+    Project names are resolved once per name through `project_resolver`;
+    all chunks are written within the current unit of work.
+    """
+
+    def __init__(self,
+                 uow: unit_of_work.SqlAlchemyUnitOfWork,
+                 project_resolver: Callable[[str], int | None],
+                 created_by: int | None = None,
+                 chunk_size: int = 1000) -> None:
+        self.uow = uow
+        self.project_resolver = project_resolver
+        self.created_by = created_by
+        self.chunk_size = chunk_size
+        self.project_ids: dict[str, int | None] = {}
+
+    def run(self, task_dicts: Iterable[dict]) -> ImportReport:
+        report = ImportReport()
+        start = time.perf_counter()
+        chunk: list[dict] = []
+        for task_dict in task_dicts:
+            chunk.append(self._to_mapping(task_dict))
+            if len(chunk) >= self.chunk_size:
+                self._insert(chunk, report)
+                chunk = []
+        if chunk:
+            self._insert(chunk, report)
+        report.elapsed = time.perf_counter() - start
+        logging.info(report)
+        return report
+
+    def _to_mapping(self, task_dict: dict) -> dict:
+        if not (name := task_dict.get('name')):
+            raise ValueError('task name cannot be empty!')
+        return {
+            'name': name,
+            'description': task_dict.get('description'),
+            'project': self._resolve_project(task_dict.get('project')),
+            'created_by': self.created_by,
+            'creation_date': datetime.now(),
+            'status': entities.task.TaskStatus.BACKLOG,
+            'priority': entities.task.TaskPriority.NORMAL,
+            'sync': True,
+        }
+
+    def _resolve_project(self, project_name: str | None) -> int | None:
+        if not project_name:
+            return None
+        if project_name not in self.project_ids:
+            self.project_ids[project_name] = self.project_resolver(
+                project_name)
+        return self.project_ids[project_name]
+
+    def _insert(self, chunk: list[dict], report: ImportReport) -> None:
+        session = self.uow.tasks.session
+        task_id = entities.task.Task.id
+        last_id = session.query(task_id).order_by(task_id.desc()).limit(
+            1).scalar() or 0
+        session.bulk_insert_mappings(entities.task.Task, chunk)
+        new_ids = [
+            id for id, in session.query(task_id).filter(
+                task_id > last_id).order_by(task_id)
+        ]
+        now = datetime.now()
+        session.bulk_insert_mappings(entities.event_history.TaskEvent, [{
+            'task': id,
+            'date': now,
+            'type': 'STATUS',
+            'old_value': None,
+            'new_value': 'BACKLOG'
+        } for id in new_ids])
+        report.n_tasks += len(new_ids)
+        report.n_chunks += 1
+        logging.debug('Inserted chunk of %d tasks', len(new_ids))
+
+
+# mutations that never open the TUI, an editor or print listings, other
+# commands are rejected in batches
+BATCH_COMMANDS = (
+    commands.CreateTask,
+    commands.UpdateTask,
+    commands.CompleteTask,
+    commands.DeleteTask,
+    commands.TagTask,
+    commands.CollaborateTask,
+    commands.AssignTask,
+    commands.AddTask,
+    commands.CommentTask,
+    commands.TrackTask,
+    commands.CreateProject,
+    commands.UpdateProject,
+    commands.CompleteProject,
+    commands.DeleteProject,
+    commands.CommentProject,
+    commands.TagProject,
+    commands.CollaborateProject,
+    commands.CreateSprint,
+    commands.UpdateSprint,
+    commands.CompleteSprint,
+    commands.DeleteSprint,
+    commands.CreateEpic,
+    commands.UpdateEpic,
+    commands.CompleteEpic,
+    commands.DeleteEpic,
+    commands.CommentEpic,
+    commands.AddEpic,
+    commands.CreateStory,
+    commands.UpdateStory,
+    commands.CompleteStory,
+    commands.DeleteStory,
+    commands.CommentStory,
+    commands.AddStory,
+)
+
+
+@dataclass
+class CommandResult:
+    index: int
+    command: str | None
+    status: str = 'skipped'
+    result: Any = None
+    error: str | None = None
+
+
+def to_command(bus: messagebus.MessageBus, item: dict) -> commands.Command:
+    """Builds a command from `{"command": "CreateTask", "payload": {...}}`.
+
+    Only `BATCH_COMMANDS` are accepted.
+    """
+    name = item.get('command') if isinstance(item, dict) else None
+    command_type = getattr(commands, name, None) if isinstance(name,
+                                                               str) else None
+    if (command_type not in BATCH_COMMANDS
+            or command_type not in bus.command_handlers):
+        raise exceptions.TerkaCommandException(f'Unknown command {name}')
+    command = command_type.from_kwargs(**(item.get('payload') or {}))
+    # create handlers open the editor for a command without a name
+    if 'name' in command.__dataclass_fields__ and name.startswith(
+            'Create') and not command.name:
+        raise exceptions.TerkaCommandException(f'{name} needs a name')
+    return command
+
+
+def _serializable(value: Any) -> Any:
+    # handlers return ids, anything else is left out of the response
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return None
+
+
+def run_commands(bus: messagebus.MessageBus,
+                 items: Iterable[dict],
+                 atomic: bool = True) -> tuple[bool, list[CommandResult]]:
+    """Handles commands in one transaction committed once at the end.
+
+    Every command runs in its own savepoint. When `atomic` the first
+    failure discards the whole batch and the remaining commands are
+    skipped, otherwise failed commands are rolled back one by one and the
+    rest is committed. Returns whether anything was committed and the
+    outcome of every command.
+    """
+    items = list(items)
+    results = [
+        CommandResult(i, item.get('command') if isinstance(item, dict) else
+                      None) for i, item in enumerate(items)
+    ]
+    with bus.uow.writing():
+        for item, result in zip(items, results):
+            try:
+                with bus.uow:
+                    result.result = _serializable(
+                        bus.handle(to_command(bus, item)))
+                    bus.uow.commit()
+                result.status = 'ok'
+            except Exception as e:
+                logging.debug('Command %d of the batch failed',
+                              result.index,
+                              exc_info=True)
+                result.status, result.error = 'error', str(e)
+                if atomic:
+                    for executed in results[:result.index]:
+                        executed.status = 'rolled_back'
+                    return False, results
+        bus.uow.commit()
+    logging.info('Executed %d commands in one transaction', len(items))
+    return True, results
@@ -3,15 +3,12 @@ from __future__ import annotations
 import functools
 import logging
 import os
+from collections import abc
 from collections import defaultdict
 from dataclasses import asdict
 from datetime import datetime
 from typing import Type
 
-import asana as asn
-from rich.prompt import Confirm
-from rich.prompt import Prompt
-
 from terka import exceptions
 from terka import utils
 from terka import views
@@ -21,13 +18,19 @@ from terka.domain import events
 from terka.domain.external_connectors import asana
 from terka.presentations.console import printer
 from terka.presentations.vim import templates
+from terka.service_layer import bulk
 from terka.utils import create_command
 
 COMMAND_HANDLERS = {}
 EVENT_HANDLERS = defaultdict(list)
 
 
-def register(cmd=None, event=None):
+def register(cmd=None, event=None, batch=False):
+    """Registers handler for a command or an event.
+
+    Batch event handlers receive a list of consecutive events of the same
+    type instead of a single event.
+    """
 
     def fn(func):
 
@@ -35,6 +38,7 @@ def register(cmd=None, event=None):
         def inner_function(cmd, bus, context):
             return func(cmd, bus, context)
 
+        inner_function.batch = batch
         if cmd:
             COMMAND_HANDLERS[cmd] = inner_function
         elif event:
@@ -50,8 +54,15 @@ class CommandHandler:
         self.bus = bus
 
     def execute(self, command: str, entity: str,
-                task_dict: dict | list[dict]) -> None:
-        if isinstance(task_dict, list):
+                task_dict: dict | abc.Iterable[dict]) -> None:
+        if command == 'search':
+            self.bus.handle(
+                commands.Search.from_kwargs(text=entity, **task_dict))
+        elif not isinstance(task_dict, dict) and (
+                utils.format_command(command),
+                utils.format_entity(entity)) == ('create', 'task'):
+            self.bus.handle(commands.ImportTasks(tasks=task_dict))
+        elif not isinstance(task_dict, dict):
             for _task_dict in task_dict:
                 self.execute(command, entity, _task_dict)
         else:
@@ -88,7 +99,7 @@ class SprintCommandHandlers:
               context: dict = {}) -> None:
         with bus.uow as uow:
             if not (existing_sprint := uow.tasks.get_by_id(
-                    entities.sprint.Sprint, cmd.id)):
+                    entities.sprint.Sprint, cmd.id, profile='sprint_tasks')):
                 raise exceptions.EntityNotFound(
                     f'Sprint id {cmd.id} is not found')
             if existing_sprint.status.name == 'ACTIVE':
@@ -100,7 +111,7 @@ class SprintCommandHandlers:
                 'status': 'ACTIVE',
                 'started_at': datetime.now()
             })
-            uow.commit()
+            tasks_params = []
             for sprint_task in existing_sprint.tasks:
                 task = sprint_task.tasks
                 task_params = {}
@@ -110,8 +121,7 @@ class SprintCommandHandlers:
                     task_params.update({'due_date': existing_sprint.end_date})
                 if task_params:
                     task_params['id'] = task.id
-                    uow.published_messages.append(
-                        commands.UpdateTask(**task_params))
+                    tasks_params.append((task, task_params))
                 # FIXME: ask-input should be provided via CLI
                 if sprint_task.story_points == 0 and context.get('ask-input'):
                     story_points = input(
@@ -127,6 +137,8 @@ class SprintCommandHandlers:
                         print(
                             '[red]Provide number when specifying story points[/red]'
                         )
+            TaskCommandHandlers._update_many(tasks_params, uow)
+            uow.commit()
             logging.debug(f'Sprint started, context: {cmd}')
 
     @register(cmd=commands.UpdateSprint)
@@ -152,13 +164,14 @@ class SprintCommandHandlers:
                  context: dict = {}) -> None:
         with bus.uow as uow:
             if not (existing_sprint := uow.tasks.get_by_id(
-                    entities.sprint.Sprint, cmd.id)):
+                    entities.sprint.Sprint, cmd.id, profile='sprint_tasks')):
                 raise exceptions.EntityNotFound(
                     f'Sprint id {cmd.id} is not found')
             uow.tasks.update(entities.sprint.Sprint, cmd.id, {
                 'status': 'COMPLETED',
                 'completed_at': datetime.now()
             })
+            tasks_params = []
             for sprint_task in existing_sprint.tasks:
                 task = sprint_task.tasks
                 task_params = {}
@@ -169,11 +182,11 @@ class SprintCommandHandlers:
                     task_params.update({'due_date': None})
                 if task_params:
                     task_params['id'] = task.id
-                    uow.published_messages.append(
-                        commands.UpdateTask(**task_params))
+                    tasks_params.append((task, task_params))
+            TaskCommandHandlers._update_many(tasks_params, uow)
             uow.commit()
             logging.debug(f'Sprint completed, context: {cmd}')
-        bus.publisher.publish('Topic', events.SprintCompleted(cmd.id))
+            uow.published_messages.append(events.SprintCompleted(cmd.id))
 
     @register(cmd=commands.DeleteSprint)
     def delete(cmd: commands.DeleteSprint,
@@ -187,7 +200,7 @@ class SprintCommandHandlers:
             uow.tasks.update(entities.sprint.Sprint, cmd.id,
                              {'status': 'DELETED'})
             uow.commit()
-            bus.publisher.publish('Topic', events.SprintDeleted(cmd.id))
+            uow.published_messages.append(events.SprintDeleted(cmd.id))
 
     @register(cmd=commands.ShowSprint)
     def show(cmd: commands.ShowSprint,
@@ -205,7 +218,8 @@ class SprintCommandHandlers:
              bus: 'messagebus.MessageBus',
              context: dict = {}) -> None:
         with bus.uow as uow:
-            if sprints := uow.tasks.list(entities.sprint.Sprint):
+            if sprints := uow.tasks.list(entities.sprint.Sprint,
+                                         profile='sprint_dashboard'):
                 bus.printer.console.print_sprint(
                     sprints, printer.PrintOptions.from_kwargs(**context))
 
@@ -261,10 +275,27 @@ class TaskCommandHandlers:
             uow.published_messages.append(task_created_event)
             uow.commit()
             TaskCommandHandlers._process_extra_args(new_task.id, context, uow)
-            bus.publisher.publish('Topic', task_created_event)
             bus.printer.console.print_new_object(new_task)
             return new_task_id
 
+    @register(cmd=commands.ImportTasks)
+    def import_tasks(cmd: commands.ImportTasks,
+                     bus: 'messagebus.MessageBus',
+                     context: dict = {}) -> bulk.ImportReport:
+        with bus.uow as uow:
+            created_by = convert_user(
+                commands.CreateTask(created_by=bus.config.get('user')),
+                bus).created_by
+            importer = bulk.TaskImporter(
+                uow,
+                project_resolver=lambda name: convert_project(
+                    commands.CreateTask(project=name), bus).project,
+                created_by=created_by,
+                chunk_size=cmd.chunk_size)
+            report = importer.run(cmd.tasks)
+            uow.commit()
+            return report
+
     @register(cmd=commands.UpdateTask)
     def update(cmd: commands.UpdateTask,
                bus: 'messagebus.MessageBus',
@@ -280,32 +311,56 @@ class TaskCommandHandlers:
                 cmd.id = existing_task.id
             cmd = convert_project(cmd, bus)
             cmd = convert_user(cmd, bus, user_type='assignee')
-            for f in cmd.__dataclass_fields__:
-                if f == 'id':
-                    continue
-                new_value = getattr(cmd, f)
-                old_value = getattr(existing_task, f)
-                if hasattr(old_value, 'name'):
-                    old_value = old_value.name
-                if (f == 'due_date' and new_value != old_value) or (
-                        new_value and new_value != old_value):
-                    uow.published_messages.append(
-                        events.TaskUpdated(cmd.id,
-                                           type=f.upper(),
-                                           old_value=old_value,
-                                           new_value=new_value))
-            update_dict = cmd.get_only_set_attributes()
-            if status := update_dict.get('status'):
-                update_dict['status'] = entities.task.TaskStatus[status]
-            if priority := update_dict.get('priority'):
-                update_dict['priority'] = entities.task.TaskPriority[priority]
-            if (existing_task.status.name in ('DONE', 'DELETED')
-                    and status not in ('DONE', 'DELETED')):
-                update_dict['completed_at'] = None
+            task_events, update_dict = TaskCommandHandlers._prepare_update(
+                existing_task, cmd)
+            uow.published_messages.extend(task_events)
             uow.tasks.update(entities.task.Task, cmd.id, update_dict)
             uow.commit()
             TaskCommandHandlers._process_extra_args(cmd.id, context, uow)
 
+    def _prepare_update(
+        existing_task: entities.task.Task, cmd: commands.UpdateTask
+    ) -> tuple[list[events.TaskUpdated], dict]:
+        task_events = []
+        for f in cmd.__dataclass_fields__:
+            if f == 'id':
+                continue
+            new_value = getattr(cmd, f)
+            old_value = getattr(existing_task, f)
+            if hasattr(old_value, 'name'):
+                old_value = old_value.name
+            if (f == 'due_date' and new_value != old_value) or (
+                    new_value and new_value != old_value):
+                task_events.append(
+                    events.TaskUpdated(cmd.id,
+                                       type=f.upper(),
+                                       old_value=old_value,
+                                       new_value=new_value))
+        update_dict = cmd.get_only_set_attributes()
+        if status := update_dict.get('status'):
+            update_dict['status'] = entities.task.TaskStatus[status]
+        if priority := update_dict.get('priority'):
+            update_dict['priority'] = entities.task.TaskPriority[priority]
+        if (existing_task.status.name in ('DONE', 'DELETED')
+                and status not in ('DONE', 'DELETED')):
+            update_dict['completed_at'] = None
+        return task_events, update_dict
+
+    def _update_many(tasks_params: list[tuple[entities.task.Task, dict]],
+                     uow) -> None:
+        # Applies the same changes as one UpdateTask per task, grouping
+        # tasks with identical updates into a single statement.
+        updates = defaultdict(list)
+        for existing_task, task_params in tasks_params:
+            task_events, update_dict = TaskCommandHandlers._prepare_update(
+                existing_task, commands.UpdateTask(**task_params))
+            uow.published_messages.extend(task_events)
+            update_dict.pop('id')
+            updates[tuple(update_dict.items())].append(existing_task.id)
+        for update_items, task_ids in updates.items():
+            uow.tasks.update_many(entities.task.Task, task_ids,
+                                  dict(update_items))
+
     @register(cmd=commands.CollaborateTask)
     def collaborate(cmd: commands.CollaborateTask,
                     bus: 'messagebus.MessageBus',
@@ -315,14 +370,13 @@ class TaskCommandHandlers:
                     entities.task.Task, cmd.id)):
                 raise exceptions.EntityNotFound(
                     f'Task id {cmd.id} is not found')
-            if not (existing_user := uow.tasks.list(
-                    entities.user.User, {'name': cmd.collaborator})):
+            if not (user_id := uow.tasks.resolve_id(entities.user.User,
+                                                    cmd.collaborator)):
                 new_user = entities.user.User(name=cmd.collaborator)
                 uow.tasks.add(new_user)
                 uow.flush()
                 user_id = new_user.id
-            else:
-                user_id = existing_user[0].id
+                uow.published_messages.append(events.UserCreated(user_id))
             if not uow.tasks.list(entities.collaborator.TaskCollaborator, {
                     'task': cmd.id,
                     'collaborator': user_id
@@ -464,7 +518,6 @@ class TaskCommandHandlers:
                 })
             TaskCommandHandlers._process_extra_args(cmd.id, context, uow)
             uow.commit()
-            bus.publisher.publish('Topic', task_completed_event)
 
     @register(cmd=commands.DeleteTask)
     def delete(cmd: commands.DeleteTask,
@@ -544,7 +597,6 @@ class TaskCommandHandlers:
                     type='STATUS',
                     old_value=existing_task.status.name,
                     new_value='DELETED')
-                uow.published_messages.append(task_deleted_event)
                 uow.tasks.update(
                     entities.task.Task, cmd.id, {
                         'status': entities.task.TaskStatus.DELETED,
@@ -553,7 +605,6 @@ class TaskCommandHandlers:
                 uow.published_messages.append(task_deleted_event)
             TaskCommandHandlers._process_extra_args(cmd.id, context, uow)
             uow.commit()
-        bus.publisher.publish('Topic', events.TaskCompleted(cmd.id))
 
     @register(cmd=commands.CommentTask)
     def comment(cmd: commands.CommentTask,
@@ -590,14 +641,13 @@ class TaskCommandHandlers:
                     entities.task.Task, cmd.id)):
                 raise exceptions.EntityNotFound(
                     f'Task id {cmd.id} is not found')
-            if not (existing_tag := uow.tasks.list(entities.tag.BaseTag,
-                                                   {'text': cmd.tag})):
+            if not (tag_id := uow.tasks.resolve_id(entities.tag.BaseTag,
+                                                   cmd.tag)):
                 new_tag = entities.tag.BaseTag(text=cmd.tag)
                 uow.tasks.add(new_tag)
                 uow.flush()
                 tag_id = new_tag.id
-            else:
-                tag_id = existing_tag[0].id
+                uow.published_messages.append(events.TagCreated(tag_id))
             if not uow.tasks.list(entities.tag.TaskTag, {
                     'task': cmd.id,
                     'tag': tag_id
@@ -645,9 +695,10 @@ class TaskCommandHandlers:
             if filter_options:
                 tasks = uow.tasks.get_by_conditions(
                     entities.task.Task,
-                    filter_options.get_only_set_attributes())
+                    filter_options.get_only_set_attributes(),
+                    profile='task_list')
             else:
-                tasks = uow.tasks.list(entities.task.Task)
+                tasks = uow.tasks.list(entities.task.Task, profile='task_list')
             if tasks:
                 print_options = printer.PrintOptions.from_kwargs(**context)
                 bus.printer.console.print_task(tasks, print_options)
@@ -681,17 +732,25 @@ class TaskEventHandlers:
                              {'modification_date': datetime.now()})
             uow.commit()
 
-    @register(event=events.TaskUpdated)
-    def updated(event: events.TaskUpdated,
+    @register(event=events.TaskUpdated, batch=True)
+    def updated(task_events: list[events.TaskUpdated],
                 bus: 'messagebus.MessageBus',
                 context: dict = {}) -> None:
         with bus.uow as uow:
-            task_event = entities.event_history.TaskEvent(**asdict(event))
-            uow.tasks.add(task_event)
-            uow.tasks.update(entities.task.Task, event.task,
-                             {'modification_date': datetime.now()})
+            uow.tasks.add_many(entities.event_history.TaskEvent, [
+                asdict(entities.event_history.TaskEvent(**asdict(event)))
+                for event in task_events
+            ])
+            uow.tasks.update_many(entities.task.Task,
+                                  {int(event.task)
+                                   for event in task_events},
+                                  {'modification_date': datetime.now()})
             uow.commit()
-            logging.debug(f'Task updated, context {event}')
+            logging.debug(f'Tasks updated, context {task_events}')
+        # one history insert and one modification_date update per batch
+        bus.metrics.record(len(task_events), 2)
+        logging.debug('Coalesced TaskUpdated events, %s writes saved so far',
+                      bus.metrics.writes_saved)
 
     @register(event=events.TaskDeleted)
     def deleted(event: events.TaskDeleted,
@@ -788,8 +847,8 @@ class ProjectCommandHandlers:
                 entities.project.Project, commands.CreateProject)
         project_id = None
         with bus.uow as uow:
-            if not (existing_project := uow.tasks.get(entities.project.Project,
-                                                      cmd.name)):
+            if not (project_id := uow.tasks.resolve_id(
+                    entities.project.Project, cmd.name)):
                 cmd = convert_workspace(cmd, bus)
                 new_project = entities.project.Project(**asdict(cmd))
                 uow.tasks.add(new_project)
@@ -799,10 +858,8 @@ class ProjectCommandHandlers:
                 uow.published_messages.append(new_event)
                 uow.commit()
                 bus.printer.console.print_new_object(new_project)
-                bus.publisher.publish('Topic', new_event)
             else:
                 logging.warning(f'Project {cmd.name} already exists')
-                project_id = existing_project.id
             return project_id
 
     @register(cmd=commands.UpdateProject)
@@ -820,6 +877,7 @@ class ProjectCommandHandlers:
             uow.tasks.update(entities.project.Project, project.id,
                              cmd.get_only_set_attributes())
             uow.commit()
+            uow.published_messages.append(events.ProjectUpdated(project.id))
             ProjectCommandHandlers._process_extra_args(project.id, context,
                                                        uow)
 
@@ -835,7 +893,6 @@ class ProjectCommandHandlers:
             uow.published_messages.append(events.ProjectCompleted(project.id))
             ProjectCommandHandlers._process_extra_args(project.id, context,
                                                        uow)
-            bus.publisher.publish('Topic', events.ProjectCompleted(project.id))
 
     @register(cmd=commands.DeleteProject)
     def delete(cmd: commands.DeleteProject,
@@ -849,7 +906,6 @@ class ProjectCommandHandlers:
             uow.published_messages.append(events.ProjectDeleted(project.id))
             ProjectCommandHandlers._process_extra_args(project.id, context,
                                                        uow)
-            bus.publisher.publish('Topic', events.ProjectDeleted(project.id))
 
     @register(cmd=commands.CommentProject)
     def comment(cmd: commands.CommentProject,
@@ -869,14 +925,13 @@ class ProjectCommandHandlers:
         with bus.uow as uow:
             project = ProjectCommandHandlers._validate_project(cmd.id, uow)
             # TODO: Extract into it's own method
-            if not (existing_tag := uow.tasks.list(entities.tag.BaseTag,
-                                                   {'text': cmd.tag})):
+            if not (tag_id := uow.tasks.resolve_id(entities.tag.BaseTag,
+                                                   cmd.tag)):
                 new_tag = entities.tag.BaseTag(text=cmd.tag)
                 uow.tasks.add(new_tag)
                 uow.flush()
                 tag_id = new_tag.id
-            else:
-                tag_id = existing_tag[0].id
+                uow.published_messages.append(events.TagCreated(tag_id))
             if not uow.tasks.list(entities.tag.ProjectTag, {
                     'project': project.id,
                     'tag': tag_id
@@ -894,14 +949,13 @@ class ProjectCommandHandlers:
                     entities.project.Project, cmd.id)):
                 raise exceptions.EntityNotFound(
                     f'Project id {cmd.id} is not found')
-            if not (existing_user := uow.tasks.list(
-                    entities.user.User, {'name': cmd.collaborator})):
+            if not (user_id := uow.tasks.resolve_id(entities.user.User,
+                                                    cmd.collaborator)):
                 new_user = entities.user.User(name=cmd.collaborator)
                 uow.tasks.add(new_user)
                 uow.flush()
                 user_id = new_user.id
-            else:
-                user_id = existing_user[0].id
+                uow.published_messages.append(events.UserCreated(user_id))
             if not uow.tasks.list(entities.collaborator.ProjectCollaborator, {
                     'project': cmd.id,
                     'collaborator': user_id
@@ -927,7 +981,10 @@ class ProjectCommandHandlers:
              context: dict = {}) -> None:
         with bus.uow as uow:
             project = ProjectCommandHandlers._validate_project(cmd.id, uow)
-            bus.printer.tui.print_project(project, bus)
+            statistics = views.project_statistics(uow.tasks.session,
+                                                  [project.id])
+            bus.printer.tui.print_project(project, bus,
+                                          statistics[project.id])
 
     @register(cmd=commands.ListProject)
     def list(cmd: commands.ListProject,
@@ -940,10 +997,14 @@ class ProjectCommandHandlers:
                     projects = uow.tasks.get_by_conditions(
                         entities.project.Project,
                         filter_options.get_only_set_attributes())
+                    statistics = views.project_statistics(
+                        uow.tasks.session, [project.id for project in projects])
                 else:
                     projects = uow.tasks.list(entities.project.Project)
+                    statistics = views.project_statistics(uow.tasks.session)
                 bus.printer.console.print_project(
-                    projects, printer.PrintOptions.from_kwargs(**context))
+                    projects, printer.PrintOptions.from_kwargs(**context),
+                    statistics)
 
     @register(cmd=commands.SyncProject)
     def sync(cmd: commands.SyncProject,
@@ -987,7 +1048,9 @@ class ProjectCommandHandlers:
                     f'Project id {id} is not found')
         return existing_project
 
-    def _sync_project(uow, project: entities.project.Project):
+    def _sync_project(uow,
+                      project: entities.project.Project,
+                      asana_migrator: asana.AsanaMigrator | None = None):
         asana_project = uow.tasks.get_by_id(asana.AsanaProject, project.id)
         if not asana_project:
             return
@@ -1005,14 +1068,14 @@ class ProjectCommandHandlers:
             return
         project_sync_date = datetime.now()
         synced_tasks = views.external_connectors_asana_tasks(
-            uow.repo.session, project.id)
+            uow.tasks.session, project.id)
         mapped_external_users = views.external_connectors_asana_users(
-            uow.repo.session)
-        # TODO: Store default assign user and token in config
-        configuration = asn.Configuration()
-        configuration.access_token = os.getenv('ASANA_PERSONAL_ACCESS_TOKEN')
-        asana_client = asn.ApiClient(configuration)
-        asana_migrator = asana.AsanaMigrator(asana_client)
+            uow.tasks.session)
+        if not asana_migrator:
+            # TODO: Store default assign user and token in config
+            asana_client = asana.create_client(
+                os.getenv('ASANA_PERSONAL_ACCESS_TOKEN'))
+            asana_migrator = asana.AsanaMigrator(asana_client)
         asana_migrator.load_task_statuses(asana_project_id)
         for i, task in enumerate(tasks):
             if not task.sync:
@@ -1120,7 +1183,6 @@ class EpicCommandHandlers:
             uow.commit()
             uow.published_messages.append(events.EpicCompleted(cmd.id))
             EpicCommandHandlers._process_extra_args(cmd.id, context, uow)
-        bus.publisher.publish('Topic', events.EpicCompleted(cmd.id))
 
     @register(cmd=commands.DeleteEpic)
     def delete(cmd: commands.DeleteEpic,
@@ -1131,7 +1193,6 @@ class EpicCommandHandlers:
             uow.commit()
             uow.published_messages.append(events.EpicDeleted(cmd.id))
             EpicCommandHandlers._process_extra_args(cmd.id, context, uow)
-        bus.publisher.publish('Topic', events.EpicDeleted(cmd.id))
 
     @register(cmd=commands.CommentEpic)
     def comment(cmd: commands.CommentEpic,
@@ -1229,9 +1290,8 @@ class StoryCommandHandlers:
             uow.tasks.update(entities.project.Story, cmd.id,
                              {'status': 'COMPLETED'})
             uow.commit()
-            uow.published_messages.append(events.StoryDeleted(cmd.id))
+            uow.published_messages.append(events.StoryCompleted(cmd.id))
             StoryCommandHandlers._process_extra_args(cmd.id, context, uow)
-        bus.publisher.publish('Topic', events.StoryCompleted(cmd.id))
 
     @register(cmd=commands.DeleteStory)
     def delete(cmd: commands.DeleteStory,
@@ -1243,7 +1303,6 @@ class StoryCommandHandlers:
             uow.commit()
             uow.published_messages.append(events.StoryDeleted(cmd.id))
             StoryCommandHandlers._process_extra_args(cmd.id, context, uow)
-        bus.publisher.publish('Topic', events.StoryDeleted(cmd.id))
 
     @register(cmd=commands.CommentStory)
     def comment(cmd: commands.CommentStory,
@@ -1305,13 +1364,19 @@ class WorkspaceCommandHandlers:
             cmd, context = templates.create_command_from_editor(
                 entities.sprint.Sprint, type(cmd))
         with bus.uow as uow:
-            if not uow.tasks.get(entities.workspace.Workspace, cmd.name):
+            if not (workspace_id := uow.tasks.resolve_id(
+                    entities.workspace.Workspace, cmd.name)):
                 new_workspace = entities.workspace.Workspace(**asdict(cmd))
                 uow.tasks.add(new_workspace)
+                uow.flush()
+                workspace_id = int(new_workspace.id)
+                uow.published_messages.append(
+                    events.WorkspaceCreated(workspace_id))
                 uow.commit()
                 bus.printer.console.print_new_object(new_workspace)
             else:
                 logging.warning(f'Workspace {cmd.name} already exists')
+            return workspace_id
 
     @register(cmd=commands.ListWorkspace)
     def list(cmd: commands.ListWorkspace,
@@ -1330,10 +1395,11 @@ class TagCommandHandlers:
                bus: 'messagebus.MessageBus',
                context: dict = {}) -> None:
         with bus.uow as uow:
-            if not uow.tasks.get_by_conditions(entities.tag.BaseTag,
-                                               {'text': cmd.text}):
+            if not uow.tasks.resolve_id(entities.tag.BaseTag, cmd.text):
                 new_tag = entities.tag.BaseTag(**asdict(cmd))
                 uow.tasks.add(new_tag)
+                uow.flush()
+                uow.published_messages.append(events.TagCreated(new_tag.id))
                 uow.commit()
                 bus.printer.console.print_new_object(new_tag)
                 return cmd.text
@@ -1345,10 +1411,10 @@ class TagCommandHandlers:
                bus: 'messagebus.MessageBus',
                context: dict = {}) -> None:
         with bus.uow as uow:
-            if tags := uow.tasks.get_by_conditions(entities.tag.BaseTag,
-                                                   {'text': cmd.text}):
-                uow.tasks.delete(entities.tag.BaseTag, tags[0].id)
+            if tag_id := uow.tasks.resolve_id(entities.tag.BaseTag, cmd.text):
+                uow.tasks.delete(entities.tag.BaseTag, tag_id)
                 uow.commit()
+                uow.published_messages.append(events.TagDeleted(tag_id))
                 return cmd.text
             else:
                 logging.warning(f'Tag {cmd.text} does not exists')
@@ -1362,6 +1428,18 @@ class TagCommandHandlers:
                 bus.printer.console.print_tag(tags)
 
 
+class SearchCommandHandlers:
+
+    @register(cmd=commands.Search)
+    def search(cmd: commands.Search,
+               bus: 'messagebus.MessageBus',
+               context: dict = {}) -> list[dict]:
+        entity_types = cmd.entity_type.split(',') if cmd.entity_type else None
+        results = views.search(bus.uow, cmd.text, cmd.limit, entity_types)
+        bus.printer.console.print_search_results(results)
+        return results
+
+
 class UserCommandHandlers:
 
     @register(cmd=commands.CreateUser)
@@ -1369,13 +1447,18 @@ class UserCommandHandlers:
                bus: 'messagebus.MessageBus',
                context: dict = {}) -> None:
         with bus.uow as uow:
-            if not uow.tasks.get(entities.user.User, cmd.name):
+            if not (user_id := uow.tasks.resolve_id(entities.user.User,
+                                                    cmd.name)):
                 new_user = entities.user.User(**asdict(cmd))
                 uow.tasks.add(new_user)
+                uow.flush()
+                user_id = int(new_user.id)
+                uow.published_messages.append(events.UserCreated(user_id))
                 uow.commit()
                 bus.printer.console.print_new_object(new_user)
             else:
                 logging.warning(f'User {cmd.name} already exists')
+            return user_id
 
     @register(cmd=commands.ListUser)
     def list(cmd: commands.ListUser,
@@ -1433,8 +1516,11 @@ def convert_project(cmd: commands.Command,
     if project_name.isnumeric():
         cmd.project = int(project_name)
         return cmd
-    if not (existing_project := bus.uow.tasks.get(entities.project.Project,
-                                                  project_name)):
+    if not (project_id := bus.uow.tasks.resolve_id(entities.project.Project,
+                                                   project_name)):
+        from rich.prompt import Confirm
+        from rich.prompt import Prompt
+
         answer = Confirm.ask(
             f'Creating new project: {project_name}. Do you want to continue?')
         if not answer:
@@ -1446,9 +1532,7 @@ def convert_project(cmd: commands.Command,
             cmd=commands.CreateProject(name=project_name),
             bus=bus,
             context=context)
-        cmd.project = project_id
-    else:
-        cmd.project = int(existing_project.id)
+    cmd.project = project_id
     return cmd
 
 
@@ -1462,7 +1546,7 @@ def convert_workspace(cmd: commands.Command,
         ...
     if not (workspace := cmd.workspace):
         workspace = bus.config.get('workspace')
-    if not (existing_workspace := bus.uow.tasks.get(
+    if not (workspace_id := bus.uow.tasks.resolve_id(
             entities.workspace.Workspace, workspace)):
         print(f'Creating new workspace: {workspace}. '
               'Do you want to continue (Y/n)?')
@@ -1477,9 +1561,7 @@ def convert_workspace(cmd: commands.Command,
             cmd=commands.CreateWorkspace(name=workspace),
             bus=bus,
             context=context)
-        cmd.workspace = workspace_id
-    else:
-        cmd.workspace = int(existing_workspace.id)
+    cmd.workspace = workspace_id
     return cmd
 
 
@@ -1494,13 +1576,11 @@ def convert_user(cmd: commands.Command,
         return cmd
     except ValueError:
         ...
-    if not (existing_user := bus.uow.tasks.get(entities.user.User,
-                                               user_value)):
+    if not (user_id := bus.uow.tasks.resolve_id(entities.user.User,
+                                                user_value)):
         user_id = UserCommandHandlers.create(
             cmd=commands.CreateUser(name=user_value), bus=bus, context=context)
-        setattr(cmd, user_type, user_id)
-    else:
-        setattr(cmd, user_type, int(existing_user.id))
+    setattr(cmd, user_type, user_id)
     return cmd
 
 
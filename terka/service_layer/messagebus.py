@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import contextlib
+import functools
 import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Callable
 from typing import Type
 
 from terka import exceptions
@@ -9,12 +16,42 @@ from terka.domain import commands
 from terka.domain import events
 from terka.presentations.console import printer
 from terka.service_layer import handlers
+from terka.service_layer import profiling
 from terka.service_layer import unit_of_work
 
 Message = commands.Command | events.Event
+# commands which only read run without taking the write lock, so the TUI
+# started by Show* does not block other writers while it is open
+READ_ONLY_COMMANDS = (commands.List, commands.Show, commands.Get,
+                      commands.Search)
+
+
+@dataclass
+class CoalescingMetrics:
+    task_updated_events: int = 0
+    history_writes: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock,
+                                  repr=False,
+                                  compare=False)
+
+    def record(self, task_updated_events: int, history_writes: int) -> None:
+        # commands of concurrent requests are coalesced on their own threads
+        with self._lock:
+            self.task_updated_events += task_updated_events
+            self.history_writes += history_writes
+
+    @property
+    def writes_saved(self) -> int:
+        # each TaskUpdated used to insert a history row and update its task
+        return 2 * self.task_updated_events - self.history_writes
 
 
 class MessageBus:
+    """Dispatches messages to handlers.
+
+    The message queue and return value are kept per thread, so one bus can
+    serve concurrent requests; `uow` scopes sessions the same way.
+    """
 
     def __init__(self,
                  uow: unit_of_work.AbstractUnitOfWork,
@@ -28,33 +65,125 @@ class MessageBus:
         self.event_handlers = event_handlers
         self.command_handlers = command_handlers
         self.config = config
-        self.return_value = None
+        self._local = threading.local()
+        self.metrics = CoalescingMetrics()
+        self.profiler: profiling.Profiler | None = None
         self.printer = printer.Printer(uow)
 
-    def handle(self, message: Message, context: dict = {}):
-        self.queue = [message]
-        while self.queue:
-            message = self.queue.pop(0)
-            if isinstance(message, events.Event):
-                self.handle_event(message, context)
-            elif isinstance(message, commands.Command):
-                self.handle_command(message, context)
+    @property
+    def queue(self) -> list[Message] | None:
+        return getattr(self._local, 'queue', None)
+
+    @queue.setter
+    def queue(self, queue: list[Message] | None) -> None:
+        self._local.queue = queue
+
+    @property
+    def return_value(self):
+        return getattr(self._local, 'return_value', None)
 
-        if self.return_value:
-            return self.return_value
+    @return_value.setter
+    def return_value(self, return_value) -> None:
+        self._local.return_value = return_value
+
+    def handle(self, message: Message, context: dict = {}):
+        # Messages handled while another message is being processed
+        # (i.e. from the TUI) are committed right away.
+        outer_queue, outer_return_value = self.queue, self.return_value
+        self.queue, self.return_value = [message], None
+        handled_events = []
+        try:
+            with (self.uow.reading() if isinstance(message, READ_ONLY_COMMANDS)
+                  else self.uow.writing()):
+                while self.queue:
+                    message = self.queue.pop(0)
+                    if isinstance(message, events.Event):
+                        batch = self._collect_batch(message)
+                        self.handle_events(batch, context)
+                        handled_events.extend(batch)
+                    elif isinstance(message, commands.Command):
+                        self.handle_command(message, context)
+                self.uow.after_commit(
+                    functools.partial(self._publish, handled_events))
+                self.uow.commit()
+                if outer_queue is not None:
+                    self.uow.checkpoint()
+            if self.return_value:
+                return self.return_value
+        finally:
+            self.queue, self.return_value = outer_queue, outer_return_value
 
     def handle_command(self, command: commands.Command,
                        context: dict) -> None:
         handler = self.command_handlers[type(command)]
         try:
-            if result := handler(command, self, context):
+            with self._profile(handler):
+                result = handler(command, self, context)
+            if result:
                 self.return_value = result
-            self.queue.extend(self.uow.collect_new_events())
+            self.queue.extend(
+                self._coalesce(list(self.uow.collect_new_events())))
         except exceptions.TaskAddedToEntity:
             logging.warning('Task already added to compound entity')
 
     def handle_event(self, event: events.Event, context: dict) -> None:
-        for handler in self.event_handlers[type(event)]:
-            if result := handler(event, self, context):
-                self.return_value = result
+        self.handle_events([event], context)
+
+    def handle_events(self, batch: list[events.Event],
+                      context: dict) -> None:
+        for handler in self.event_handlers[type(batch[0])]:
+            with self._profile(handler):
+                if handler.batch:
+                    results = [handler(batch, self, context)]
+                else:
+                    results = [
+                        handler(event, self, context) for event in batch
+                    ]
+            for result in results:
+                if result:
+                    self.return_value = result
             self.queue.extend(self.uow.collect_new_events())
+
+    def _publish(self, handled_events: list[events.Event]) -> None:
+        """Publishes events once the changes behind them are committed."""
+        if self.publisher and handled_events:
+            self.publisher.publish_many([(publisher.topic(event), event)
+                                         for event in handled_events])
+
+    def _profile(self, handler: Callable):
+        if not self.profiler:
+            return contextlib.nullcontext()
+        return self.profiler.handler(handler.__qualname__)
+
+    def _coalesce(self, messages: list[Message]) -> list[Message]:
+        """Groups TaskUpdated events produced by one command.
+
+        Events are placed together at the position of the first one,
+        grouped by task, so that they are written in a single batch.
+        Every event is kept, identical ones included.
+        """
+        task_updates = defaultdict(list)
+        coalesced: list[Message | None] = []
+        position = None
+        for message in messages:
+            if not isinstance(message, events.TaskUpdated):
+                coalesced.append(message)
+                continue
+            if position is None:
+                position = len(coalesced)
+                coalesced.append(None)
+            task_updates[message.task].append(message)
+        if position is None:
+            return coalesced
+        coalesced[position:position + 1] = [
+            event for task_events in task_updates.values()
+            for event in task_events
+        ]
+        return coalesced
+
+    def _collect_batch(self, event: events.Event) -> list[events.Event]:
+        batch = [event]
+        if any(handler.batch for handler in self.event_handlers[type(event)]):
+            while self.queue and type(self.queue[0]) is type(event):
+                batch.append(self.queue.pop(0))
+        return batch
@@ -0,0 +1,165 @@
+"""Statement counts, database time and handler wall time per command."""
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import heapq
+import json
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+
+from sqlalchemy import event
+
+
+@dataclass
+class HandlerStats:
+    calls: int = 0
+    wall_time: float = 0.0
+
+
+@dataclass
+class ProfileStats:
+    statements: int = 0
+    db_time: float = 0.0
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+    handlers: dict[str, HandlerStats] = field(
+        default_factory=lambda: defaultdict(HandlerStats))
+    started: float = field(default_factory=time.perf_counter)
+
+
+class Profiler:
+    """Collects SQL and handler timings while attached to an engine.
+
+    Handler times are inclusive: a handler calling another handler
+    counts the nested call as well. With `per_thread` every thread
+    collects and resets its own stats, i.e. one request of a threaded
+    server.
+    """
+
+    def __init__(self, slowest: int = 5, per_thread: bool = False) -> None:
+        self.n_slowest = slowest
+        self.per_thread = per_thread
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    @property
+    def stats(self) -> ProfileStats:
+        if not self.per_thread:
+            return self._stats
+        if not hasattr(self._local, 'stats'):
+            self._local.stats = ProfileStats()
+        return self._local.stats
+
+    def reset(self) -> None:
+        if self.per_thread:
+            self._local.stats = ProfileStats()
+        else:
+            with self._lock:
+                self._stats = ProfileStats()
+
+    def attach(self, engine) -> None:
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+
+    def detach(self, engine) -> None:
+        event.remove(engine, 'before_cursor_execute', self._before_execute)
+        event.remove(engine, 'after_cursor_execute', self._after_execute)
+
+    @contextlib.contextmanager
+    def handler(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self.stats
+            with self._lock:
+                stats.handlers[name].calls += 1
+                stats.handlers[name].wall_time += elapsed
+
+    def summary(self) -> dict:
+        stats = self.stats
+        with self._lock:
+            return {
+                'timestamp':
+                datetime.now().isoformat(timespec='seconds'),
+                'wall_time_ms':
+                round((time.perf_counter() - stats.started) * 1000, 3),
+                'statements':
+                stats.statements,
+                'db_time_ms':
+                round(stats.db_time * 1000, 3),
+                'slowest_statements': [{
+                    'duration_ms': round(duration * 1000, 3),
+                    'statement': ' '.join(statement.split())
+                } for duration, statement in sorted(stats.slowest,
+                                                    reverse=True)],
+                'handlers': {
+                    name: {
+                        'calls': handler.calls,
+                        'wall_time_ms': round(handler.wall_time * 1000, 3)
+                    }
+                    for name, handler in sorted(stats.handlers.items(),
+                                                key=lambda item: -item[1].
+                                                wall_time)
+                }
+            }
+
+    def write(self, path: str, **extra) -> None:
+        """Appends the summary as one JSON line."""
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({**extra, **self.summary()}) + '\n')
+
+    def print(self, console) -> None:
+        from rich.table import Table
+
+        summary = self.summary()
+        console.print(f'{summary["statements"]} statements, '
+                      f'{summary["db_time_ms"]:.1f} ms in database, '
+                      f'{summary["wall_time_ms"]:.1f} ms total')
+        handlers = Table('handler', 'calls', 'wall time, ms')
+        for name, stats in summary['handlers'].items():
+            handlers.add_row(name, str(stats['calls']),
+                             f'{stats["wall_time_ms"]:.1f}')
+        console.print(handlers)
+        statements = Table('duration, ms', 'slowest statements')
+        for statement in summary['slowest_statements']:
+            statements.add_row(f'{statement["duration_ms"]:.1f}',
+                               statement['statement'][:300])
+        console.print(statements)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context,
+                        executemany) -> None:
+        conn.info.setdefault('profiler_start', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context,
+                       executemany) -> None:
+        duration = time.perf_counter() - conn.info['profiler_start'].pop()
+        stats = self.stats
+        with self._lock:
+            stats.statements += 1
+            stats.db_time += duration
+            if len(stats.slowest) < self.n_slowest:
+                heapq.heappush(stats.slowest, (duration, statement))
+            else:
+                heapq.heappushpop(stats.slowest, (duration, statement))
+
+
+@contextlib.contextmanager
+def cprofile(path: str | None):
+    """Dumps cProfile stats of the block to `path` if it is given."""
+    if not path:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
@@ -4,15 +4,18 @@ import logging
 import os
 import re
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import rich
 import yaml
 from rich.console import Console
 from rich.table import Table
 
-from terka.adapters.repository import AbsRepository
 from terka.domain import entities
 
+if TYPE_CHECKING:
+    from terka.adapters.repository import AbsRepository
+
 
 def update_config(update_pair: dict):
     config = get_config()
@@ -34,6 +37,26 @@ def get_workplace_by_name(
     return repo.get(entities.workspace.Workspace, workspace_name)
 
 
+def _lookup_id(entity: entities.entity.Entity, value: str | int,
+               repo: AbsRepository) -> int | None:
+    if isinstance(value, int) or value.isnumeric():
+        return int(value)
+    return repo.resolve_id(entity, value)
+
+
+def lookup_project_id(project: str | int, repo: AbsRepository) -> int | None:
+    return _lookup_id(entities.project.Project, project, repo)
+
+
+def lookup_workspace_id(workspace: str | int,
+                        repo: AbsRepository) -> int | None:
+    return _lookup_id(entities.workspace.Workspace, workspace, repo)
+
+
+def lookup_user_id(user: str | int, repo: AbsRepository) -> int | None:
+    return _lookup_id(entities.user.User, user, repo)
+
+
 class ServiceCommandHander:
 
     def __init__(self, home_dir, config, console=Console()):
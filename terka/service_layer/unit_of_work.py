@@ -1,15 +1,80 @@
 from __future__ import annotations
 
 import abc
+import asyncio
+import contextlib
+import dataclasses
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
 
 from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from terka.adapters import repository
 from terka.domain import commands
 from terka.domain import events
 
 
+@dataclasses.dataclass
+class StorageOptions:
+    journal_mode: str = 'WAL'
+    synchronous: str = 'NORMAL'
+    cache_size: int = -64_000
+    mmap_size: int = 256 * 1024**2
+    temp_store: str = 'MEMORY'
+    busy_timeout: int = 5_000
+
+    def __post_init__(self) -> None:
+        allowed_values = {
+            'journal_mode':
+            ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'),
+            'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+            'temp_store': ('DEFAULT', 'FILE', 'MEMORY'),
+        }
+        for pragma, values in allowed_values.items():
+            value = str(getattr(self, pragma)).upper()
+            if value not in values:
+                raise ValueError(
+                    f'Invalid storage option {pragma}: {value}, '
+                    f'expected one of {", ".join(values)}')
+            setattr(self, pragma, value)
+        for pragma in ('cache_size', 'mmap_size', 'busy_timeout'):
+            setattr(self, pragma, int(getattr(self, pragma)))
+
+    @classmethod
+    def from_kwargs(cls, **kwargs: dict) -> StorageOptions:
+        profile = kwargs.get('profile', 'laptop')
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(f'Unknown storage profile: {profile}')
+        cls_dict = dict(STORAGE_PROFILES[profile])
+        for k, v in kwargs.items():
+            if k in cls.__match_args__ and v is not None:
+                cls_dict[k] = v
+        return cls(**cls_dict)
+
+    @property
+    def pragmas(self) -> dict[str, str | int]:
+        return dataclasses.asdict(self)
+
+
+# laptop: single user, small footprint; server: TUI, cron jobs and the API
+# writing to the same file concurrently.
+STORAGE_PROFILES = {
+    'laptop': {},
+    'server': {
+        'cache_size': -256_000,
+        'mmap_size': 1024**3,
+        'busy_timeout': 30_000
+    },
+}
+
+
 class AbstractUnitOfWork(abc.ABC):
     tasks: repository.AbsRepository
     published_messages: list[events.Event | commands.Command] = []
@@ -20,9 +85,25 @@ class AbstractUnitOfWork(abc.ABC):
     def __exit__(self, *args):
         self.rollback()
 
+    @contextlib.contextmanager
+    def writing(self):
+        """Scope that is expected to write."""
+        with self:
+            yield self
+
+    @contextlib.contextmanager
+    def reading(self):
+        """Scope that is expected to only read."""
+        with self:
+            yield self
+
     def commit(self):
         self._commit()
 
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Calls `callback` once the changes made so far are committed."""
+        callback()
+
     def flush(self):
         self._flush()
 
@@ -44,30 +125,275 @@ class AbstractUnitOfWork(abc.ABC):
 
 
 class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
+    """Unit of work sharing one session between nested `with` blocks.
+
+    Nested blocks run in savepoints: their `commit` releases the savepoint
+    and changes are written when the outermost block commits. Sessions and
+    published messages are kept per thread on top of one engine and pool.
+    `after_commit` callbacks wait for the outermost commit as well and are
+    dropped together with the savepoint they were registered in.
+    """
 
-    def __init__(self, session_factory) -> None:
-        self.engine = create_engine(session_factory)
+    def __init__(self,
+                 session_factory,
+                 storage_options: StorageOptions | None = None,
+                 name_cache_size: int = 1024,
+                 pool_size: int = 8) -> None:
+        url = make_url(session_factory)
+        if url.get_backend_name() == 'sqlite' and url.database not in (
+                None, '', ':memory:'):
+            # pysqlite defaults to a new connection (and pragmas) per
+            # session for files, keep connections instead
+            self.engine = create_engine(
+                url,
+                poolclass=QueuePool,
+                pool_size=pool_size,
+                max_overflow=4 * pool_size,
+                connect_args={'check_same_thread': False})
+        else:
+            self.engine = create_engine(url)
+        self.storage_options = storage_options or StorageOptions()
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', self._set_pragmas)
+            event.listen(self.engine, 'begin', self._begin)
         self.session_factory = sessionmaker(self.engine)
-        self.published_messages: list[events.Event | commands.Command] = []
+        self.name_cache_size = name_cache_size
+        self._scope = threading.local()
 
     @property
     def repo(self):
         return repository.SqlAlchemyRepository(self.session_factory())
 
+    @property
+    def session(self):
+        return self._scope.session
+
+    @property
+    def tasks(self) -> repository.SqlAlchemyRepository:
+        return self._scope.tasks
+
+    @property
+    def name_cache(self) -> repository.NameResolutionCache:
+        # names are cached per thread and transaction: other processes and
+        # threads may rename or delete rows in between
+        if not hasattr(self._scope, 'name_cache'):
+            self._scope.name_cache = repository.NameResolutionCache(
+                self.name_cache_size)
+        return self._scope.name_cache
+
+    @property
+    def published_messages(self) -> list[events.Event | commands.Command]:
+        if not hasattr(self._scope, 'published_messages'):
+            self._scope.published_messages = []
+        return self._scope.published_messages
+
+    @published_messages.setter
+    def published_messages(
+            self, messages: list[events.Event | commands.Command]) -> None:
+        self._scope.published_messages = messages
+
+    @property
+    def depth(self) -> int:
+        return getattr(self._scope, 'depth', 0)
+
     def __enter__(self) -> None:
-        self.session = self.session_factory()  # type: Session
-        self.tasks = repository.SqlAlchemyRepository(self.session)
+        if not self.depth:
+            self.name_cache.invalidate()
+            self._scope.session = self.session_factory()  # type: Session
+            self._scope.tasks = repository.SqlAlchemyRepository(
+                self._scope.session, self.name_cache)
+            self._scope.savepoints = []
+            self._scope.callbacks = []
+            self._scope.callback_marks = []
+        else:
+            self._scope.savepoints.append(self.session.begin_nested())
+            self._scope.callback_marks.append(len(self._scope.callbacks))
+        self._scope.depth = self.depth + 1
         return super().__enter__()
 
-    def __exit__(self, *args):
-        super().__exit__(*args)
-        self.session.close()
+    def __exit__(self, exc_type, *args):
+        if exc_type:
+            # names resolved inside a failed scope may point to discarded rows
+            self.name_cache.invalidate()
+        self._scope.depth -= 1
+        if self.depth:
+            self._scope.savepoints.pop().rollback()
+            del self._scope.callbacks[self._scope.callback_marks.pop():]
+            if self.depth == 1 and getattr(self._scope, 'reading', False):
+                # a savepoint started a transaction, end it before the
+                # reading scope goes on
+                self.checkpoint()
+        else:
+            self._scope.callbacks = []
+            self.session.rollback()
+            self.session.close()
+            self._scope.deferred_transaction = False
+
+    @contextlib.contextmanager
+    def writing(self):
+        # a deferred transaction cannot be upgraded to a write one while
+        # another connection writes, so writers take the lock upfront and
+        # wait for it up to busy_timeout
+        immediate = getattr(self._scope, 'immediate', False)
+        self._scope.immediate = True
+        try:
+            if self.depth and getattr(self._scope, 'deferred_transaction',
+                                      False):
+                # nested in a reading scope (i.e. the TUI), restart the
+                # outer transaction as a write one
+                self.checkpoint(immediate=True)
+            with self:
+                yield self
+        finally:
+            self._scope.immediate = immediate
+
+    @contextlib.contextmanager
+    def reading(self):
+        # statements of a reading scope run without an explicit transaction,
+        # an open one would keep its snapshot (and block WAL checkpoints)
+        # for as long as the TUI is open
+        if self.depth:
+            with self:
+                yield self
+            return
+        self._scope.reading = True
+        try:
+            with self:
+                yield self
+        finally:
+            self._scope.reading = False
+
+    def checkpoint(self, immediate: bool = False) -> None:
+        """Commits the whole transaction keeping nested scopes open.
+
+        Nested scopes continue in a deferred transaction unless
+        `immediate`, so an open scope does not keep the write lock.
+        """
+        savepoints = self._scope.savepoints
+        if transaction := self.session.get_transaction():
+            transaction.commit()
+        self._scope.callback_marks[:] = [0] * len(savepoints)
+        self._run_callbacks()
+        outer_immediate = getattr(self._scope, 'immediate', False)
+        self._scope.immediate = immediate
+        try:
+            savepoints[:] = [self.session.begin_nested() for _ in savepoints]
+        finally:
+            self._scope.immediate = outer_immediate
+
+    def _set_pragmas(self, dbapi_connection, connection_record) -> None:
+        # let SQLAlchemy emit BEGIN itself so savepoints work with pysqlite
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma, value in self.storage_options.pragmas.items():
+            cursor.execute(f'PRAGMA {pragma}={value}')
+        cursor.close()
+
+    def _begin(self, connection) -> None:
+        # in-memory databases share a single connection between sessions
+        immediate = getattr(self._scope, 'immediate', False)
+        self._scope.deferred_transaction = not immediate
+        self.name_cache.invalidate()
+        if not immediate and getattr(self._scope, 'reading', False):
+            return
+        if not connection.connection.in_transaction:
+            connection.exec_driver_sql(
+                'BEGIN IMMEDIATE' if immediate else 'BEGIN')
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        if self.depth:
+            self._scope.callbacks.append(callback)
+        else:
+            callback()
+
+    def _run_callbacks(self) -> None:
+        callbacks, self._scope.callbacks = self._scope.callbacks, []
+        for callback in callbacks:
+            callback()
 
     def _commit(self):
-        self.session.commit()
+        if savepoints := self._scope.savepoints:
+            savepoints[-1].commit()
+            savepoints[-1] = self.session.begin_nested()
+            # released into the enclosing scope, its rollback drops them
+            self._scope.callback_marks[-1] = len(self._scope.callbacks)
+        else:
+            self.session.commit()
+            self._run_callbacks()
 
     def _flush(self):
         self.session.flush()
 
     def rollback(self):
-        self.session.rollback()
+        self.name_cache.invalidate()
+        if savepoints := self._scope.savepoints:
+            savepoints[-1].rollback()
+            savepoints[-1] = self.session.begin_nested()
+            del self._scope.callbacks[self._scope.callback_marks[-1]:]
+        else:
+            self.session.rollback()
+            self._scope.callbacks = []
+
+
+class AsyncUnitOfWork(AbstractUnitOfWork):
+    """Runs blocking unit of work code on a bounded thread pool.
+
+    Sessions are scoped per thread, so a whole unit of work (a view or
+    `bus.handle`) is passed to `run` and executes on one pool thread while
+    the event loop keeps serving other clients. Everything else is
+    delegated to the wrapped unit of work.
+    """
+
+    def __init__(self,
+                 uow: SqlAlchemyUnitOfWork,
+                 max_workers: int = 8) -> None:
+        self.uow = uow
+        self.executor = ThreadPoolExecutor(max_workers,
+                                           thread_name_prefix='terka-db')
+
+    async def run(self, function: Callable, *args, **kwargs) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(function, *args, **kwargs))
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.uow, name)
+
+    @property
+    def tasks(self) -> repository.SqlAlchemyRepository:
+        return self.uow.tasks
+
+    @property
+    def published_messages(self) -> list[events.Event | commands.Command]:
+        return self.uow.published_messages
+
+    def __enter__(self):
+        self.uow.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self.uow.__exit__(*args)
+
+    @contextlib.contextmanager
+    def writing(self):
+        with self.uow.writing():
+            yield self
+
+    @contextlib.contextmanager
+    def reading(self):
+        with self.uow.reading():
+            yield self
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self.uow.after_commit(callback)
+
+    def _commit(self):
+        self.uow.commit()
+
+    def _flush(self):
+        self.uow.flush()
+
+    def rollback(self):
+        self.uow.rollback()
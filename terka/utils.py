@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import os
 import re
 from dataclasses import asdict
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
+from typing import TYPE_CHECKING
+from typing import Iterator
 
 import yaml
 
 from . import exceptions
-from terka.adapters.repository import AbsRepository
 from terka.domain import commands
 from terka.service_layer import services
 
+if TYPE_CHECKING:
+    from terka.adapters.repository import AbsRepository
+
+
 def create_task_dict(kwargs: list[str]) -> dict[str, str]:
     new_dict = {}
     for i, kwarg in enumerate(kwargs):
@@ -33,30 +39,33 @@ def create_task_dict(kwargs: list[str]) -> dict[str, str]:
     return new_dict
 
 
+def read_task_file(file_path: str) -> Iterator[dict[str, str]]:
+    with open(file_path, 'r') as f:
+        for line in f:
+            if not (line := line.strip()):
+                continue
+            entry = line.split('::', 2)
+            if len(entry) == 3:
+                task_dict = {
+                    'project': entry[0],
+                    'name': entry[1],
+                    'description': entry[2]
+                }
+            elif len(entry) == 2:
+                task_dict = {
+                    'project': entry[0],
+                    'name': entry[1],
+                }
+            elif len(entry) == 1:
+                task_dict = {'name': entry[0]}
+            yield task_dict
+
+
 def format_task_dict(config: dict, entity: str,
-                     kwargs: dict) -> dict | list[dict]:
+                     kwargs: dict) -> dict | Iterator[dict]:
     _new_dict = create_task_dict(kwargs)
     if file_path := _new_dict.get('f'):
-        task_dicts: dict = []
-        with open(file_path, 'r') as f:
-            lines = [line.rstrip() for line in f if line.rstrip()]
-            for line in lines:
-                entry = line.strip().split('::')
-                if len(entry) == 3:
-                    task_dict = {
-                        'project': entry[0],
-                        'name': entry[1],
-                        'description': entry[2]
-                    }
-                elif len(entry) == 2:
-                    task_dict = {
-                        'project': entry[0],
-                        'name': entry[1],
-                    }
-                elif len(entry) == 1:
-                    task_dict = {'name': entry[0]}
-                task_dicts.append(task_dict)
-        return task_dicts
+        return read_task_file(file_path)
     if len(kwargs) > 1:
         new_dict = create_task_dict(kwargs)
         task_dict = {
@@ -123,6 +132,10 @@ def format_task_dict(config: dict, entity: str,
             new_dict.get('show-commentaries') or new_dict.get('show-comments'),
             'show_notes':
             new_dict.get('show-notes'),
+            'limit':
+            new_dict.get('limit'),
+            'entity_type':
+            new_dict.get('type'),
             # "epics":
             # new_dict.get("epics"),
             # "stories":
@@ -249,7 +262,8 @@ def process_command(command: str, config: dict,
         task_dict = format_task_dict(config, entity, task_list)
     else:
         task_dict = {}
-    task_dict = update_task_dict(task_dict, repo)
+    if isinstance(task_dict, dict):
+        task_dict = update_task_dict(task_dict, repo)
     return command, entity, task_dict
 
 
@@ -335,6 +349,11 @@ def format_entity(entity: str) -> str:
     return entity
 
 
+def env_flag(name: str) -> bool:
+    """Reads a boolean environment variable, `1`, `true`, `yes` or `on`."""
+    return os.getenv(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 def load_config(home_dir: str) -> dict:
     try:
         with open(f'{home_dir}/.terka/config.yaml', encoding='utf-8') as f:
@@ -1,191 +1,497 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import json
+from collections import defaultdict
+from collections.abc import Collection
+from datetime import date
 from datetime import datetime
+from datetime import timedelta
+from statistics import median
 
+from sqlalchemy import bindparam
+from sqlalchemy import text
+
+from terka import exceptions
+from terka.adapters import change_log
+from terka.adapters import search as search_index
 from terka.domain import entities
 
+OPEN_TASK_STATUSES = ('TODO', 'IN_PROGRESS', 'REVIEW')
+TASK_STATUSES = ('BACKLOG', *OPEN_TASK_STATUSES, 'DONE', 'DELETED')
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# derived project fields and the project_statistics keys they come from
+PROJECT_STATISTICS = {
+    'open_tasks': 'open_tasks',
+    'overdue_tasks': 'overdue',
+    'backlog': 'backlog',
+    'review': 'review',
+    'in_progress': 'in_progress',
+    'done': 'done',
+}
+SORTABLE_COLUMNS = {
+    'Task': ('id', 'name', 'creation_date', 'modification_date', 'due_date'),
+    'Project': ('id', 'name'),
+}
+
+
+def _encode_cursor(order_by: str, value, entity_id: int) -> str:
+    if isinstance(value, date):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(
+        json.dumps([order_by, value, entity_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str, order_by: str, column) -> tuple:
+    try:
+        cursor_order_by, value, entity_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode()))
+        if value is not None and column.type.python_type in (date,
+                                                              datetime):
+            value = column.type.python_type.fromisoformat(value)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise exceptions.TerkaInvalidPage(f'Invalid cursor {cursor}') from e
+    if cursor_order_by != order_by:
+        raise exceptions.TerkaInvalidPage(
+            f'Cursor was issued for order_by={cursor_order_by}')
+    return value, entity_id
+
+
+def _requested(fields: Collection[str] | None, field: str) -> bool:
+    return fields is None or field in fields
+
+
+def _entities(uow,
+              entity,
+              fields: Collection[str] | None = None) -> list[dict]:
+    with uow:
+        return [
+            row.to_dict(fields)
+            for row in uow.tasks.list(entity, columns=fields)
+        ]
+
 
-def projects(uow) -> list[dict]:
+def page(uow,
+         entity,
+         limit: int | None = None,
+         cursor: str | None = None,
+         order_by: str = 'id',
+         fields: Collection[str] | None = None) -> dict:
+    """Returns one page of `entity` rows and the cursor of the next one.
+
+    Pages are read with keyset pagination on (`order_by`, id), so only
+    `limit` rows are loaded however large the table is.
+    """
+    column_name = order_by.lstrip('-')
+    if column_name not in SORTABLE_COLUMNS[entity.__name__]:
+        raise exceptions.TerkaInvalidPage(f'Cannot order by {column_name}')
+    limit = DEFAULT_PAGE_SIZE if limit is None else limit
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise exceptions.TerkaInvalidPage(
+            f'limit should be between 1 and {MAX_PAGE_SIZE}')
+    after = _decode_cursor(cursor, order_by, getattr(
+        entity, column_name)) if cursor else None
     with uow:
-        return [t.to_dict() for t in uow.tasks.list(entities.project.Project)]
+        rows = uow.tasks.page(entity,
+                              limit + 1,
+                              order_by,
+                              after,
+                              columns=fields)
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = _encode_cursor(order_by,
+                                         getattr(last, column_name), last.id)
+        return {
+            'items': [row.to_dict(fields) for row in rows[:limit]],
+            'next_cursor': next_cursor
+        }
+
+
+def projects(uow,
+             limit: int | None = None,
+             cursor: str | None = None,
+             order_by: str = 'id',
+             fields: Collection[str] | None = None) -> list[dict] | dict:
+    if limit is not None or cursor:
+        return page(uow, entities.project.Project, limit, cursor, order_by,
+                    fields)
+    return _entities(uow, entities.project.Project, fields)
 
 
-def project(uow, project_id: int) -> dict:
+def project(uow,
+            project_id: int,
+            fields: Collection[str] | None = None) -> dict:
     with uow:
-        if not (project := uow.tasks.get_by_id(entities.project.Project,
-                                               project_id)):
+        if not (project := uow.tasks.get_by_id(
+                entities.project.Project, project_id, columns=fields)):
             return {}
-        result = project.to_dict()
-        for column in ('open_tasks', 'backlog', 'overdue_tasks', 'review',
-                       'in_progress', 'done'):
-            result[column] = len(getattr(project, column))
-        result['workspace'] = project.workspace_.name
+        result = project.to_dict(fields)
+        if fields is None or PROJECT_STATISTICS.keys() & set(fields):
+            statistics = project_statistics(uow.tasks.session,
+                                            [project.id])[project.id]
+            for field, statistic in PROJECT_STATISTICS.items():
+                if _requested(fields, field):
+                    result[field] = statistics[statistic]
+        if _requested(fields, 'workspace'):
+            result['workspace'] = (project.workspace_.name
+                                   if project.workspace_ else None)
         return result
 
 
-def project_tasks(uow, project_id: int) -> list[dict]:
+def project_tasks(uow,
+                  project_id: int,
+                  fields: Collection[str] | None = None) -> list[dict]:
     with uow:
-        if not (project := uow.tasks.get_by_id(entities.project.Project,
-                                               project_id)):
+        if not (project := uow.tasks.get_by_id(
+                entities.project.Project, project_id, columns=['id'])):
             return []
-        if tasks := project.tasks:
-            return [task.to_dict() for task in project.tasks]
-        return []
+        return [
+            task.to_dict(fields)
+            for task in uow.tasks.list(entities.task.Task,
+                                       {'project': project.id},
+                                       columns=fields)
+        ]
 
 
-def tasks(uow) -> list[dict]:
-    with uow:
-        return [t.to_dict() for t in uow.tasks.list(entities.task.Task)]
+def tasks(uow,
+          limit: int | None = None,
+          cursor: str | None = None,
+          order_by: str = 'id',
+          fields: Collection[str] | None = None) -> list[dict] | dict:
+    if limit is not None or cursor:
+        return page(uow, entities.task.Task, limit, cursor, order_by, fields)
+    return _entities(uow, entities.task.Task, fields)
 
 
-def task(uow, task_id: int) -> dict:
+def task(uow, task_id: int, fields: Collection[str] | None = None) -> dict:
     with uow:
-        if not (task := uow.tasks.get_by_id(entities.task.Task, task_id)):
+        if not (task := uow.tasks.get_by_id(
+                entities.task.Task, task_id, columns=fields)):
             return {}
-        result = task.to_dict()
-        if commentaries := task.commentaries:
-            commentaries = [comment.to_dict() for comment in commentaries]
-        result['commentaries'] = commentaries
+        result = task.to_dict(fields)
+        if _requested(fields, 'commentaries'):
+            if commentaries := task.commentaries:
+                commentaries = [comment.to_dict() for comment in commentaries]
+            result['commentaries'] = commentaries
         return result
 
 
-def task_commentaries(uow, task_id: int) -> list[dict]:
+def task_commentaries(uow,
+                      task_id: int,
+                      fields: Collection[str] | None = None) -> list[dict]:
     with uow:
         if not (task := uow.tasks.get_by_id(entities.task.Task, task_id)):
             return []
         if commentaries := task.commentaries:
-            return [comment.to_dict() for comment in commentaries]
+            return [comment.to_dict(fields) for comment in commentaries]
         return []
 
 
-def workspaces(uow) -> list[dict]:
-    with uow:
-        return [
-            t.to_dict() for t in uow.tasks.list(entities.workspace.Workspace)
-        ]
+def workspaces(uow, fields: Collection[str] | None = None) -> list[dict]:
+    return _entities(uow, entities.workspace.Workspace, fields)
 
 
-def workspace(uow, workspace_id: int) -> dict:
+def workspace(uow,
+              workspace_id: int,
+              fields: Collection[str] | None = None) -> dict:
     with uow:
-        if not (workspace := uow.tasks.get_by_id(entities.workspace.Workspace,
-                                                 workspace_id)):
+        if not (workspace := uow.tasks.get_by_id(
+                entities.workspace.Workspace, workspace_id, columns=fields)):
             return {}
-        if projects := workspace.projects:
-            projects = [project.to_dict() for project in workspace.projects]
-            result = workspace.to_dict()
-        result['projects'] = projects
+        result = workspace.to_dict(fields)
+        if _requested(fields, 'projects'):
+            result['projects'] = [
+                project.to_dict() for project in workspace.projects
+            ]
         return result
 
 
-def workspace_projects(uow, workspace_id: int) -> list[dict]:
+def workspace_projects(uow,
+                       workspace_id: int,
+                       fields: Collection[str] | None = None) -> list[dict]:
     with uow:
         if not (workspace := uow.tasks.get_by_id(entities.workspace.Workspace,
                                                  workspace_id)):
             return []
-        if projects := workspace.projects:
-            return [project.to_dict() for project in workspace.projects]
-        return []
+        return [project.to_dict(fields) for project in workspace.projects]
 
 
-def epics(uow) -> list[dict]:
+def _composite(uow, entity, entity_id: int,
+               fields: Collection[str] | None) -> dict:
     with uow:
-        return [t.to_dict() for t in uow.tasks.list(entities.epic.Epic)]
-
-
-def epic(uow, epic_id: int) -> dict:
-    with uow:
-        if not (epic := uow.tasks.get_by_id(entities.epic.Epic, epic_id)):
+        if not (composite := uow.tasks.get_by_id(
+                entity, entity_id, columns=fields)):
             return {}
-        if tasks := epic.tasks:
-            tasks = [task.tasks.to_dict() for task in epic.tasks]
-            result = epic.to_dict()
-        result['tasks'] = tasks
+        result = composite.to_dict(fields)
+        if _requested(fields, 'tasks'):
+            result['tasks'] = [
+                task.tasks.to_dict() for task in composite.tasks
+            ]
         return result
 
 
-def epic_tasks(uow, epic_id: int) -> list[dict]:
+def _composite_tasks(uow, entity, entity_id: int,
+                     fields: Collection[str] | None) -> list[dict]:
     with uow:
-        if not (epic := uow.tasks.get_by_id(entities.epic.Epic, epic_id)):
+        if not (composite := uow.tasks.get_by_id(entity, entity_id)):
             return []
-        if tasks := epic.tasks:
-            return [task.tasks.to_dict() for task in epic.tasks]
-        return []
+        return [task.tasks.to_dict(fields) for task in composite.tasks]
 
 
-def stories(uow) -> list[dict]:
-    with uow:
-        return [t.to_dict() for t in uow.tasks.list(entities.story.Story)]
+def epics(uow, fields: Collection[str] | None = None) -> list[dict]:
+    return _entities(uow, entities.epic.Epic, fields)
 
 
-def story(uow, story_id: int) -> dict:
-    with uow:
-        if not (story := uow.tasks.get_by_id(entities.story.Story, story_id)):
-            return {}
-        if tasks := story.tasks:
-            tasks = [task.tasks.to_dict() for task in story.tasks]
-            result = story.to_dict()
-        result['tasks'] = tasks
-        return result
+def epic(uow, epic_id: int, fields: Collection[str] | None = None) -> dict:
+    return _composite(uow, entities.epic.Epic, epic_id, fields)
 
 
-def story_tasks(uow, story_id: int) -> list[dict]:
-    with uow:
-        if not (story := uow.tasks.get_by_id(entities.story.Story, story_id)):
-            return []
-        if tasks := story.tasks:
-            return [task.tasks.to_dict() for task in story.tasks]
-        return []
+def epic_tasks(uow,
+               epic_id: int,
+               fields: Collection[str] | None = None) -> list[dict]:
+    return _composite_tasks(uow, entities.epic.Epic, epic_id, fields)
 
 
-def sprints(uow) -> list[dict]:
-    with uow:
-        return [t.to_dict() for t in uow.tasks.list(entities.sprint.Sprint)]
+def stories(uow, fields: Collection[str] | None = None) -> list[dict]:
+    return _entities(uow, entities.story.Story, fields)
 
 
-def sprint(uow, sprint_id: int) -> dict:
-    with uow:
-        if not (sprint := uow.tasks.get_by_id(entities.sprint.Sprint,
-                                              sprint_id)):
-            return {}
-        if tasks := sprint.tasks:
-            tasks = [task.tasks.to_dict() for task in sprint.tasks]
-            result = sprint.to_dict()
-        result['tasks'] = tasks
-        return result
+def story(uow, story_id: int, fields: Collection[str] | None = None) -> dict:
+    return _composite(uow, entities.story.Story, story_id, fields)
 
 
-def sprint_tasks(uow, sprint_id: int) -> list[dict]:
-    with uow:
-        if not (sprint := uow.tasks.get_by_id(entities.sprint.Sprint,
-                                              sprint_id)):
-            return []
-        if tasks := sprint.tasks:
-            return [task.tasks.to_dict() for task in sprint.tasks]
-        return []
+def story_tasks(uow,
+                story_id: int,
+                fields: Collection[str] | None = None) -> list[dict]:
+    return _composite_tasks(uow, entities.story.Story, story_id, fields)
 
 
-def users(uow) -> list[dict]:
-    with uow:
-        return [t.to_dict() for t in uow.tasks.list(entities.user.User)]
+def sprints(uow, fields: Collection[str] | None = None) -> list[dict]:
+    return _entities(uow, entities.sprint.Sprint, fields)
 
 
-def user(uow, user_id: int) -> dict:
+def sprint(uow,
+           sprint_id: int,
+           fields: Collection[str] | None = None) -> dict:
+    return _composite(uow, entities.sprint.Sprint, sprint_id, fields)
+
+
+def sprint_tasks(uow,
+                 sprint_id: int,
+                 fields: Collection[str] | None = None) -> list[dict]:
+    return _composite_tasks(uow, entities.sprint.Sprint, sprint_id, fields)
+
+
+def users(uow, fields: Collection[str] | None = None) -> list[dict]:
+    return _entities(uow, entities.user.User, fields)
+
+
+def user(uow, user_id: int, fields: Collection[str] | None = None) -> dict:
     with uow:
-        if not (user := uow.tasks.get_by_id(entities.user.User, user_id)):
+        if not (user := uow.tasks.get_by_id(
+                entities.user.User, user_id, columns=fields)):
             return {}
-        return user.to_dict()
+        return user.to_dict(fields)
 
 
-def tags(uow) -> list[dict]:
-    with uow:
-        return [t.to_dict() for t in uow.tasks.list(entities.tag.BaseTag)]
+def tags(uow, fields: Collection[str] | None = None) -> list[dict]:
+    return _entities(uow, entities.tag.BaseTag, fields)
 
 
-def tag(uow, tag_id: int) -> dict:
+def tag(uow, tag_id: int, fields: Collection[str] | None = None) -> dict:
     with uow:
-        if not (tag := uow.tasks.get_by_id(entities.tag.BaseTag, tag_id)):
+        if not (tag := uow.tasks.get_by_id(
+                entities.tag.BaseTag, tag_id, columns=fields)):
             return {}
-        return tag.to_dict()
+        return tag.to_dict(fields)
+
+
+def search(uow,
+           query: str,
+           limit: str | int = 20,
+           entity_types: list[str] | None = None,
+           fields: Collection[str] | None = None) -> list[dict]:
+    try:
+        limit = int(limit)
+    except ValueError as e:
+        raise exceptions.TerkaInvalidPage(f'Invalid limit {limit}') from e
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise exceptions.TerkaInvalidPage(
+            f'limit should be between 1 and {MAX_PAGE_SIZE}')
+    with uow:
+        results = search_index.search(uow.tasks.session, query, limit,
+                                      entity_types)
+    if fields is None:
+        return results
+    return [{
+        key: value
+        for key, value in result.items() if key in fields
+    } for result in results]
+
+
+def _change_entity(entity_type: str):
+    return {
+        'task': entities.task.Task,
+        'project': entities.project.Project,
+        'sprint': entities.sprint.Sprint,
+        'task_commentary': entities.commentary.TaskCommentary,
+        'project_commentary': entities.commentary.ProjectCommentary,
+        'epic': entities.epic.Epic,
+        'story': entities.story.Story,
+        'epic_commentary': entities.commentary.EpicCommentary,
+        'story_commentary': entities.commentary.StoryCommentary,
+        'sprint_commentary': entities.commentary.SprintCommentary,
+    }[entity_type]
+
+
+def changes(uow,
+            since: str | int | None = None,
+            limit: int | None = None,
+            fields: Collection[str] | None = None) -> dict:
+    """Returns entities changed after the `since` cursor in commit order.
+
+    An entity changed several times within a page is returned once, at
+    its latest change, with its current state in `data` unless deleted.
+    When changes after `since` were pruned the result has `resync` set:
+    the client reloads everything and continues from `next_cursor`.
+    """
+    try:
+        since = int(since or 0)
+    except ValueError as e:
+        raise exceptions.TerkaInvalidPage(f'Invalid cursor {since}') from e
+    limit = DEFAULT_PAGE_SIZE if limit is None else limit
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise exceptions.TerkaInvalidPage(
+            f'limit should be between 1 and {MAX_PAGE_SIZE}')
+    with uow:
+        oldest, latest = change_log.cursors(uow.tasks.session)
+        if since < oldest:
+            return {
+                'changes': [],
+                'next_cursor': latest,
+                'has_more': False,
+                'resync': True
+            }
+        rows = change_log.changes(uow.tasks.session, since, limit + 1)
+        page_rows = rows[:limit]
+        latest: dict[tuple[str, int], change_log.Change] = {}
+        created = set()
+        for change in page_rows:
+            key = (change.entity_type, change.entity_id)
+            latest.pop(key, None)
+            latest[key] = change
+            if change.operation == 'created':
+                created.add(key)
+        ids = defaultdict(list)
+        for entity_type, entity_id in latest:
+            ids[entity_type].append(entity_id)
+        current = {(entity_type, entity.id): entity.to_dict(fields)
+                   for entity_type, entity_ids in ids.items()
+                   for entity in uow.tasks.get_by_conditions(
+                       _change_entity(entity_type), {'id': entity_ids})}
+        items = []
+        for key, change in latest.items():
+            operation = change.operation
+            if operation == 'updated' and key in created:
+                operation = 'created'
+            item = {
+                'cursor': change.cursor,
+                'entity_type': change.entity_type,
+                'id': change.entity_id,
+                'operation': operation,
+                'changed_at': change.changed_at
+            }
+            if operation != 'deleted':
+                item['data'] = current.get(key)
+            items.append(item)
+    return {
+        'changes': items,
+        'next_cursor': page_rows[-1].cursor if page_rows else since,
+        'has_more': len(rows) > limit
+    }
+
+
+def empty_project_statistics() -> dict[str, int]:
+    statistics = dict.fromkeys((status.lower() for status in TASK_STATUSES),
+                               0)
+    statistics.update({
+        'open_tasks': 0,
+        'incompleted_tasks': 0,
+        'overdue': 0,
+        'stale': 0,
+        'median_task_age': 0,
+        'time_spent': 0
+    })
+    return statistics
+
+
+def project_statistics(
+        session,
+        project_ids: list[int] | None = None) -> dict[int, dict[str, int]]:
+    if project_ids is not None and not project_ids:
+        return {}
+    now = datetime.now()
+    query = text("""
+    SELECT
+        tasks.project,
+        tasks.status,
+        COUNT(*) AS n_tasks,
+        SUM(CASE WHEN tasks.due_date <= :today THEN 1 ELSE 0 END) AS n_overdue,
+        SUM(CASE WHEN task_events.last_event_date < :stale_date
+            THEN 1 ELSE 0 END) AS n_stale,
+        GROUP_CONCAT(
+            CAST(julianday(:now) - julianday(tasks.creation_date) AS INTEGER)
+        ) AS task_ages,
+        COALESCE(SUM(time_tracker_entries.time_spent), 0) AS time_spent
+    FROM tasks
+    LEFT JOIN (
+        SELECT task, SUM(time_spent_minutes) AS time_spent
+        FROM time_tracker_entries
+        GROUP BY task
+    ) AS time_tracker_entries ON time_tracker_entries.task = tasks.id
+    LEFT JOIN (
+        SELECT task, MAX(date) AS last_event_date
+        FROM task_events
+        GROUP BY task
+    ) AS task_events ON task_events.task = tasks.id
+    WHERE tasks.project IS NOT NULL
+    """ + ('AND tasks.project IN :project_ids' if project_ids else '') + """
+    GROUP BY tasks.project, tasks.status
+    """)
+    parameters = {
+        'now': now.strftime('%Y-%m-%d %H:%M:%S.%f'),
+        'today': now.date().strftime('%Y-%m-%d'),
+        'stale_date':
+        (now - timedelta(days=5)).strftime('%Y-%m-%d %H:%M:%S.%f'),
+    }
+    if project_ids:
+        query = query.bindparams(bindparam('project_ids', expanding=True))
+        parameters['project_ids'] = [int(i) for i in project_ids]
+    results: dict[int, dict[str, int]] = {
+        int(project_id): empty_project_statistics()
+        for project_id in project_ids or []
+    }
+    task_ages: dict[int, list[int]] = {}
+    for r in session.execute(query, parameters):
+        statistics = results.setdefault(r.project, empty_project_statistics())
+        statistics[r.status.lower()] = r.n_tasks
+        statistics['time_spent'] += r.time_spent
+        if r.status != 'BACKLOG' and r.status not in OPEN_TASK_STATUSES:
+            continue
+        statistics['incompleted_tasks'] += r.n_tasks
+        if r.status == 'BACKLOG':
+            continue
+        statistics['open_tasks'] += r.n_tasks
+        statistics['overdue'] += r.n_overdue
+        statistics['stale'] += r.n_stale
+        task_ages.setdefault(r.project, []).extend(
+            int(age) for age in r.task_ages.split(','))
+    for project_id, ages in task_ages.items():
+        results[project_id]['median_task_age'] = round(median(ages))
+    return results
 
 
 def sprint_task_ids(session,
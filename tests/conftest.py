@@ -6,9 +6,11 @@ from sqlalchemy.orm import clear_mappers
 from sqlalchemy.orm import sessionmaker
 
 from terka import bootstrap
+from terka.adapters import migrations
 from terka.adapters import publisher
 from terka.adapters.orm import metadata
 from terka.adapters.orm import start_mappers
+from terka.domain import commands
 from terka.service_layer import unit_of_work
 
 
@@ -54,3 +56,34 @@ def bus(fake_publisher, uow):
                                    'user': 'test_user',
                                    'workspace': 'default'
                                })
+
+
+@pytest.fixture
+def make_file_bus(tmp_path, bus):
+    """Bootstraps buses on one migrated database file in `tmp_path`.
+
+    `max_workers` wraps the unit of work in `AsyncUnitOfWork`.
+    """
+
+    def make_file_bus(storage_options=None,
+                      publish_service=None,
+                      max_workers=None):
+        uow = unit_of_work.SqlAlchemyUnitOfWork(
+            f'sqlite:///{tmp_path}/tasks.db', storage_options)
+        migrations.upgrade(uow.engine)
+        if max_workers:
+            uow = unit_of_work.AsyncUnitOfWork(uow, max_workers=max_workers)
+        file_bus = bootstrap.bootstrap(start_orm=False,
+                                       uow=uow,
+                                       publish_service=publish_service
+                                       or publisher.LogPublisher(),
+                                       config=bus.config)
+        file_bus.handle(commands.CreateUser(name='test_user'))
+        return file_bus
+
+    return make_file_bus
+
+
+@pytest.fixture
+def file_bus(make_file_bus):
+    return make_file_bus()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime
+from urllib.parse import quote
+
+import pytest
+
+from terka.adapters import publisher
+from terka.entrypoints import api
+from terka.entrypoints import asgi
+
+
+@pytest.fixture
+def app(make_file_bus):
+    async_bus = make_file_bus(publish_service=publisher.FanoutPublisher(),
+                              max_workers=4)
+    yield asgi.create_app(async_bus)
+    async_bus.uow.close()
+
+
+async def call(app,
+               method: str,
+               path: str,
+               body: bytes = b'',
+               query: str = '',
+               headers: dict[str, str] | None = None):
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [(key.encode(), value.encode())
+                    for key, value in (headers or {}).items()]
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start, response_body = messages
+    response_headers = {
+        key.decode(): value.decode()
+        for key, value in start['headers']
+    }
+    content = json.loads(
+        response_body['body']) if response_body['body'] else None
+    return start['status'], response_headers, content
+
+
+def request(app, method: str, path: str, **kwargs):
+    return asyncio.run(call(app, method, path, **kwargs))
+
+
+class TestAsgi:
+
+    def test_create_and_get_task(self, app):
+        status, _, task_id = request(app,
+                                     'POST',
+                                     '/api/v1/tasks',
+                                     body=b'{"name": "asgi task"}')
+        assert status == 200
+        status, _, task = request(app,
+                                  'GET',
+                                  f'/api/v1/tasks/{task_id}',
+                                  query='fields=id,name')
+        assert status == 200
+        assert task == {'id': task_id, 'name': 'asgi task'}
+
+    def test_update_task_from_form_values(self, app):
+        _, _, task_id = request(app,
+                                'POST',
+                                '/api/v1/tasks',
+                                body=b'{"name": "asgi task"}')
+        status, _, _ = request(
+            app,
+            'PATCH',
+            f'/api/v1/tasks/{task_id}',
+            body=b'name=renamed',
+            headers={'content-type': 'application/x-www-form-urlencoded'})
+        assert status == 200
+        _, _, task = request(app,
+                             'GET',
+                             f'/api/v1/tasks/{task_id}',
+                             query='fields=name')
+        assert task == {'name': 'renamed'}
+
+    def test_conditional_get_returns_not_modified(self, app):
+        _, headers, _ = request(app, 'GET', '/api/v1/tasks')
+        status, _, content = request(
+            app,
+            'GET',
+            '/api/v1/tasks',
+            headers={'if-none-match': headers['etag']})
+        assert status == 304
+        assert content is None
+        request(app, 'POST', '/api/v1/tasks', body=b'{"name": "new"}')
+        status, _, _ = request(app,
+                               'GET',
+                               '/api/v1/tasks',
+                               headers={'if-none-match': headers['etag']})
+        assert status == 200
+
+    def test_if_modified_since_does_not_hide_writes(self, app):
+        _, headers, _ = request(app, 'GET', '/api/v1/tasks')
+        request(app, 'POST', '/api/v1/tasks', body=b'{"name": "same second"}')
+        status, _, _ = request(
+            app,
+            'GET',
+            '/api/v1/tasks',
+            headers={'if-modified-since': headers['last-modified']})
+        assert status == 200
+
+    def test_tasks_are_paginated(self, app):
+
+        async def create_tasks():
+            await asyncio.gather(*(call(app,
+                                        'POST',
+                                        '/api/v1/tasks',
+                                        body=json.dumps({
+                                            'name': f'task_{i}'
+                                        }).encode()) for i in range(5)))
+
+        asyncio.run(create_tasks())
+        status, _, page = request(app,
+                                  'GET',
+                                  '/api/v1/tasks',
+                                  query='limit=3&fields=id')
+        assert status == 200
+        assert len(page['items']) == 3
+        _, _, next_page = request(app,
+                                  'GET',
+                                  '/api/v1/tasks',
+                                  query=f'limit=3&fields=id&cursor='
+                                  f'{quote(page["next_cursor"])}')
+        assert len(next_page['items']) == 2
+
+    def test_invalid_search_limit_is_bad_request(self, app):
+        status, _, content = request(app,
+                                     'GET',
+                                     '/api/v1/search',
+                                     query='q=task&limit=ten')
+        assert status == 400
+        assert 'limit' in content['error']
+
+    @pytest.mark.parametrize('method,path,status', [
+        ('GET', '/api/v1/unknown', 404),
+        ('PUT', '/api/v1/tasks/1', 405),
+    ])
+    def test_unknown_routes(self, app, method, path, status):
+        assert request(app, method, path)[0] == status
+
+    def test_events_are_streamed(self, app):
+
+        async def stream_events():
+            disconnect = asyncio.Event()
+            chunks = []
+            messages = [{'type': 'http.request', 'body': b''}]
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                chunks.append(message.get('body', b''))
+                if b'TaskCreated' in chunks[-1]:
+                    disconnect.set()
+
+            scope = {
+                'type': 'http',
+                'method': 'GET',
+                'path': '/api/v1/events',
+                'query_string': b'topics=task',
+                'headers': []
+            }
+            stream = asyncio.ensure_future(app(scope, receive, send))
+            await asyncio.sleep(0.1)
+            await call(app,
+                       'POST',
+                       '/api/v1/projects',
+                       body=b'{"name": "new_project"}')
+            await call(app, 'POST', '/api/v1/tasks', body=b'{"name": "new"}')
+            await asyncio.wait_for(stream, timeout=5)
+            return b''.join(chunks).decode()
+
+        events = asyncio.run(stream_events())
+        assert 'ProjectCreated' not in events
+        assert 'event: TaskCreated\ndata: {"id": 1}' in events
+
+
+class TestEntityEncoder:
+
+    def test_dates_keep_seconds(self):
+        assert json.dumps(datetime(2024, 1, 2, 3, 4, 5),
+                          cls=api.EntityEncoder) == '"2024-01-02 03:04:05"'
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event
+
+from terka import exceptions
+from terka import views
+from terka.adapters import change_log
+from terka.adapters import migrations
+from terka.adapters import orm
+from terka.domain import commands
+
+
+def _operations(feed: dict) -> list[tuple[str, int, str]]:
+    return [(change['entity_type'], change['id'], change['operation'])
+            for change in feed['changes']]
+
+
+class TestChangeLog:
+
+    def test_changes_are_returned_in_commit_order(self, file_bus):
+        since = views.changes(file_bus.uow)['next_cursor']
+        project_id = file_bus.handle(
+            commands.CreateProject(name='synced_project'))
+        first = file_bus.handle(commands.CreateTask(name='first'))
+        second = file_bus.handle(commands.CreateTask(name='second'))
+        file_bus.handle(commands.UpdateTask(id=first, name='renamed'))
+        feed = views.changes(file_bus.uow, since)
+        assert _operations(feed) == [('project', project_id, 'created'),
+                                     ('task', second, 'created'),
+                                     ('task', first, 'created')]
+        assert feed['changes'][-1]['data']['name'] == 'renamed'
+        assert not feed['has_more']
+
+    def test_sync_resumes_from_cursor(self, file_bus):
+        task_id = file_bus.handle(commands.CreateTask(name='task'))
+        since = views.changes(file_bus.uow)['next_cursor']
+        assert views.changes(file_bus.uow, since)['changes'] == []
+        file_bus.handle(commands.DeleteTask(id=task_id))
+        feed = views.changes(file_bus.uow, since)
+        assert _operations(feed) == [('task', task_id, 'deleted')]
+        assert 'data' not in feed['changes'][0]
+        assert views.changes(file_bus.uow,
+                             feed['next_cursor'])['changes'] == []
+
+    def test_changes_are_paginated(self, file_bus):
+        since = views.changes(file_bus.uow)['next_cursor']
+        task_ids = [
+            file_bus.handle(commands.CreateTask(name=f'task_{i}'))
+            for i in range(3)
+        ]
+        seen = []
+        while True:
+            feed = views.changes(file_bus.uow, since, limit=1, fields=['id'])
+            seen.extend(change['id'] for change in feed['changes']
+                        if change['entity_type'] == 'task')
+            since = feed['next_cursor']
+            if not feed['has_more']:
+                break
+        assert sorted(set(seen)) == task_ids
+
+    def test_invalid_cursor_is_rejected(self, file_bus):
+        with pytest.raises(exceptions.TerkaInvalidPage):
+            views.changes(file_bus.uow, 'not-a-cursor')
+
+    def test_existing_rows_are_logged_on_upgrade(self):
+        engine = create_engine('sqlite:///:memory:')
+        orm.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(orm.tasks.insert().values(name='legacy task'))
+            conn.execute(
+                orm.tasks.insert().values(name='deleted task',
+                                          status='DELETED'))
+            conn.execute(orm.epics.insert().values(name='legacy epic'))
+        migrations.upgrade(engine)
+        with engine.connect() as conn:
+            assert conn.execute(
+                'SELECT entity_type, entity_id, operation FROM change_log'
+            ).fetchall() == [('task', 1, 'created'), ('epic', 1, 'created')]
+
+    def test_reading_changes_uses_primary_key(self, file_bus):
+        plans = []
+
+        def explain(conn, cursor, statement, parameters, context,
+                    executemany):
+            if statement.startswith('SELECT id, entity_type'):
+                plans.extend(
+                    cursor.connection.execute(
+                        f'EXPLAIN QUERY PLAN {statement}',
+                        parameters).fetchall())
+
+        event.listen(file_bus.uow.engine, 'before_cursor_execute', explain)
+        views.changes(file_bus.uow, 0)
+        event.remove(file_bus.uow.engine, 'before_cursor_execute', explain)
+        assert any('USING INTEGER PRIMARY KEY' in plan[-1] for plan in plans)
+
+    def test_linked_rows_update_their_task(self, file_bus):
+        task_id = file_bus.handle(commands.CreateTask(name='task'))
+        today = datetime.now()
+        sprint_id = file_bus.handle(
+            commands.CreateSprint(
+                start_date=today + timedelta(days=7 - today.weekday()),
+                end_date=today + timedelta(days=13 - today.weekday())))
+        for command in (commands.TagTask(id=task_id, tag='synced'),
+                        commands.AddTask(id=task_id, sprint=sprint_id),
+                        commands.TrackTask(id=task_id, hours=1)):
+            since = views.changes(file_bus.uow)['next_cursor']
+            file_bus.handle(command)
+            assert ('task', task_id, 'updated') in _operations(
+                views.changes(file_bus.uow, since))
+
+    def test_epics_stories_and_comments_are_logged(self, file_bus):
+        since = views.changes(file_bus.uow)['next_cursor']
+        epic_id = file_bus.handle(commands.CreateEpic(name='synced_epic'))
+        story_id = file_bus.handle(commands.CreateStory(name='synced_story'))
+        file_bus.handle(commands.CommentEpic(id=epic_id, text='epic note'))
+        file_bus.handle(commands.CommentStory(id=story_id, text='story note'))
+        file_bus.handle(commands.DeleteEpic(id=epic_id))
+        feed = views.changes(file_bus.uow, since)
+        operations = _operations(feed)
+        assert ('epic', epic_id, 'deleted') in operations
+        assert ('story', story_id, 'created') in operations
+        comments = [
+            change for change in feed['changes']
+            if change['entity_type'] in ('epic_commentary', 'story_commentary')
+        ]
+        assert [comment['data']['text'] for comment in comments
+                ] == ['epic note', 'story note']
+
+    def test_pruned_cursor_needs_resync(self, file_bus):
+        since = views.changes(file_bus.uow)['next_cursor']
+        task_id = file_bus.handle(commands.CreateTask(name='task'))
+        with file_bus.uow.engine.begin() as conn:
+            assert change_log.prune(conn, timedelta(days=30)) == 0
+            conn.execute(
+                "UPDATE change_log SET changed_at = '2000-01-01 00:00:00'")
+            assert change_log.prune(conn, timedelta(days=30)) > 0
+        feed = views.changes(file_bus.uow, since)
+        assert feed['resync']
+        assert not feed['changes']
+        file_bus.handle(commands.DeleteTask(id=task_id))
+        feed = views.changes(file_bus.uow, feed['next_cursor'])
+        assert _operations(feed) == [('task', task_id, 'deleted')]
+        assert 'resync' not in feed
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pytest
+
+from terka import views
+from terka.domain import commands
+from terka.domain import entities
+from terka.service_layer import unit_of_work
+
+N_THREADS = 32
+
+
+@dataclass
+class ListAndWait(commands.List):
+    ...
+
+
+@dataclass
+class ShowAndWait(commands.Show):
+    ...
+
+
+@pytest.fixture
+def shared_bus(make_file_bus):
+    return make_file_bus(
+        unit_of_work.StorageOptions.from_kwargs(profile='server'))
+
+
+class TestConcurrency:
+
+    def test_threads_do_not_see_each_other_messages(self, shared_bus):
+        barrier = threading.Barrier(N_THREADS)
+
+        def create_and_read(i: int) -> list[tuple[str, str]]:
+            barrier.wait()
+            mismatches = []
+            for j in range(5):
+                name = f'thread_{i}_task_{j}'
+                task_id = shared_bus.handle(commands.CreateTask(name=name))
+                if (task := views.task(shared_bus.uow, task_id,
+                                       fields=['name'])) != {
+                                           'name': name
+                                       }:
+                    mismatches.append((name, task.get('name')))
+                views.tasks(shared_bus.uow, limit=10)
+            return mismatches
+
+        with ThreadPoolExecutor(N_THREADS) as executor:
+            results = list(executor.map(create_and_read, range(N_THREADS)))
+
+        assert results == [[]] * N_THREADS
+        tasks = views.tasks(shared_bus.uow, fields=['name'])
+        assert len(tasks) == len({task['name'] for task in tasks
+                                  }) == N_THREADS * 5
+
+    def test_messages_are_kept_per_thread(self, shared_bus):
+        shared_bus.uow.published_messages.append('main thread message')
+        shared_bus.queue = ['main thread queue']
+        seen = []
+
+        def read_state():
+            seen.append((shared_bus.queue, shared_bus.uow.published_messages))
+
+        thread = threading.Thread(target=read_state)
+        thread.start()
+        thread.join()
+        shared_bus.uow.published_messages.clear()
+        shared_bus.queue = None
+        assert seen == [(None, [])]
+
+    def test_reading_commands_do_not_block_writers(self, make_file_bus,
+                                                   shared_bus):
+        reading, done = threading.Event(), threading.Event()
+
+        def list_and_wait(cmd, bus, context):
+            views.tasks(bus.uow, limit=10)
+            # like an edit made from the TUI
+            bus.handle(commands.CreateTask(name='edited'))
+            reading.set()
+            done.wait(timeout=10)
+
+        shared_bus.command_handlers[ListAndWait] = list_and_wait
+        writer = make_file_bus(
+            unit_of_work.StorageOptions.from_kwargs(busy_timeout=1000))
+        reader = threading.Thread(target=shared_bus.handle,
+                                  args=(ListAndWait(), ))
+        reader.start()
+        try:
+            assert reading.wait(timeout=5)
+            assert writer.handle(commands.CreateTask(name='written'))
+        finally:
+            done.set()
+            reader.join()
+            del shared_bus.command_handlers[ListAndWait]
+
+    def test_reading_commands_see_later_writes(self, make_file_bus,
+                                               shared_bus):
+        waiting, written = threading.Event(), threading.Event()
+        names, errors = [], []
+
+        def show_and_wait(cmd, bus, context):
+            bus.uow.tasks.list(entities.task.Task)
+            bus.handle(commands.CreateTask(name='edited'))
+            bus.uow.tasks.list(entities.task.Task)
+            # like the TUI waiting for input
+            waiting.set()
+            written.wait(timeout=10)
+            names.extend(task.name
+                         for task in bus.uow.tasks.list(entities.task.Task))
+
+        def handle():
+            try:
+                shared_bus.handle(ShowAndWait(1))
+            except Exception as e:
+                errors.append(e)
+                waiting.set()
+
+        shared_bus.command_handlers[ShowAndWait] = show_and_wait
+        writer = make_file_bus()
+        reader = threading.Thread(target=handle)
+        reader.start()
+        try:
+            assert waiting.wait(timeout=5)
+            writer.handle(commands.CreateTask(name='written'))
+            with writer.uow.engine.connect() as conn:
+                busy, _, _ = conn.exec_driver_sql(
+                    'PRAGMA wal_checkpoint(TRUNCATE)').one()
+            assert not busy
+        finally:
+            written.set()
+            reader.join()
+            del shared_bus.command_handlers[ShowAndWait]
+        if errors:
+            raise errors[0]
+        assert {'edited', 'written'} <= set(names)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from terka import exceptions
+from terka.entrypoints import daemon
+from terka.service_layer import handlers
+
+
+@pytest.fixture
+def socket_path(tmp_path, file_bus):
+    path = str(tmp_path / 'terka.sock')
+    server = daemon.TerkaDaemon(file_bus, path)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    yield path
+    daemon.control('stop', path)
+    thread.join()
+
+
+class TestDaemon:
+
+    def test_forwarded_commands_stream_output(self, socket_path, capsys):
+        assert daemon.forward('create', 'task', {'name': 'warm'}, {
+            'user': 'test_user',
+            'workspace': 'default'
+        }, socket_path)
+        assert daemon.forward('list', 'tasks', {}, {}, socket_path)
+        assert 'warm' in capsys.readouterr().out
+
+    def test_command_asking_for_input_falls_back_to_client(
+            self, socket_path):
+        assert not daemon.forward('d', 'task', {'id': '1'}, {}, socket_path)
+
+    def test_command_exiting_does_not_stop_daemon(self, socket_path,
+                                                  capsys):
+        assert daemon.forward('list', 'projects', {}, {}, socket_path)
+        assert 'No projects found' in capsys.readouterr().out
+        assert daemon.control('ping', socket_path) == 'pong'
+
+    def test_input_after_output_is_an_error(self, socket_path, capsys,
+                                            monkeypatch):
+
+        def ask(self, command, entity, task_dict):
+            print('Do you want to continue (Y/n)?')
+            input()
+
+        monkeypatch.setattr(handlers.CommandHandler, 'execute', ask)
+        with pytest.raises(exceptions.TerkaException):
+            daemon.forward('list', 'tasks', {}, {}, socket_path)
+        assert capsys.readouterr().out.count('continue') == 1
+
+    def test_daemon_answers_ping(self, socket_path):
+        assert daemon.control('ping', socket_path) == 'pong'
+
+    def test_forward_without_daemon_runs_in_process(self, tmp_path):
+        assert not daemon.forward('list', 'tasks', {}, {},
+                                  str(tmp_path / 'missing.sock'))
+        assert daemon.control('ping', str(tmp_path / 'missing.sock')) is None
+
+    def test_editor_commands_need_terminal(self):
+        assert daemon.needs_terminal('create', {'expand_table': True})
+        assert daemon.needs_terminal('show', {'id': '1'})
+        assert not daemon.needs_terminal('create', {'name': 'task'})
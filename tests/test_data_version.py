@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from terka import views
+from terka.adapters import data_version
+from terka.domain import commands
+from terka.domain import entities
+
+
+def _version(bus) -> int:
+    with bus.uow.engine.connect() as conn:
+        return data_version.get(conn).version
+
+
+class TestDataVersion:
+
+    def test_writes_bump_version(self, file_bus):
+        version = _version(file_bus)
+        task_id = file_bus.handle(commands.CreateTask(name='versioned_task'))
+        created_version = _version(file_bus)
+        assert created_version > version
+        file_bus.handle(commands.UpdateTask(task_id, name='renamed_task'))
+        assert _version(file_bus) > created_version
+
+    def test_reads_keep_version(self, file_bus):
+        version = _version(file_bus)
+        views.tasks(file_bus.uow)
+        views.projects(file_bus.uow)
+        assert _version(file_bus) == version
+
+    def test_rolled_back_writes_keep_version(self, file_bus):
+        version = _version(file_bus)
+        with file_bus.uow as uow:
+            uow.tasks.add(entities.task.Task(name='discarded_task'))
+            uow.flush()
+        assert _version(file_bus) == version
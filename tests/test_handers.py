@@ -4,10 +4,14 @@ from datetime import datetime
 from datetime import timedelta
 
 import pytest
+from sqlalchemy import event
 
 from terka import exceptions
+from terka import utils
 from terka.domain import commands
 from terka.domain import entities
+from terka.domain import events
+from terka.service_layer import bulk
 
 
 class TestTask:
@@ -68,6 +72,79 @@ class TestTask:
         assert new_task.status == entities.task.TaskStatus.DELETED
         assert new_task.completed_at
 
+    def test_deleting_task_writes_single_status_task_event(self, bus):
+        task_id = bus.handle(commands.CreateTask(name='test'))
+        bus.handle(commands.DeleteTask(task_id))
+        task_events = bus.uow.tasks.get_by_conditions(
+            entities.event_history.TaskEvent, {
+                'task': task_id,
+                'new_value': 'DELETED'
+            })
+        assert len(task_events) == 1
+
+    def test_updating_several_fields_writes_history_in_one_batch(self, bus):
+        task_id = bus.handle(commands.CreateTask(name='test'))
+        writes_saved = bus.metrics.writes_saved
+        history_inserts = []
+
+        def count_history_insert(conn, cursor, statement, *args):
+            if statement.startswith('INSERT INTO task_events'):
+                history_inserts.append(statement)
+
+        event.listen(bus.uow.engine, 'before_cursor_execute',
+                     count_history_insert)
+        bus.handle(
+            commands.UpdateTask(task_id,
+                                name='new_name',
+                                description='new_description',
+                                status='TODO',
+                                priority='HIGH'))
+        event.remove(bus.uow.engine, 'before_cursor_execute',
+                     count_history_insert)
+        new_task = bus.uow.tasks.get_by_id(entities.task.Task, task_id)
+        assert len(new_task.history) == 4
+        assert len(history_inserts) == 1
+        assert bus.metrics.writes_saved - writes_saved == 6
+
+    def test_identical_updates_are_all_recorded(self, bus):
+        task_id = bus.handle(commands.CreateTask(name='test'))
+
+        def update_twice(cmd, bus, context):
+            bus.uow.published_messages.extend([
+                events.TaskUpdated(task_id, 'STATUS', 'BACKLOG', 'TODO'),
+                events.TaskUpdated(task_id, 'STATUS', 'BACKLOG', 'TODO')
+            ])
+
+        bus.command_handlers[commands.Edit] = update_twice
+        try:
+            bus.handle(commands.Edit())
+        finally:
+            del bus.command_handlers[commands.Edit]
+        history = bus.uow.tasks.get_by_conditions(
+            entities.event_history.TaskEvent, {
+                'task': task_id,
+                'new_value': 'TODO'
+            })
+        assert len(history) == 2
+
+    def test_saved_writes_are_counted_per_written_batch(self, bus):
+        task_id = bus.handle(commands.CreateTask(name='test'))
+        writes_saved = bus.metrics.writes_saved
+
+        def update_twice(cmd, bus, context):
+            # queued directly and published, joined in one batch
+            bus.queue.append(
+                events.TaskUpdated(str(task_id), 'STATUS', 'BACKLOG', 'TODO'))
+            bus.uow.published_messages.append(
+                events.TaskUpdated(str(task_id), 'STATUS', 'TODO', 'DONE'))
+
+        bus.command_handlers[commands.Edit] = update_twice
+        try:
+            bus.handle(commands.Edit())
+        finally:
+            del bus.command_handlers[commands.Edit]
+        assert bus.metrics.writes_saved - writes_saved == 2
+
     def test_uncompleting_task_removed_completed_at(self, bus):
         cmd = commands.CreateTask(name='test')
         task_id = bus.handle(cmd)
@@ -128,6 +205,24 @@ class TestTask:
                                                        {'task': task_id})
         assert not new_task_tag
 
+    def test_importing_tasks_from_file_inserts_tasks_in_chunks(
+            self, bus, tmp_path):
+        project_id = bus.handle(commands.CreateProject(name='import_project'))
+        task_file = tmp_path / 'tasks.txt'
+        task_file.write_text('\n'.join(
+            f'import_project::imported_task::description {i}'
+            for i in range(25)) + '\n\nunassigned_imported_task\n')
+        report = bus.handle(
+            commands.ImportTasks(tasks=utils.read_task_file(str(task_file)),
+                                 chunk_size=10))
+        assert report.n_tasks == 26
+        assert report.n_chunks == 3
+        imported_tasks = bus.uow.tasks.get_by_conditions(
+            entities.task.Task, {'name': 'imported_task'})
+        assert len(imported_tasks) == 25
+        assert {task.project for task in imported_tasks} == {project_id}
+        assert all(len(task.history) == 1 for task in imported_tasks)
+
 
 class TestSprint:
 
@@ -352,3 +447,147 @@ class TestSprint:
         bus.handle(add_epic_to_sprint)
         sprint = bus.uow.tasks.get_by_id(entities.sprint.Sprint, new_sprint)
         assert len(sprint.tasks) == 1
+
+    def test_starting_and_completing_sprint_updates_tasks_in_bulk(
+            self, bus, new_sprint):
+        bus.handle(
+            commands.ImportTasks(tasks=({
+                'name': 'bulk_sprint_task'
+            } for _ in range(150))))
+        task_ids = [
+            task.id for task in bus.uow.tasks.get_by_conditions(
+                entities.task.Task, {'name': 'bulk_sprint_task'})
+        ]
+        for task_id in task_ids:
+            bus.handle(commands.AddTask(id=task_id, sprint=new_sprint))
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(bus.uow.engine, 'before_cursor_execute', count_statement)
+        bus.handle(commands.StartSprint(new_sprint))
+        n_start_statements = len(statements)
+        bus.handle(commands.CompleteSprint(new_sprint))
+        n_complete_statements = len(statements) - n_start_statements
+        event.remove(bus.uow.engine, 'before_cursor_execute', count_statement)
+
+        assert n_start_statements < 20
+        assert n_complete_statements < 20
+        sprint = bus.uow.tasks.get_by_id(entities.sprint.Sprint, new_sprint)
+        for task_id in task_ids:
+            task = bus.uow.tasks.get_by_id(entities.task.Task, task_id)
+            assert task.status == entities.task.TaskStatus.BACKLOG
+            assert not task.due_date
+            assert sorted(
+                (event.type.name, str(event.old_value), str(event.new_value))
+                for event in task.history) == sorted([
+                        ('STATUS', 'None', 'BACKLOG'),
+                        ('STATUS', 'BACKLOG', 'TODO'),
+                        ('DUE_DATE', 'None', str(sprint.end_date)),
+                        ('STATUS', 'TODO', 'BACKLOG'),
+                        ('DUE_DATE', str(sprint.end_date), 'None'),
+                    ])
+
+
+class TestCommandBatch:
+
+    def _task_names(self, bus):
+        with bus.uow as uow:
+            return {task.name for task in uow.tasks.list(entities.task.Task)}
+
+    def test_batch_commits_once(self, bus):
+        commits = []
+
+        def count_commit(conn):
+            commits.append(conn)
+
+        items = [{
+            'command': 'CreateTask',
+            'payload': {
+                'name': f'api_batch_task_{i}'
+            }
+        } for i in range(5)]
+        event.listen(bus.uow.engine, 'commit', count_commit)
+        try:
+            committed, results = bulk.run_commands(bus, items)
+        finally:
+            event.remove(bus.uow.engine, 'commit', count_commit)
+        assert committed
+        assert len(commits) == 1
+        assert all(result.status == 'ok' and result.result
+                   for result in results)
+        task_id = results[0].result
+        committed, results = bulk.run_commands(bus, [{
+            'command': 'UpdateTask',
+            'payload': {
+                'id': task_id,
+                'status': 'TODO'
+            }
+        }])
+        assert committed
+        assert bus.uow.tasks.get_by_id(entities.task.Task,
+                                       task_id).status.name == 'TODO'
+
+    def test_atomic_batch_is_discarded_on_failure(self, bus):
+        committed, results = bulk.run_commands(bus, [{
+            'command': 'CreateTask',
+            'payload': {
+                'name': 'api_batch_discarded'
+            }
+        }, {
+            'command': 'UpdateTask',
+            'payload': {
+                'id': 999999,
+                'status': 'TODO'
+            }
+        }, {
+            'command': 'CreateTask',
+            'payload': {
+                'name': 'api_batch_never_run'
+            }
+        }])
+        assert not committed
+        assert [result.status for result in results
+                ] == ['rolled_back', 'error', 'skipped']
+        assert 'api_batch_discarded' not in self._task_names(bus)
+
+    def test_best_effort_batch_keeps_successful_commands(self, bus):
+        items = [{
+            'command': 'UnknownCommand'
+        }, {
+            'command': 'CreateTask',
+            'payload': {
+                'name': 'api_batch_kept'
+            }
+        }]
+        committed, results = bulk.run_commands(bus, items, atomic=False)
+        assert committed
+        assert [result.status for result in results] == ['error', 'ok']
+        assert 'Unknown command' in results[0].error
+        assert 'api_batch_kept' in self._task_names(bus)
+
+    @pytest.mark.parametrize('item', [
+        {
+            'command': 'ShowTask',
+            'payload': {
+                'id': 1
+            }
+        },
+        {
+            'command': 'ListTask'
+        },
+        {
+            'command': 'ImportTasks'
+        },
+        {
+            'command': 'CreateTask',
+            'payload': {
+                'description': 'no name'
+            }
+        },
+    ])
+    def test_interactive_commands_are_rejected(self, bus, item):
+        committed, results = bulk.run_commands(bus, [item])
+        assert not committed
+        assert results[0].status == 'error'
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import inspect
+
+from terka import exceptions
+from terka.adapters import migrations
+from terka.adapters import orm
+from terka.adapters import search
+
+
+class TestMigrations:
+
+    def test_upgrade_creates_schema_on_empty_database(self):
+        engine = create_engine('sqlite:///:memory:')
+        applied = migrations.upgrade(engine)
+        assert [m.version for m in applied] == [1, 2, 3, 4, 5, 6, 7]
+        assert migrations.current_version(engine) == migrations.HEAD
+        table_names = set(inspect(engine).get_table_names())
+        assert set(orm.metadata.tables) <= table_names
+        assert 'search_index' in table_names
+
+    def test_current_schema_is_checked_with_single_query(self):
+        engine = create_engine('sqlite:///:memory:')
+        migrations.upgrade(engine)
+        executed = []
+
+        def count_statement(conn, cursor, statement, parameters, context,
+                            executemany):
+            executed.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', count_statement)
+        assert migrations.upgrade(engine) == []
+        assert executed == ['SELECT MAX(version) FROM schema_version']
+
+    def test_upgrade_keeps_data_of_unversioned_database(self):
+        engine = create_engine('sqlite:///:memory:')
+        orm.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(orm.tasks.insert().values(name='legacy task'))
+        assert migrations.current_version(engine) == 0
+
+        migrations.upgrade(engine)
+
+        with engine.connect() as conn:
+            assert conn.execute(
+                orm.tasks.select()).fetchone().name == 'legacy task'
+            assert conn.execute("SELECT rowid FROM search_index "
+                                "WHERE search_index MATCH 'legacy'").scalar()
+
+    def test_upgrade_stops_at_target_version(self):
+        engine = create_engine('sqlite:///:memory:')
+        migrations.upgrade(engine, target=1)
+        assert migrations.current_version(engine) == 1
+        assert 'search_index' not in inspect(engine).get_table_names()
+
+        applied = migrations.upgrade(engine)
+        assert [m.version for m in applied] == [2, 3, 4, 5, 6, 7]
+
+    def test_failed_migration_is_not_recorded(self, monkeypatch):
+        engine = create_engine('sqlite:///:memory:')
+        migrations.upgrade(engine, target=2)
+
+        def create_search_index(connection):
+            raise exceptions.TerkaInitError('no fts5')
+
+        monkeypatch.setattr(search, 'create_search_index',
+                            create_search_index)
+        with pytest.raises(exceptions.TerkaInitError):
+            migrations.upgrade(engine)
+        assert migrations.current_version(engine) == 2
+
+    def test_migrated_schema_matches_orm(self):
+        engine = create_engine('sqlite:///:memory:')
+        migrations.upgrade(engine)
+        inspector = inspect(engine)
+        for name, table in orm.metadata.tables.items():
+            assert [column['name'] for column in inspector.get_columns(name)
+                    ] == [column.name for column in table.columns]
+
+    def test_migrated_indexes_match_orm(self):
+        engine = create_engine('sqlite:///:memory:')
+        migrations.upgrade(engine)
+        inspector = inspect(engine)
+        for name, table in orm.metadata.tables.items():
+            migrated = {(index['name'], tuple(index['column_names']),
+                         bool(index['unique']))
+                        for index in inspector.get_indexes(name)}
+            declared = {(index.name,
+                         tuple(column.name for column in index.columns),
+                         bool(index.unique))
+                        for index in table.indexes}
+            assert migrated == declared, name
+
+    def test_concurrent_upgrades_migrate_once(self, tmp_path):
+        engines = [
+            create_engine(f'sqlite:///{tmp_path}/tasks.db') for _ in range(2)
+        ]
+        barrier = threading.Barrier(len(engines))
+
+        def upgrade(engine):
+            barrier.wait()
+            return migrations.upgrade(engine)
+
+        with ThreadPoolExecutor(len(engines)) as executor:
+            applied = list(executor.map(upgrade, engines))
+        assert sorted(len(versions) for versions in applied) == [
+            0, migrations.HEAD
+        ]
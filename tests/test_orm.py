@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine
+from sqlalchemy import inspect
+
+from terka.adapters import migrations
+from terka.adapters import orm
+
+
+def test_upgrade_adds_indexes_to_database_without_them():
+    engine = create_engine('sqlite:///:memory:')
+    orm.metadata.create_all(engine)
+    for index in orm.tasks.indexes:
+        index.drop(engine)
+    assert not inspect(engine).get_indexes('tasks')
+
+    migrations.upgrade(engine)
+
+    index_names = {
+        index['name']
+        for index in inspect(engine).get_indexes('tasks')
+    }
+    assert index_names == {'ix_tasks_project_status', 'ix_tasks_due_date'}
+
+
+def test_task_history_lookup_uses_index():
+    engine = create_engine('sqlite:///:memory:')
+    migrations.upgrade(engine)
+    with engine.connect() as conn:
+        plan = conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM task_events WHERE task = 1'
+        ).fetchall()
+    assert 'ix_task_events_task_type_date' in str(plan)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from terka.domain import commands
+from terka.service_layer import profiling
+
+
+@pytest.fixture
+def profiler(bus):
+    profiler = profiling.Profiler(slowest=3)
+    profiler.attach(bus.uow.engine)
+    bus.profiler = profiler
+    yield profiler
+    bus.profiler = None
+    profiler.detach(bus.uow.engine)
+
+
+class TestProfiler:
+
+    def test_profiler_counts_statements_and_handler_time(
+            self, bus, profiler):
+        bus.handle(commands.CreateTask(name='profiled_task'))
+        summary = profiler.summary()
+        assert summary['statements'] > 0
+        assert summary['db_time_ms'] > 0
+        assert len(summary['slowest_statements']) == 3
+        assert summary['handlers']['TaskCommandHandlers.create']['calls'] == 1
+        assert 'TaskEventHandlers.created' in summary['handlers']
+
+    def test_reset_clears_collected_stats(self, bus, profiler):
+        bus.handle(commands.CreateTask(name='profiled_task'))
+        profiler.reset()
+        assert profiler.summary()['statements'] == 0
+        assert profiler.summary()['handlers'] == {}
+
+    def test_summary_is_appended_as_json_line(self, bus, profiler, tmp_path):
+        bus.handle(commands.CreateTask(name='profiled_task'))
+        profiler.write(tmp_path / 'terka.log', command='create')
+        profiler.write(tmp_path / 'terka.log', command='create')
+        lines = (tmp_path / 'terka.log').read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])['command'] == 'create'
+
+    def test_per_thread_stats_are_kept_apart(self, file_bus):
+        profiler = profiling.Profiler(per_thread=True)
+        profiler.attach(file_bus.uow.engine)
+        file_bus.profiler = profiler
+        summaries, errors = [], []
+
+        def handle_in_thread():
+            try:
+                file_bus.handle(commands.CreateTask(name='profiled_in_thread'))
+                summaries.append(profiler.summary())
+            except Exception as e:
+                errors.append(e)
+
+        try:
+            thread = threading.Thread(target=handle_in_thread)
+            thread.start()
+            thread.join()
+            if errors:
+                raise errors[0]
+            assert summaries[0]['statements'] > 0
+            assert summaries[0]['handlers']['TaskCommandHandlers.create'][
+                'calls'] == 1
+            assert profiler.summary()['statements'] == 0
+            assert profiler.summary()['handlers'] == {}
+        finally:
+            profiler.detach(file_bus.uow.engine)
+
+    def test_cprofile_dumps_stats_to_file(self, tmp_path):
+        with profiling.cprofile(str(tmp_path / 'terka.prof')):
+            sum(range(10))
+        assert (tmp_path / 'terka.prof').stat().st_size > 0
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+
+import pytest
+
+from terka import exceptions
+from terka import views
+from terka.adapters import publisher
+from terka.domain import commands
+from terka.domain import events
+from terka.service_layer import bulk
+
+
+class FakeRedis:
+    """Counts round trips; `gate` holds pipelines until it is set."""
+
+    def __init__(self) -> None:
+        self.messages = []
+        self.round_trips = 0
+        self.executing = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def publish(self, channel, message):
+        self.round_trips += 1
+        self.messages.append((channel, message))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.commands = []
+
+    def publish(self, channel, message):
+        self.commands.append((channel, message))
+
+    def execute(self):
+        self.client.executing.set()
+        self.client.gate.wait()
+        self.client.round_trips += 1
+        self.client.messages.extend(self.commands)
+
+
+class FakeUnpipelinedRedis:
+
+    def __init__(self) -> None:
+        self.messages = []
+
+    def publish(self, channel, message):
+        self.messages.append((channel, message))
+
+
+@pytest.fixture
+def redis_client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def fanout_bus(make_file_bus):
+    return make_file_bus(publish_service=publisher.FanoutPublisher())
+
+
+class TestFanoutPublisher:
+
+    def test_topic_is_derived_from_event_name(self):
+        assert publisher.topic(events.TaskCreated(1)) == 'task'
+        assert publisher.topic(events.SprintCompleted(1)) == 'sprint'
+
+    def test_subscribers_receive_events_of_their_topics(self):
+        fanout = publisher.FanoutPublisher()
+        tasks = fanout.subscribe(['task'])
+        everything = fanout.subscribe()
+        fanout.publish('task', events.TaskCreated(1))
+        fanout.publish('sprint', events.SprintCompleted(1))
+        assert tasks.get(timeout=0) == events.TaskCreated(1)
+        assert tasks.get(timeout=0) is None
+        assert everything.get(timeout=0) == events.TaskCreated(1)
+        assert everything.get(timeout=0) == events.SprintCompleted(1)
+
+    def test_slow_subscriber_drops_oldest_events(self):
+        fanout = publisher.FanoutPublisher(max_buffer_size=2)
+        subscription = fanout.subscribe()
+        for i in range(1, 5):
+            fanout.publish('task', events.TaskCreated(i))
+        assert subscription.take_dropped() == 2
+        assert subscription.take_dropped() == 0
+        assert [subscription.get(timeout=0),
+                subscription.get(timeout=0)] == [
+                    events.TaskCreated(3),
+                    events.TaskCreated(4)
+                ]
+
+    def test_unsubscribed_clients_get_nothing(self):
+        fanout = publisher.FanoutPublisher()
+        subscription = fanout.subscribe()
+        fanout.unsubscribe(subscription)
+        fanout.publish('task', events.TaskCreated(1))
+        assert subscription.get(timeout=0) is None
+
+    def test_bus_publishes_handled_events(self, fanout_bus):
+        subscription = fanout_bus.publisher.subscribe(['task'])
+        task_id = fanout_bus.handle(commands.CreateTask(name='new task'))
+        fanout_bus.handle(commands.UpdateTask(id=task_id, name='renamed'))
+        assert subscription.get(timeout=0) == events.TaskCreated(task_id)
+        updated = subscription.get(timeout=0)
+        assert isinstance(updated, events.TaskUpdated)
+        assert updated.task == task_id
+
+    def test_failed_commands_publish_nothing(self, fanout_bus):
+        subscription = fanout_bus.publisher.subscribe()
+        with pytest.raises(exceptions.EntityNotFound):
+            fanout_bus.handle(commands.CompleteTask(id=100))
+        assert subscription.get(timeout=0) is None
+
+    def test_rolled_back_batch_publishes_nothing(self, fanout_bus):
+        subscription = fanout_bus.publisher.subscribe()
+        committed, _ = bulk.run_commands(fanout_bus, [{
+            'command': 'CreateTask',
+            'payload': {
+                'name': 'new task'
+            }
+        }, {
+            'command': 'CompleteTask',
+            'payload': {
+                'id': 100
+            }
+        }])
+        assert not committed
+        assert subscription.get(timeout=0) is None
+        assert not views.tasks(fanout_bus.uow)
+
+    def test_batch_events_are_published_after_commit(self, fanout_bus):
+        subscription = fanout_bus.publisher.subscribe(['task'])
+        batch = [{
+            'command': 'CompleteTask',
+            'payload': {
+                'id': 100
+            }
+        }, {
+            'command': 'CreateTask',
+            'payload': {
+                'name': 'new task'
+            }
+        }]
+        with fanout_bus.uow.writing():
+            _, results = bulk.run_commands(fanout_bus, batch, atomic=False)
+            assert subscription.get(timeout=0) is None
+            fanout_bus.uow.commit()
+        assert subscription.get(timeout=0) == events.TaskCreated(
+            results[1].result)
+        assert subscription.get(timeout=0) is None
+
+
+class TestBatchingPublisher:
+
+    def test_queued_events_are_pipelined(self, redis_client):
+        batching = publisher.BatchingPublisher(
+            publisher.RedisPublisher(redis_client, 'terka'))
+        redis_client.gate.clear()
+        batching.publish('task', events.TaskCreated(0))
+        redis_client.executing.wait(timeout=5)
+        for i in range(1, 200):
+            batching.publish('task', events.TaskCreated(i))
+        redis_client.gate.set()
+        batching.flush()
+        assert redis_client.round_trips == 2
+        assert redis_client.messages[-1] == ('terka_task',
+                                             json.dumps({'id': 199}))
+        assert len(redis_client.messages) == 200
+        batching.close()
+
+    def test_full_queue_drops_new_events(self, redis_client):
+        batching = publisher.BatchingPublisher(
+            publisher.RedisPublisher(redis_client), max_queue_size=2)
+        redis_client.gate.clear()
+        batching.publish('task', events.TaskCreated(0))
+        redis_client.executing.wait(timeout=5)
+        for i in range(1, 5):
+            batching.publish('task', events.TaskCreated(i))
+        redis_client.gate.set()
+        batching.close()
+        assert batching.dropped == 2
+        assert [json.loads(message)['id']
+                for _, message in redis_client.messages] == [0, 1, 2]
+
+    def test_close_flushes_queued_events(self, redis_client):
+        batching = publisher.BatchingPublisher(
+            publisher.RedisPublisher(redis_client), overflow='block')
+        for i in range(50):
+            batching.publish('task', events.TaskCreated(i))
+        batching.close()
+        assert len(redis_client.messages) == 50
+        batching.publish('task', events.TaskCreated(50))
+        assert len(redis_client.messages) == 51
+
+    def test_events_published_while_closing_are_not_lost(
+            self, redis_client):
+        batching = publisher.BatchingPublisher(
+            publisher.RedisPublisher(redis_client), overflow='block')
+        closing = threading.Thread(target=batching.close)
+        put = batching._queue.put
+
+        def close_before_put(message, *args, **kwargs):
+            # close runs between the closed check and the enqueue
+            if message is not None and not closing.is_alive():
+                closing.start()
+                closing.join(timeout=0.2)
+            put(message, *args, **kwargs)
+
+        batching._queue.put = close_before_put
+        batching.publish('task', events.TaskCreated(1))
+        closing.join(timeout=5)
+        flushed = threading.Thread(target=batching.flush, daemon=True)
+        flushed.start()
+        flushed.join(timeout=5)
+        assert not flushed.is_alive()
+        assert len(redis_client.messages) == 1
+
+    def test_clients_without_pipeline_publish_one_by_one(self):
+        client = FakeUnpipelinedRedis()
+        publisher.RedisPublisher(client).publish_many([
+            ('task', events.TaskCreated(1)),
+            ('sprint', events.SprintCompleted(1)),
+        ])
+        assert [channel for channel, _ in client.messages] == ['task',
+                                                               'sprint']
+
+    def test_invalid_overflow_policy(self):
+        with pytest.raises(ValueError):
+            publisher.BatchingPublisher(publisher.LogPublisher(),
+                                        overflow='ignore')
+
+
+class TestCompositePublisher:
+
+    def test_events_reach_every_publisher(self, fake_publisher):
+        fanout = publisher.FanoutPublisher()
+        subscription = fanout.subscribe()
+        composite = publisher.CompositePublisher([fanout, fake_publisher])
+        composite.publish_many([('task', events.TaskCreated(1))])
+        assert subscription.get(timeout=0) == events.TaskCreated(1)
+        assert fake_publisher.events[-1] == events.TaskCreated(1)
+
+
+class TestLogPublisher:
+
+    def test_events_are_logged_at_debug_level(self, caplog):
+        with caplog.at_level(logging.INFO):
+            publisher.LogPublisher().publish('task', events.TaskCreated(1))
+        assert not caplog.records
+        with caplog.at_level(logging.DEBUG):
+            publisher.LogPublisher().publish('task', events.TaskCreated(1))
+        assert "Published to topic 'task'" in caplog.text
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event
+
+from terka.adapters import repository
+from terka.domain import commands
+from terka.domain import entities
+
+
+@pytest.fixture
+def statements(bus):
+    executed = []
+
+    def count_statement(conn, cursor, statement, parameters, context,
+                        executemany):
+        if not statement.startswith(('BEGIN', 'SAVEPOINT', 'RELEASE',
+                                     'ROLLBACK')):
+            executed.append(statement)
+
+    event.listen(bus.uow.engine, 'before_cursor_execute', count_statement)
+    yield executed
+    event.remove(bus.uow.engine, 'before_cursor_execute', count_statement)
+
+
+class TestLoadingProfiles:
+
+    @pytest.fixture(scope='class')
+    def projects(self, bus):
+        project_ids = []
+        for i in range(3):
+            project_id = bus.handle(
+                commands.CreateProject(name=f'profile_project_{i}'))
+            for j in range(3):
+                task_id = bus.handle(
+                    commands.CreateTask(name=f'task_{j}', project=project_id))
+                bus.handle(commands.UpdateTask(task_id, status='TODO'))
+                bus.handle(commands.TrackTask(task_id, hours=10))
+            project_ids.append(project_id)
+        return project_ids
+
+    def test_unknown_profile_raises_value_error(self, bus):
+        with pytest.raises(ValueError):
+            repository.get_loader_options('unknown_profile')
+
+    def test_task_list_profile_loads_printable_attributes(
+            self, bus, projects, statements):
+        with bus.uow as uow:
+            tasks = uow.tasks.list(entities.task.Task, profile='task_list')
+            for task in tasks:
+                task.is_stale
+                task.project_name
+                task.tags_string
+                task.collaborators_string
+                task.total_time_spent
+        # tasks plus at most one query per relationship in the profile
+        assert len(statements) <= 8
+
+
+class TestNameResolutionCache:
+
+    def test_least_recently_used_name_is_evicted(self):
+        cache = repository.NameResolutionCache(maxsize=2)
+        cache.set(entities.project.Project, 'a', 1)
+        cache.set(entities.project.Project, 'b', 2)
+        cache.get(entities.project.Project, 'a')
+        cache.set(entities.project.Project, 'c', 3)
+        assert cache.get(entities.project.Project, 'b') is None
+        assert cache.get(entities.project.Project, 'a') == 1
+        assert cache.info() == {
+            'hits': 2,
+            'misses': 1,
+            'size': 2,
+            'maxsize': 2
+        }
+
+    def test_invalidate_drops_only_given_entity(self):
+        cache = repository.NameResolutionCache()
+        cache.set(entities.project.Project, 'a', 1)
+        cache.set(entities.user.User, 'a', 1)
+        cache.invalidate(entities.project.Project)
+        assert cache.get(entities.project.Project, 'a') is None
+        assert cache.get(entities.user.User, 'a') == 1
+
+    def test_repeated_resolution_hits_database_once(self, bus, statements):
+        project_id = bus.handle(
+            commands.CreateProject(name='cached_project'))
+        with bus.uow as uow:
+            statements.clear()
+            for _ in range(5):
+                assert uow.tasks.resolve_id(entities.project.Project,
+                                            'cached_project') == project_id
+        assert len(statements) == 1
+
+    def test_renaming_project_invalidates_cached_name(self, bus):
+        bus.handle(commands.CreateWorkspace(name='default'))
+        project_id = bus.handle(commands.CreateProject(name='old_name'))
+        with bus.uow.writing() as uow:
+            uow.tasks.resolve_id(entities.project.Project, 'old_name')
+            bus.handle(commands.UpdateProject(project_id, name='new_name'))
+            assert uow.tasks.resolve_id(entities.project.Project,
+                                        'old_name') is None
+            assert uow.tasks.resolve_id(entities.project.Project,
+                                        'new_name') == project_id
+
+    def test_deleting_tag_invalidates_cached_name(self, bus):
+        bus.handle(commands.CreateTag(text='deleted_tag'))
+        with bus.uow.writing() as uow:
+            assert uow.tasks.resolve_id(entities.tag.BaseTag, 'deleted_tag')
+            bus.handle(commands.DeleteTag(text='deleted_tag'))
+            assert uow.tasks.resolve_id(entities.tag.BaseTag,
+                                        'deleted_tag') is None
+
+    def test_rename_by_other_process_is_seen_in_next_transaction(
+            self, bus):
+        project_id = bus.handle(commands.CreateProject(name='shared_name'))
+        with bus.uow as uow:
+            uow.tasks.resolve_id(entities.project.Project, 'shared_name')
+        with bus.uow.engine.begin() as conn:
+            conn.execute(
+                'UPDATE projects SET name = ? WHERE id = ?',
+                ('renamed_elsewhere', project_id))
+        with bus.uow as uow:
+            assert uow.tasks.resolve_id(entities.project.Project,
+                                        'shared_name') is None
+
+    def test_failed_scope_clears_cache(self, bus):
+        with pytest.raises(ValueError):
+            with bus.uow as uow:
+                uow.tasks.add(entities.user.User(name='rolled_back_user'))
+                uow.flush()
+                uow.tasks.resolve_id(entities.user.User, 'rolled_back_user')
+                raise ValueError
+        with bus.uow as uow:
+            assert uow.tasks.resolve_id(entities.user.User,
+                                        'rolled_back_user') is None
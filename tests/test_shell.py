@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from rich.console import Console
+from sqlalchemy import event
+
+from terka import exceptions
+from terka.domain import entities
+from terka.entrypoints import shell
+
+
+def _task_names(bus):
+    with bus.uow as uow:
+        return {task.name for task in uow.tasks.list(entities.task.Task)}
+
+
+class TestBatch:
+
+    def test_batch_executes_commands_and_skips_comments(self, bus):
+        script = [
+            '# create tasks', 'create task --name batch_task_1', '',
+            'create task --name "batch task 2"'
+        ]
+        assert shell.run_batch(bus, bus.config, script) == 2
+        assert {'batch_task_1', 'batch task 2'} <= _task_names(bus)
+
+    def test_batch_keeps_commands_before_failure(self, bus):
+        script = [
+            'create task --name batch_task_kept', 'update task 999999 -s t'
+        ]
+        with pytest.raises(exceptions.TerkaCommandException, match='line 2'):
+            shell.run_batch(bus, bus.config, script)
+        assert 'batch_task_kept' in _task_names(bus)
+
+    def test_single_transaction_batch_is_rolled_back_on_failure(self, bus):
+        script = [
+            'create task --name batch_task_discarded',
+            'update task 999999 -s t'
+        ]
+        with pytest.raises(exceptions.TerkaCommandException):
+            shell.run_batch(bus, bus.config, script, single_transaction=True)
+        assert 'batch_task_discarded' not in _task_names(bus)
+
+    def test_single_transaction_batch_commits_once(self, bus):
+        commits = []
+
+        def count_commit(conn):
+            commits.append(conn)
+
+        script = [f'create task --name batch_task_tx_{i}' for i in range(5)]
+        event.listen(bus.uow.engine, 'commit', count_commit)
+        try:
+            assert shell.run_batch(bus,
+                                   bus.config,
+                                   script,
+                                   single_transaction=True) == 5
+        finally:
+            event.remove(bus.uow.engine, 'commit', count_commit)
+        assert len(commits) == 1
+        assert {f'batch_task_tx_{i}' for i in range(5)} <= _task_names(bus)
+
+    def test_batch_continues_after_command_exits(self, file_bus):
+        script = ['list projects', 'create task --name after_exit']
+        assert shell.run_batch(file_bus, file_bus.config, script) == 2
+        assert 'after_exit' in _task_names(file_bus)
+
+
+class TestShell:
+
+    def test_shell_executes_lines_until_quit(self, file_bus, tmp_path,
+                                             monkeypatch, capsys):
+        lines = iter([
+            'list projects', '# comment', 'create task --name shell_task',
+            'update task 999999 -s t', 'quit', 'create task --name never_run'
+        ])
+        monkeypatch.setattr('builtins.input', lambda prompt: next(lines))
+        monkeypatch.setattr(shell, 'HISTORY_FILE', str(tmp_path / 'history'))
+        errors = io.StringIO()
+        shell.run_shell(file_bus, file_bus.config, Console(file=errors))
+        assert 'No projects found' in capsys.readouterr().out
+        assert '999999' in errors.getvalue()
+        assert _task_names(file_bus) == {'shell_task'}
+
+    def test_shell_stops_at_end_of_input(self, file_bus, tmp_path,
+                                         monkeypatch):
+
+        def end_of_input(prompt):
+            raise EOFError
+
+        monkeypatch.setattr('builtins.input', end_of_input)
+        monkeypatch.setattr(shell, 'HISTORY_FILE', str(tmp_path / 'history'))
+        shell.run_shell(file_bus, file_bus.config, Console(file=io.StringIO()))
+        assert _task_names(file_bus) == set()
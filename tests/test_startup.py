@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ('pandas', 'textual', 'asana', 'rich.prompt', 'plotext',
+                 'matplotlib')
+
+
+@pytest.mark.parametrize('module', [
+    'terka.entrypoints.cli', 'terka.service_layer.handlers',
+    'terka.presentations.console.printer'
+])
+def test_importing_module_does_not_load_heavy_dependencies(module):
+    code = (f'import sys, {module}; '
+            f'print(",".join(m for m in {HEAVY_MODULES!r} '
+            'if m in sys.modules))')
+    result = subprocess.run([sys.executable, '-c', code],
+                            capture_output=True,
+                            text=True,
+                            check=True)
+    assert result.stdout.strip() == ''
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event
+
+from terka import exceptions
+from terka.domain import commands
+from terka.domain import entities
+from terka.service_layer import unit_of_work
+
+
+class TestStorageOptions:
+
+    def test_from_kwargs_uses_profile_and_overrides(self):
+        options = unit_of_work.StorageOptions.from_kwargs(profile='server',
+                                                          synchronous='full')
+        assert options.busy_timeout == 30_000
+        assert options.synchronous == 'FULL'
+        assert options.journal_mode == 'WAL'
+
+    @pytest.mark.parametrize('kwargs', [{
+        'profile': 'unknown'
+    }, {
+        'synchronous': 'sometimes'
+    }, {
+        'journal_mode': 'WAL; DROP TABLE tasks'
+    }])
+    def test_invalid_options_raise_value_error(self, kwargs):
+        with pytest.raises(ValueError):
+            unit_of_work.StorageOptions.from_kwargs(**kwargs)
+
+    def test_pragmas_are_set_on_every_connection(self, tmp_path):
+        uow = unit_of_work.SqlAlchemyUnitOfWork(
+            f'sqlite:///{tmp_path}/tasks.db',
+            unit_of_work.StorageOptions(busy_timeout=1234))
+        with uow.engine.connect() as conn:
+            assert conn.execute('PRAGMA journal_mode').scalar() == 'wal'
+            assert conn.execute('PRAGMA synchronous').scalar() == 1
+            assert conn.execute('PRAGMA temp_store').scalar() == 2
+            assert conn.execute('PRAGMA busy_timeout').scalar() == 1234
+
+
+class TestSessionScope:
+
+    @pytest.fixture
+    def commits(self, bus):
+        executed = []
+
+        def count_commit(conn):
+            executed.append(conn)
+
+        event.listen(bus.uow.engine, 'commit', count_commit)
+        yield executed
+        event.remove(bus.uow.engine, 'commit', count_commit)
+
+    def test_command_with_cascaded_messages_is_committed_once(
+            self, bus, commits):
+        task_id = bus.handle(commands.CreateTask(name='single_commit_task'),
+                             context={
+                                 'tags': 'single_commit_a,single_commit_b',
+                                 'comment': 'single commit',
+                                 'hours': '1'
+                             })
+        assert len(commits) == 1
+        with bus.uow as uow:
+            task = uow.tasks.get_by_id(entities.task.Task, task_id)
+            assert len(task.tags) == 2
+            assert len(task.commentaries) == 1
+            assert task.total_time_spent == 1
+
+    def test_nested_scope_keeps_only_committed_changes(self, bus):
+        with bus.uow as uow:
+            with uow:
+                uow.tasks.add(entities.task.Task(name='nested_committed'))
+                uow.commit()
+            with uow:
+                uow.tasks.add(entities.task.Task(name='nested_uncommitted'))
+            uow.commit()
+        with bus.uow as uow:
+            assert uow.tasks.list(entities.task.Task,
+                                  {'name': 'nested_committed'})
+            assert not uow.tasks.list(entities.task.Task,
+                                      {'name': 'nested_uncommitted'})
+
+    def test_failed_command_is_rolled_back(self, bus):
+        with pytest.raises(exceptions.EntityNotFound):
+            bus.handle(commands.CreateTask(name='failed_command_task'),
+                       context={'epic': '9999'})
+        with bus.uow as uow:
+            assert not uow.tasks.list(entities.task.Task,
+                                      {'name': 'failed_command_task'})
@@ -7,3 +7,10 @@ def test_create_task_dict():
     expected = {'n': 'task_name', 'p': 'project_name', 'a': 'am'}
     task_dict = utils.create_task_dict(kwargs)
     assert task_dict == expected
+
+
+def test_env_flag(monkeypatch):
+    for value, expected in (('1', True), ('True', True), ('0', False),
+                            ('false', False), ('', False)):
+        monkeypatch.setenv('TERKA_TEST_FLAG', value)
+        assert utils.env_flag('TERKA_TEST_FLAG') is expected
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from terka import exceptions
+from terka import views
+from terka.domain import commands
+from terka.domain import entities
+
+
+class TestProjectStatistics:
+
+    @pytest.fixture(scope='class')
+    def project_id(self, bus):
+        project_id = bus.handle(commands.CreateProject(name='stats_project'))
+        yesterday = datetime.today() - timedelta(days=1)
+        for i, status in enumerate(('BACKLOG', 'TODO', 'TODO', 'IN_PROGRESS',
+                                    'REVIEW', 'DONE')):
+            task_id = bus.handle(
+                commands.CreateTask(name=f'stats_task_{i}',
+                                    project=project_id))
+            bus.handle(
+                commands.UpdateTask(task_id, status=status,
+                                    due_date=yesterday))
+            bus.handle(commands.TrackTask(task_id, hours=1))
+        return project_id
+
+    def test_project_statistics_match_entity_properties(
+            self, bus, project_id):
+        with bus.uow as uow:
+            statistics = views.project_statistics(uow.tasks.session,
+                                                  [project_id])[project_id]
+            project = uow.tasks.get_by_id(entities.project.Project,
+                                          project_id)
+            assert statistics['backlog'] == project.backlog == 1
+            assert statistics['todo'] == project.todo == 2
+            assert statistics['done'] == project.done == 1
+            assert statistics['open_tasks'] == len(project.open_tasks) == 4
+            assert statistics['incompleted_tasks'] == len(
+                project.incompleted_tasks)
+            assert statistics['overdue'] == len(project.overdue_tasks) == 4
+            assert statistics['stale'] == len(project.stale_tasks)
+            assert statistics['median_task_age'] == project.median_task_age
+            assert statistics['time_spent'] == project.total_time_spent == 6
+
+    def test_project_without_tasks_returns_empty_statistics(self, bus):
+        project_id = bus.handle(commands.CreateProject(name='empty_project'))
+        with bus.uow as uow:
+            statistics = views.project_statistics(uow.tasks.session,
+                                                  [project_id])
+        assert statistics == {project_id: views.empty_project_statistics()}
+
+
+class TestSearch:
+
+    @pytest.fixture(scope='class')
+    def task_id(self, bus):
+        task_id = bus.handle(
+            commands.CreateTask(name='Refactor searchable parser',
+                                description='tokenizer rewrite'))
+        bus.handle(
+            commands.CommentTask(task_id, text='parser benchmarks look good'))
+        return task_id
+
+    def test_search_matches_prefix_in_tasks_and_comments(self, bus, task_id):
+        results = views.search(bus.uow, 'pars')
+        found = {(r['entity_type'], r['id'] if r['entity_type'] == 'task'
+                  else r['parent_id']) for r in results}
+        assert ('task', task_id) in found
+        assert ('task_commentary', task_id) in found
+
+    def test_search_returns_snippet_with_highlight(self, bus, task_id):
+        [result] = views.search(bus.uow, 'tokenizer', entity_types=['task'])
+        assert result['id'] == task_id
+        assert '[tokenizer]' in result['snippet']
+
+    def test_search_index_follows_updates(self, bus, task_id):
+        bus.handle(commands.UpdateTask(task_id, name='Rewrite searchable lexer'))
+        assert views.search(bus.uow, 'lexer', entity_types=['task'])
+        assert not views.search(bus.uow, 'parser', entity_types=['task'])
+
+    @pytest.mark.parametrize('limit', ['ten', 0, -1])
+    def test_invalid_search_limit_is_rejected(self, bus, limit):
+        with pytest.raises(exceptions.TerkaInvalidPage):
+            views.search(bus.uow, 'parser', limit=limit)
+
+    def test_search_skips_deleted_tasks(self, bus):
+        task_id = bus.handle(commands.CreateTask(name='Obsolete migration'))
+        bus.handle(commands.CommentTask(task_id, text='obsolete approach'))
+        bus.handle(commands.DeleteTask(task_id))
+        assert not views.search(bus.uow, 'obsolete')
+
+    def test_invalid_search_command_limit_is_rejected(self):
+        with pytest.raises(exceptions.TerkaInvalidPage):
+            commands.Search('parser', limit='ten')
+
+
+class TestPagination:
+
+    @pytest.fixture(scope='class', autouse=True)
+    def paged_tasks(self, bus):
+        for i in range(7):
+            task_id = bus.handle(commands.CreateTask(name=f'paged_task_{i}'))
+            if i % 2:
+                bus.handle(
+                    commands.UpdateTask(task_id, due_date=datetime(2024, 1, 1)))
+
+    def _read_all_pages(self, bus, **kwargs):
+        ids, cursor = [], None
+        while True:
+            page = views.tasks(bus.uow, limit=3, cursor=cursor, **kwargs)
+            assert len(page['items']) <= 3
+            ids.extend(task['id'] for task in page['items'])
+            if not (cursor := page['next_cursor']):
+                return ids
+
+    @pytest.mark.parametrize('order_by',
+                             ['id', '-name', 'due_date', '-due_date'])
+    def test_pages_cover_every_row_once(self, bus, order_by):
+        ids = self._read_all_pages(bus, order_by=order_by)
+        assert len(ids) == len(set(ids)) == len(views.tasks(bus.uow))
+
+    def test_pages_follow_sort_column(self, bus):
+        ids = self._read_all_pages(bus, order_by='-name')
+        names = {task['id']: task['name'] for task in views.tasks(bus.uow)}
+        assert [names[i] for i in ids] == sorted(names.values(),
+                                                 reverse=True)
+
+    def test_cursor_is_bound_to_its_order(self, bus):
+        cursor = views.tasks(bus.uow, limit=1)['next_cursor']
+        with pytest.raises(exceptions.TerkaInvalidPage):
+            views.tasks(bus.uow, cursor=cursor, order_by='name')
+        with pytest.raises(exceptions.TerkaInvalidPage):
+            views.tasks(bus.uow, cursor='not-a-cursor')
+
+    def test_unknown_sort_column_is_rejected(self, bus):
+        with pytest.raises(exceptions.TerkaInvalidPage):
+            views.projects(bus.uow, limit=10, order_by='description')
+
+
+class TestSparseFieldsets:
+
+    @pytest.fixture(scope='class')
+    def project_id(self, bus):
+        project_id = bus.handle(commands.CreateProject(name='sparse_project'))
+        bus.handle(
+            commands.CreateTask(name='sparse_task',
+                                description='not requested',
+                                project=project_id))
+        return project_id
+
+    @pytest.fixture
+    def statements(self, bus):
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(bus.uow.engine, 'before_cursor_execute', count_statement)
+        yield statements
+        event.remove(bus.uow.engine, 'before_cursor_execute', count_statement)
+
+    def test_only_requested_columns_are_loaded(self, bus, project_id,
+                                               statements):
+        tasks = views.project_tasks(bus.uow, project_id, fields=['name'])
+        assert tasks == [{'name': 'sparse_task'}]
+        assert not any('tasks.description' in s for s in statements)
+
+    def test_derived_fields_are_computed_on_request(self, bus, project_id,
+                                                    statements):
+        result = views.project(bus.uow, project_id, fields=['name'])
+        assert result == {'name': 'sparse_project'}
+        assert not any('time_tracker_entries' in s for s in statements)
+
+        result = views.project(bus.uow,
+                               project_id,
+                               fields=['backlog', 'workspace'])
+        assert result.keys() == {'backlog', 'workspace'}
+        assert result['backlog'] == 1
+
+    def test_without_fields_everything_is_returned(self, bus, project_id):
+        result = views.project(bus.uow, project_id)
+        assert {'name', 'description', 'open_tasks', 'done',
+                'workspace'} <= result.keys()
+        [task] = views.project_tasks(bus.uow, project_id)
+        assert task['description'] == 'not requested'